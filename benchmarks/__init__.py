@@ -0,0 +1 @@
+"""Robotron performance benchmarks.  Run each module with `python -m benchmarks.<name>` from the repo root."""
@@ -0,0 +1,48 @@
+"""
+Async Vector Environment Benchmark
+
+Compares the throughput of `AsyncRobotronVectorEnv` (shared memory frames, tiny pipe messages) with gymnasium's
+`AsyncVectorEnv` wrapping the same `RobotronEnv`.
+
+    python -m benchmarks.async_vector_env --steps 200 --num-envs 4 8
+"""
+import argparse
+import time
+
+import gymnasium as gym
+
+from robotron import RobotronEnv, AsyncRobotronVectorEnv
+
+
+def _make_env():
+    return RobotronEnv(headless=True)
+
+
+def _time_steps(envs: gym.vector.VectorEnv, steps: int) -> float:
+    """ Reset the env and return the aggregate env steps/sec for `steps` random vector steps. """
+    envs.reset(seed=0)
+    envs.action_space.seed(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        envs.step(envs.action_space.sample())
+    elapsed = time.perf_counter() - start
+    envs.close()
+    return envs.num_envs * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Async vector env throughput')
+    parser.add_argument('--steps', type=int, default=200, help='Vector steps per run')
+    parser.add_argument('--num-envs', type=int, nargs='+', default=[4, 8], help='Env counts to test')
+    args = parser.parse_args()
+
+    print(f"{'envs':>6} {'robotron':>12} {'gym (shm)':>12} {'gym (pickle)':>12}")
+    for num_envs in args.num_envs:
+        ours = _time_steps(AsyncRobotronVectorEnv(num_envs, copy=False), args.steps)
+        gym_shm = _time_steps(gym.vector.AsyncVectorEnv([_make_env] * num_envs, shared_memory=True), args.steps)
+        gym_pickle = _time_steps(gym.vector.AsyncVectorEnv([_make_env] * num_envs, shared_memory=False), args.steps)
+        print(f"{num_envs:>6} {ours:>12.1f} {gym_shm:>12.1f} {gym_pickle:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
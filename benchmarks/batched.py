@@ -0,0 +1,63 @@
+"""
+Batched Update Benchmark
+
+Frames/sec of the engine with every sprite updating itself versus grunts and hulks updated by the batch
+(`Engine(batched=True)`).  Rendering is off and god mode is on, and each run is repeated so the best of the
+repeats is reported.  `--scale` multiplies the number of sprites in every wave.
+
+    python -m benchmarks.batched --levels 9 19 39 --frames 1000 --scale 1 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from robotron.engine import Engine
+
+
+def run(level: int, frames: int, batched: bool, scale: int = 1) -> float:
+    """
+    Run the engine with random input.
+
+    args:
+        level (int): The level to play.
+        frames (int): How many frames to run.
+        batched (bool): Batch the grunt and hulk updates.
+        scale (int): Multiply the number of each sprite in the wave by this.
+
+    returns:
+        float: Frames per second.
+    """
+    rng = np.random.default_rng(0)
+    engine = Engine(start_level=level, seed=0, headless=True, godmode=True, render=False, batched=batched)
+    engine.waves = [[count * scale for count in wave] for wave in engine.waves]
+    engine.reset()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        engine.handle_input(int(rng.integers(9)), int(rng.integers(9)))
+        engine.update()
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched grunt/hulk update throughput')
+    parser.add_argument('--levels', type=int, nargs='+', default=[9, 19, 39], help='Levels to run')
+    parser.add_argument('--frames', type=int, default=1000, help='Frames per run')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], help='Sprite count multipliers')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs of each, the best is reported')
+    args = parser.parse_args()
+
+    print(f"{'level':>6} {'scale':>6} {'sprite fps':>11} {'batched fps':>12} {'speedup':>8}")
+    for level in args.levels:
+        for scale in args.scale:
+            results = {False: 0.0, True: 0.0}
+            for _ in range(args.repeats):
+                for batched in results:
+                    results[batched] = max(results[batched], run(level, args.frames, batched, scale))
+            print(f"{level:>6} {scale:>6} {results[False]:>11.1f} {results[True]:>12.1f} "
+                  f"{results[True] / results[False]:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Collision Benchmark
+
+Frames/sec of the engine on the grunt waves with the brute force collision checks versus the spatial index.
+Rendering is off and god mode is on so the collision checks (not drawing or game overs) dominate.  `--scale`
+multiplies the number of sprites in every wave to see how both approaches hold up in crowds.
+
+    python -m benchmarks.collisions --levels 9 19 39 --frames 500 --scale 1 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from robotron.engine import Engine
+
+
+def run(level: int, frames: int, spatial_index: bool, scale: int = 1) -> float:
+    """
+    Run the engine with random input.
+
+    args:
+        level (int): The level to play.
+        frames (int): How many frames to run.
+        spatial_index (bool): Use the spatial index instead of brute force checks.
+        scale (int): Multiply the number of each sprite in the wave by this.
+
+    returns:
+        float: Frames per second.
+    """
+    rng = np.random.default_rng(0)
+    engine = Engine(start_level=level, seed=0, headless=True, godmode=True, render=False, spatial_index=spatial_index)
+    engine.waves = [[count * scale for count in wave] for wave in engine.waves]
+    engine.reset()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        engine.handle_input(int(rng.integers(9)), int(rng.integers(9)))
+        engine.update()
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Collision check throughput')
+    parser.add_argument('--levels', type=int, nargs='+', default=[9, 19, 39], help='Levels to run')
+    parser.add_argument('--frames', type=int, default=500, help='Frames per run')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], help='Sprite count multipliers')
+    args = parser.parse_args()
+
+    print(f"{'level':>6} {'scale':>6} {'brute fps':>10} {'index fps':>10} {'speedup':>8}")
+    for level in args.levels:
+        for scale in args.scale:
+            brute = run(level, args.frames, False, scale)
+            index = run(level, args.frames, True, scale)
+            print(f"{level:>6} {scale:>6} {brute:>10.1f} {index:>10.1f} {index / brute:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Trajectory Dataset Benchmark
+
+Steps/sec of an env storing every step with `start_dataset()` (chunks compressed and written on a background
+thread) versus not storing anything, and versus writing each chunk on the stepping thread as soon as it is full.
+Also reports the time steps spent waiting for the writer, the size on disk, and how fast `TrajectoryDataset`
+reads random minibatches back.  God mode is on so the level stays in play.
+
+    python -m benchmarks.dataset --steps 2000 --compression none zlib
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from robotron import RobotronEnv
+from robotron.utils import TrajectoryDataset
+
+OBSERVATIONS = {
+    'rgb': {},
+    'gray/2': {'grayscale': True, 'downsample': 2},
+}
+
+
+def run(observation: str, steps: int, directory: str, compression: str, mode: str) -> tuple:
+    """
+    Play random actions, storing them.
+
+    args:
+        observation (str): A key of `OBSERVATIONS`.
+        steps (int): How many steps to play.
+        directory (str): Where to write the dataset.
+        compression (str): 'none', 'zlib' or 'lz4'.
+        mode (str): 'off' to store nothing, 'thread' for the background writer, 'inline' to wait for every chunk
+            to be written as soon as it is full.
+
+    returns:
+        (float, float): Steps per second and the seconds spent waiting for the writer.
+    """
+    env = RobotronEnv(level=5, godmode=True, info_mode='basic', copy_obs=False, **OBSERVATIONS[observation])
+    writer = None
+    if mode != 'off':
+        writer = env.start_dataset(directory, compression=None if compression == 'none' else compression)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(env.action_space.n, size=steps)
+
+    env.reset(seed=0)
+    start = time.perf_counter()
+    waited = 0.0
+    for action in actions:
+        env.step(int(action))
+        if mode == 'inline' and writer.row == 0:
+            wait = time.perf_counter()
+            writer.queue.join()
+            waited += time.perf_counter() - wait
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        waited += writer.blocked
+    env.stop_dataset()
+    return (steps / elapsed, waited)
+
+
+def read_time(directory: str, batches: int = 200, batch_size: int = 64) -> float:
+    """ Milliseconds to read a random minibatch. """
+    dataset = TrajectoryDataset(directory)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(batches):
+        dataset.sample(batch_size, rng)
+    return (time.perf_counter() - start) * 1000 / batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trajectory dataset writing and reading')
+    parser.add_argument('--steps', type=int, default=2000, help='Steps per run')
+    parser.add_argument('--observations', nargs='+', default=list(OBSERVATIONS), choices=list(OBSERVATIONS),
+                        help='Observation types')
+    parser.add_argument('--compression', nargs='+', default=['none', 'zlib'], choices=['none', 'zlib', 'lz4'],
+                        help='Compressions to run')
+    args = parser.parse_args()
+
+    print(f"{'obs':>7} {'compression':>11} {'off sps':>8} {'inline sps':>11} {'thread sps':>11} "
+          f"{'inline wait s':>14} {'thread wait s':>14} {'MB':>8} {'read ms/64':>11}")
+    root = tempfile.mkdtemp(prefix='robotron-dataset-')
+    try:
+        for observation in args.observations:
+            (off, _) = run(observation, args.steps, '', 'none', 'off')
+            for compression in args.compression:
+                directory = os.path.join(root, f"{observation.replace('/', '')}-{compression}")
+                (inline, inline_wait) = run(observation, args.steps, directory + '-inline', compression, 'inline')
+                (thread, thread_wait) = run(observation, args.steps, directory, compression, 'thread')
+                size = sum(entry.stat().st_size for entry in os.scandir(directory)) / 1e6
+                print(f"{observation:>7} {compression:>11} {off:>8.1f} {inline:>11.1f} {thread:>11.1f} "
+                      f"{inline_wait:>14.2f} {thread_wait:>14.2f} {size:>8.1f} {read_time(directory):>11.2f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Frame Skip Benchmark
+
+Steps/sec of `RobotronEnv(frame_skip=k)`, which plays k frames per step and only draws the last one, versus a
+Python wrapper that repeats the action by calling `step()` k times (drawing and copying every frame).  God mode
+is on so the level stays in play.
+
+    python -m benchmarks.frame_skip --skips 1 2 4 --steps 300
+"""
+import argparse
+import time
+
+import numpy as np
+import gymnasium as gym
+
+from robotron import RobotronEnv
+
+
+class RepeatAction(gym.Wrapper):
+    """ The usual Python frame skip: repeat the action k times and sum the rewards. """
+
+    def __init__(self, env: gym.Env, skip: int):
+        super().__init__(env)
+        self.skip = skip
+
+    def step(self, action):
+        total = 0.0
+        for _ in range(self.skip):
+            obs, reward, done, truncated, info = self.env.step(action)
+            total += reward
+            if done:
+                break
+        return obs, total, done, truncated, info
+
+
+def _time_steps(env: gym.Env, steps: int) -> float:
+    """ Return the steps/sec for `steps` random steps. """
+    env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(env.action_space.n, size=steps)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _, _ = env.step(int(action))
+        if done:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Native frame skip vs a Python action repeat wrapper')
+    parser.add_argument('--skips', type=int, nargs='+', default=[1, 2, 4], help='Frames per step')
+    parser.add_argument('--steps', type=int, default=300, help='Steps per run')
+    parser.add_argument('--level', type=int, default=9, help='Start Level')
+    args = parser.parse_args()
+
+    print(f"{'skip':>5} {'wrapper':>10} {'native':>10} {'max pool':>10} {'speedup':>8}   (steps/sec)")
+    for skip in args.skips:
+        wrapper = _time_steps(RepeatAction(RobotronEnv(level=args.level, godmode=True), skip), args.steps)
+        native = _time_steps(RobotronEnv(level=args.level, godmode=True, frame_skip=skip), args.steps)
+        pooled = _time_steps(RobotronEnv(level=args.level, godmode=True, frame_skip=skip, max_pool=True),
+                             args.steps)
+        print(f"{skip:>5} {wrapper:>10.1f} {native:>10.1f} {pooled:>10.1f} {native / wrapper:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Info Mode Benchmark
+
+Steps/sec of `RobotronEnv` for each `info_mode` on crowded waves, and the time it takes to build one step's info
+dict.  'full' walks every sprite to build `info['data']`; 'lazy' only does if `data` is read, which this
+benchmark never does.  State-only ('entities') observations are used so the info is a bigger share of the step.
+God mode is on so the wave stays in play.
+
+    python -m benchmarks.info --levels 9 19 39 --steps 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from robotron import RobotronEnv
+
+
+def run(level: int, steps: int, info_mode: str, observation_type: str) -> float:
+    """
+    Run the env with random actions.
+
+    args:
+        level (int): The level to play.
+        steps (int): How many steps to run.
+        info_mode (str): See `RobotronEnv`.
+        observation_type (str): See `RobotronEnv`.
+
+    returns:
+        float: Steps per second.
+    """
+    env = RobotronEnv(level=level, godmode=True, seed=0, info_mode=info_mode, observation_type=observation_type,
+                      copy_obs=False)
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).integers(env.action_space.n, size=steps)
+
+    start = time.perf_counter()
+    for action in actions:
+        env.step(int(action))
+    return steps / (time.perf_counter() - start)
+
+
+def info_time(level: int, info_mode: str, calls: int = 2000) -> float:
+    """ Microseconds to build the info dict on the level's first frame. """
+    env = RobotronEnv(level=level, seed=0, info_mode=info_mode, observation_type='entities')
+    env.reset(seed=0)
+    engine = env.engine
+    start = time.perf_counter()
+    for _ in range(calls):
+        env._get_info(engine.score, engine.level, engine.lives)  # pylint: disable=protected-access
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RobotronEnv info_mode throughput')
+    parser.add_argument('--levels', type=int, nargs='+', default=[9, 19, 39], help='Levels to run')
+    parser.add_argument('--steps', type=int, default=1000, help='Steps per run')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs of each, the best is reported')
+    parser.add_argument('--observation-type', default='entities', choices=RobotronEnv.OBSERVATION_TYPES,
+                        help='Observation type')
+    args = parser.parse_args()
+
+    print(f"{'level':>6} {'mode':>6} {'steps/sec':>10} {'speedup':>8} {'info us':>8}")
+    for level in args.levels:
+        results = dict.fromkeys(RobotronEnv.INFO_MODES, 0.0)
+        for _ in range(args.repeats):
+            for info_mode in results:
+                results[info_mode] = max(results[info_mode], run(level, args.steps, info_mode, args.observation_type))
+        for (info_mode, speed) in results.items():
+            print(f"{level:>6} {info_mode:>6} {speed:>10.1f} {speed / results['full']:>7.2f}x "
+                  f"{info_time(level, info_mode):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Observation Microbenchmark
+
+Measures the per-step cost of getting the play area observation out of the engine.
+
+- legacy: compose the full screen, `surfarray.array3d` + swapaxes + crop (the old path)
+- view: draw the play area and return the read-only view of its buffer
+- copy: draw the play area and return a copy
+- copyto: draw the play area and copy it into a preallocated array
+
+    python -m benchmarks.observation --level 9 --repeat 500
+"""
+import argparse
+import time
+
+import numpy as np
+import pygame
+
+from robotron.engine import Engine
+from robotron.utils import crop
+
+
+def _legacy(engine: Engine) -> np.ndarray:
+    engine._draw_play_area()
+    engine._draw_screen()
+    image = pygame.surfarray.array3d(engine.screen).swapaxes(0, 1)
+    return crop(image, engine.play_area)
+
+
+def _view(engine: Engine) -> np.ndarray:
+    engine.draw()
+    return engine.get_observation(copy=False)
+
+
+def _copy(engine: Engine) -> np.ndarray:
+    engine.draw()
+    return engine.get_observation()
+
+
+def _make_copyto(engine: Engine):
+    out = np.empty(engine.play_view.shape, dtype=np.uint8)
+
+    def _copyto(engine: Engine) -> np.ndarray:
+        engine.draw()
+        return engine.get_observation(out=out)
+    return _copyto
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Observation cost per step')
+    parser.add_argument('--level', type=int, default=9, help='Level to draw')
+    parser.add_argument('--repeat', type=int, default=500, help='Observations per method')
+    args = parser.parse_args()
+
+    engine = Engine(start_level=args.level, headless=True)
+    engine.reset()
+    methods = {'legacy': _legacy, 'view': _view, 'copy': _copy, 'copyto': _make_copyto(engine)}
+
+    print(f"{'method':>8} {'usec/obs':>10}")
+    for name, method in methods.items():
+        method(engine)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            method(engine)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>8} {elapsed / args.repeat * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Particle Benchmark
+
+Frames/sec of brain waves, where every cruise missile leaves a trail and every prog an after-image each frame,
+with those kept as particles (numpy arrays aged in one operation and drawn in one pass) versus sprites in
+`all_group` like before (`LegacyFloater` is the old floater sprite).  Runs with drawing on and off; engines that
+don't draw keep no particles at all.  The legacy run plays a slightly different game (trails used to be in the
+way of random placement), so the average number of sprites in play is reported too.  God mode is on.
+
+    python -m benchmarks.particles --levels 5 10 15 20 25 --frames 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from robotron.engine import Engine
+from robotron.engine.entities.base import Base
+
+
+class LegacyFloater(Base):
+    """ A trail, after-image, points or skull as a sprite that vanishes after a delay, like before particles. """
+
+    def load_config(self):
+        return self.engine.config.entity('floater')
+
+    def setup(self):
+        self.delay = self.args['delay']
+
+    def get_animations(self):
+        return [self.args['sprite']]
+
+    def update(self):
+        self.delay -= 1
+        if self.delay == 0:
+            self.kill()
+
+
+def run(level: int, frames: int, legacy: bool, render: bool) -> tuple:
+    """
+    Run the engine with random input.
+
+    args:
+        level (int): The level to play.
+        frames (int): How many frames to run.
+        legacy (bool): Add floater sprites instead of particles.
+        render (bool): Draw every frame.
+
+    returns:
+        (float, float, float): Frames per second, and the average sprites in play and particles per frame.
+    """
+    rng = np.random.default_rng(0)
+    engine = Engine(start_level=level, seed=0, headless=True, godmode=True, render=render)
+    if legacy:
+        def add(image, center, lifetime=15, owner=None):
+            del owner
+            engine._add_sprite(LegacyFloater(engine, center=center, sprite=image, delay=lifetime))
+        engine.particles.add = add
+    engine.reset(seed=0)
+    actions = rng.integers(9, size=(frames, 2))
+
+    (sprites, particles) = (0, 0)
+    elapsed = 0.0
+    for (move, shoot) in actions:
+        start = time.perf_counter()
+        engine.step(int(move), int(shoot))
+        elapsed += time.perf_counter() - start
+        sprites += len(engine.all_group)
+        particles += len(engine.particles)
+    return (frames / elapsed, sprites / frames, particles / frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Particles versus floater sprites')
+    parser.add_argument('--levels', type=int, nargs='+', default=[5, 10, 15, 20, 25], help='Levels to run')
+    parser.add_argument('--frames', type=int, default=1000, help='Frames per run')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs of each, the best is reported')
+    args = parser.parse_args()
+
+    print(f"{'level':>6} {'render':>7} {'sprites fps':>12} {'particles fps':>14} {'speedup':>8} "
+          f"{'sprites':>8} {'sprites':>8} {'particles':>10}")
+    for level in args.levels:
+        for render in (True, False):
+            results = {}
+            for legacy in (True, False):
+                runs = [run(level, args.frames, legacy, render) for _ in range(args.repeats)]
+                results[legacy] = max(runs)
+            (legacy_fps, legacy_sprites, _) = results[True]
+            (fps, sprites, particles) = results[False]
+            print(f"{level:>6} {str(render):>7} {legacy_fps:>12.1f} {fps:>14.1f} {fps / legacy_fps:>7.2f}x "
+                  f"{legacy_sprites:>8.1f} {sprites:>8.1f} {particles:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
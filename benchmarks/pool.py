@@ -0,0 +1,99 @@
+"""
+Sprite Pool Benchmark
+
+Frames/sec of waves that churn through short-lived sprites (brain waves: cruise missiles, tank waves: shells,
+and the player's bullets everywhere) with killed bullets, shells and missiles recycled by the engine's sprite
+pool versus constructing every one of them new.  Both play the same game.  Drawing is off so
+the time is the game's own, and god mode keeps the wave in play.  Timings on a busy machine are noisy, so the
+sprites constructed and spawned are reported too, along with the size of each pool at the end.  Spawns are only
+a small part of a frame, so the time of one spawn (acquired, added to the game and killed) of each pooled kind is
+reported on its own as well.
+
+    python -m benchmarks.pool --levels 5 10 15 7 12 17 --frames 2000
+"""
+import argparse
+import time
+import timeit
+
+import numpy as np
+
+from robotron.engine import Engine
+from robotron.engine.entities.brain import CruiseMissile
+from robotron.engine.entities.enforcer import EnforcerBullet
+from robotron.engine.entities.player import Bullet
+from robotron.engine.entities.tank import TankShell
+
+
+def run(level: int, frames: int, pooled: bool) -> tuple:
+    """
+    Run the engine with random input.
+
+    args:
+        level (int): The level to play.
+        frames (int): How many frames to run.
+        pooled (bool): Recycle sprites.
+
+    returns:
+        (float, Dict[str, Dict[str, int]]): Frames per second and the pool stats.
+    """
+    rng = np.random.default_rng(0)
+    engine = Engine(start_level=level, seed=0, headless=True, godmode=True, render=False, sprite_pool=pooled)
+    engine.reset(seed=0)
+    actions = rng.integers(9, size=(frames, 2))
+
+    start = time.perf_counter()
+    for (move, shoot) in actions:
+        engine.step(int(move), int(shoot))
+    return (frames / (time.perf_counter() - start), engine.sprite_pool.get_stats())
+
+
+def spawn_time(pooled: bool, calls: int = 20000) -> dict:
+    """ Microseconds to spawn and kill one sprite of each pooled kind, by class name. """
+    engine = Engine(start_level=5, seed=0, headless=True, render=False, sprite_pool=pooled)
+    pool = engine.sprite_pool
+    center = engine.play_rect.center
+    kinds = {
+        'EnforcerBullet': lambda: pool.acquire(EnforcerBullet, center=center),
+        'TankShell': lambda: pool.acquire(TankShell, center=center),
+        'CruiseMissile': lambda: pool.acquire(CruiseMissile, center=center),
+        'Bullet': lambda: pool.acquire(Bullet, center[0], center[1], Bullet.RIGHT),
+    }
+
+    def spawn(acquire):
+        sprite = acquire()
+        engine._add_sprite(sprite)  # pylint: disable=protected-access
+        sprite.kill()
+        pool.recycle()
+
+    return {name: min(timeit.repeat(lambda acquire=acquire: spawn(acquire), number=calls, repeat=3)) * 1e6 / calls
+            for (name, acquire) in kinds.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sprite pool throughput')
+    parser.add_argument('--levels', type=int, nargs='+', default=[5, 10, 15, 7, 12, 17], help='Levels to run')
+    parser.add_argument('--frames', type=int, default=2000, help='Frames per run')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs of each, the best is reported')
+    args = parser.parse_args()
+
+    (new, pooled) = (spawn_time(False), spawn_time(True))
+    print(f"{'kind':>14} {'new us':>7} {'pooled us':>10} {'speedup':>8}")
+    for name in new:
+        print(f"{name:>14} {new[name]:>7.2f} {pooled[name]:>10.2f} {new[name] / pooled[name]:>7.2f}x")
+    print()
+
+    print(f"{'level':>6} {'new fps':>8} {'pooled fps':>11} {'speedup':>8} {'spawned':>8} {'constructed':>12}  pools")
+    for level in args.levels:
+        (new, pooled) = (0.0, 0.0)
+        for _ in range(args.repeats):
+            new = max(new, run(level, args.frames, False)[0])
+            (speed, stats) = run(level, args.frames, True)
+            pooled = max(pooled, speed)
+        created = sum(kind['created'] for kind in stats.values())
+        spawned = created + sum(kind['reused'] for kind in stats.values())
+        sizes = ' '.join(f"{name}={kind['created']}" for (name, kind) in stats.items())
+        print(f"{level:>6} {new:>8.1f} {pooled:>11.1f} {pooled / new:>7.2f}x {spawned:>8} {created:>12}  {sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Preprocessing Benchmark
+
+Compares `RobotronEnv`'s built in grayscale/downsample/frame stack with the equivalent chain of gymnasium wrappers.
+gymnasium's `ResizeObservation` needs OpenCV; without it the chain uses a `TransformObservation` doing the same
+numpy area downsample.
+
+    python -m benchmarks.preprocess --steps 500 --downsample 4 --frame-stack 4
+"""
+import argparse
+import time
+
+import numpy as np
+import gymnasium as gym
+
+from robotron import RobotronEnv
+
+
+def _wrapper(*names):
+    """ Return the first wrapper class that exists.  Names changed between gymnasium versions. """
+    for name in names:
+        if hasattr(gym.wrappers, name):
+            return getattr(gym.wrappers, name)
+    raise ImportError(f'None of {names} found in gymnasium.wrappers')
+
+
+def _make_wrapped(level: int, downsample: int, frame_stack: int) -> gym.Env:
+    env = RobotronEnv(level=level)
+    env = _wrapper('GrayscaleObservation', 'GrayScaleObservation')(env)
+    (height, width) = env.observation_space.shape
+    out_height, out_width = height // downsample, width // downsample
+    try:
+        import cv2  # pylint: disable=import-outside-toplevel,unused-import
+        env = _wrapper('ResizeObservation')(env, (out_height, out_width))
+    except ImportError:
+        def _downsample(obs):
+            obs = obs[:out_height * downsample, :out_width * downsample]
+            return obs.reshape(out_height, downsample, out_width, downsample).mean(axis=(1, 3)).astype(np.uint8)
+        space = gym.spaces.Box(low=0, high=255, shape=(out_height, out_width), dtype=np.uint8)
+        env = gym.wrappers.TransformObservation(env, _downsample, space)
+    stack = _wrapper('FrameStackObservation', 'FrameStack')
+    return stack(env, frame_stack)
+
+
+def _time_steps(env: gym.Env, steps: int) -> float:
+    """ Return the steps/sec for `steps` random steps. """
+    env.reset(seed=0)
+    env.action_space.seed(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _, _ = env.step(env.action_space.sample())
+        if done:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Native preprocessing vs gymnasium wrappers')
+    parser.add_argument('--steps', type=int, default=500, help='Steps per run')
+    parser.add_argument('--level', type=int, default=1, help='Start Level')
+    parser.add_argument('--downsample', type=int, default=4, help='Downsample factor')
+    parser.add_argument('--frame-stack', type=int, default=4, help='Frames to stack')
+    args = parser.parse_args()
+
+    runs = {
+        'raw': RobotronEnv(level=args.level),
+        'native': RobotronEnv(level=args.level, grayscale=True, downsample=args.downsample,
+                              frame_stack=args.frame_stack),
+        'wrappers': _make_wrapped(args.level, args.downsample, args.frame_stack),
+    }
+    print(f"{'env':>10} {'steps/sec':>12} {'obs shape':>18}")
+    for name, env in runs.items():
+        print(f"{name:>10} {_time_steps(env, args.steps):>12.1f} {str(env.observation_space.shape):>18}")
+
+
+if __name__ == "__main__":
+    main()
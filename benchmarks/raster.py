@@ -0,0 +1,86 @@
+"""
+Rasterizer Benchmark
+
+Time to draw the play area with pygame blits versus the numpy renderer (`renderer='numpy'`), and the time to
+get a grayscale observation: drawing RGB and converting it (`FramePreprocessor`) versus the numpy renderer
+drawing grayscale directly.  Both renderers draw the same game frames; the draws are checked for equality.
+
+    python -m benchmarks.raster --levels 1 9 24 39 --frames 500
+"""
+import argparse
+import time
+
+import numpy as np
+
+from robotron.engine import Engine
+from robotron.engine.raster import NumpyRenderer
+from robotron.utils import FramePreprocessor
+
+
+def run(level: int, frames: int) -> dict:
+    """
+    Play random input and time each way of drawing every frame.
+
+    args:
+        level (int): The level to play.
+        frames (int): How many frames to run.
+
+    returns:
+        dict: Microseconds per frame for 'pygame' and 'numpy' RGB draws and 'pygame_gray' and 'numpy_gray'
+            grayscale observations.
+    """
+    rng = np.random.default_rng(0)
+    pygame_engine = Engine(start_level=level, seed=0, headless=True, godmode=True, render=False)
+    numpy_engine = Engine(start_level=level, seed=0, headless=True, godmode=True, render=False, renderer='numpy')
+    engines = (pygame_engine, numpy_engine)
+    for engine in engines:
+        # The play area is drawn here, so keep the particles like a rendering engine would.
+        engine.particles.enabled = True
+        engine.reset(seed=0)
+    height, width = pygame_engine.play_buffer.shape[:2]
+    preprocessor = FramePreprocessor((height, width), grayscale=True)
+    gray = NumpyRenderer(numpy_engine.play_rect.size, numpy_engine.play_rect.topleft, grayscale=True)
+
+    times = dict.fromkeys(('pygame', 'numpy', 'pygame_gray', 'numpy_gray'), 0.0)
+    for _ in range(frames):
+        (move, shoot) = (int(rng.integers(9)), int(rng.integers(9)))
+        for engine in engines:
+            engine.step(move, shoot)
+
+        start = time.perf_counter()
+        pygame_engine._draw_play_area()  # pylint: disable=protected-access
+        times['pygame'] += time.perf_counter() - start
+        start = time.perf_counter()
+        numpy_engine._draw_play_area()  # pylint: disable=protected-access
+        times['numpy'] += time.perf_counter() - start
+        assert np.array_equal(pygame_engine.play_buffer, numpy_engine.play_buffer)
+
+        start = time.perf_counter()
+        pygame_engine._draw_play_area()  # pylint: disable=protected-access
+        expected = preprocessor(pygame_engine.play_buffer)
+        times['pygame_gray'] += time.perf_counter() - start
+        start = time.perf_counter()
+        image = gray.draw(numpy_engine.all_group, numpy_engine.particles)
+        times['numpy_gray'] += time.perf_counter() - start
+        assert np.array_equal(expected, image)
+
+    return {name: seconds * 1e6 / frames for (name, seconds) in times.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='pygame blits versus the numpy renderer')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 9, 24, 39], help='Levels to run')
+    parser.add_argument('--frames', type=int, default=500, help='Frames per run')
+    args = parser.parse_args()
+
+    print(f"{'level':>6} {'pygame us':>10} {'numpy us':>9} {'speedup':>8} {'pygame gray us':>15} "
+          f"{'numpy gray us':>14} {'speedup':>8}")
+    for level in args.levels:
+        result = run(level, args.frames)
+        print(f"{level:>6} {result['pygame']:>10.1f} {result['numpy']:>9.1f} "
+              f"{result['pygame'] / result['numpy']:>7.2f}x {result['pygame_gray']:>15.1f} "
+              f"{result['numpy_gray']:>14.1f} {result['pygame_gray'] / result['numpy_gray']:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Window Render Benchmark
+
+Time to bring the window up to date each frame with the dirty-rect renderer (only the regions of sprites that
+changed are copied from the play area, the HUD text is rendered only when it changes) versus composing and
+updating the whole window every frame like before.  Also times `get_image()` on a headless engine, which is how
+frames are recorded (`env.render('human')`).  Uses SDL's dummy video driver, so the real cost of pushing pixels
+to a window isn't included; the share of the window updated each frame is reported for that.
+
+    python -m benchmarks.render --levels 1 9 39 --frames 600
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pygame
+
+from robotron.engine import Engine
+
+
+def legacy_draw_screen(engine: Engine):
+    """ The old full window redraw: background, border, play area and freshly rendered text. """
+    engine.screen.fill((0, 0, 0))
+    pygame.draw.rect(engine.screen, [238, 5, 8], engine.play_rect.inflate(15, 15), 5)
+    engine.screen.blit(engine.play_surface, engine.play_rect)
+    text = engine.font.render(
+        f'Score: {engine.score} Level: {engine.level + 1} Lives: {engine.lives} {"GAME OVER" if engine.done else ""}',
+        True, (255, 255, 255), (0, 0, 0))
+    engine.screen.blit(text, (engine.play_rect.x, engine.play_rect.y - 40))
+
+
+def run(level: int, frames: int, dirty: bool, headless: bool) -> tuple:
+    """
+    Play random input and time the screen updates.
+
+    args:
+        level (int): The level to play.
+        frames (int): How many frames to run.
+        dirty (bool): Use the dirty-rect renderer instead of the full redraw.
+        headless (bool): Time `get_image()` on a headless engine instead of updating the window.
+
+    returns:
+        (float, float): Microseconds per frame spent updating the screen and the share of the window updated.
+    """
+    rng = np.random.default_rng(0)
+    engine = Engine(start_level=level, seed=0, headless=headless, godmode=True)
+    engine.reset(seed=0)
+    # Only draw the play area while stepping; the screen update is done (and timed) below.
+    engine.draw = engine._draw_play_area  # pylint: disable=protected-access
+    area = engine.screen.get_width() * engine.screen.get_height()
+
+    elapsed = 0.0
+    updated = 0
+    for _ in range(frames):
+        engine.step(int(rng.integers(9)), int(rng.integers(9)))
+        start = time.perf_counter()
+        if headless:
+            if dirty:
+                engine.get_image()
+            else:
+                legacy_draw_screen(engine)
+                pygame.surfarray.array3d(engine.screen).swapaxes(0, 1)
+        elif dirty:
+            rects = engine._update_screen()  # pylint: disable=protected-access
+            pygame.display.update(rects)
+            updated += sum(rect.width * rect.height for rect in rects)
+        else:
+            legacy_draw_screen(engine)
+            pygame.display.update()
+            updated += area
+        elapsed += time.perf_counter() - start
+    return (elapsed * 1e6 / frames, updated / (area * frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dirty-rect window rendering versus full redraws')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 9, 39], help='Levels to run')
+    parser.add_argument('--frames', type=int, default=600, help='Frames per run')
+    args = parser.parse_args()
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+    print(f"{'level':>6} {'full us':>8} {'dirty us':>9} {'speedup':>8} {'updated':>8} "
+          f"{'image full us':>14} {'image dirty us':>15}")
+    for level in args.levels:
+        (full, _) = run(level, args.frames, False, False)
+        (dirty, share) = run(level, args.frames, True, False)
+        (image_full, _) = run(level, args.frames, False, True)
+        (image_dirty, _) = run(level, args.frames, True, True)
+        print(f"{level:>6} {full:>8.1f} {dirty:>9.1f} {full / dirty:>7.2f}x {share:>8.1%} "
+              f"{image_full:>14.1f} {image_dirty:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
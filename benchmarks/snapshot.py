@@ -0,0 +1,97 @@
+"""
+Snapshot Benchmark
+
+Cost of rolling an engine back to an earlier frame with `Engine.get_state()`/`set_state()` versus replaying the
+game from `reset()` with the same seed and inputs, plus the cost of one step for comparison.  The rollback point
+is `--depth` frames into the level.  God mode is on, so the level stays in play for the whole run.
+
+    python -m benchmarks.snapshot --levels 9 19 39 --depth 100 --render
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from robotron.engine import Engine
+
+
+def timed(function, repeats: int) -> float:
+    """
+    Time a function.
+
+    args:
+        function (callable): The function to time.
+        repeats (int): How many times to call it.
+
+    returns:
+        float: The mean time of a call, in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def run(level: int, depth: int, render: bool, repeats: int) -> dict:
+    """
+    Measure one level.
+
+    args:
+        level (int): The level to play.
+        depth (int): How many frames into the level to take the snapshot.
+        render (bool): Draw every frame.
+        repeats (int): How many times to time each operation.
+
+    returns:
+        dict: Mean microseconds for each operation, and the pickled snapshot size in bytes.
+    """
+    rng = np.random.default_rng(0)
+    inputs = [(int(move), int(shoot)) for (move, shoot) in rng.integers(9, size=(depth, 2))]
+    engine = Engine(start_level=level, seed=0, headless=True, godmode=True, render=render)
+
+    def replay():
+        engine.reset(seed=0)
+        for (move, shoot) in inputs:
+            engine.handle_input(move, shoot)
+            engine.update()
+
+    replay()
+    state = engine.get_state()
+
+    def step():
+        engine.handle_input(0, 0)
+        engine.update()
+
+    results = {
+        'get_state': timed(engine.get_state, repeats),
+        'set_state': timed(lambda: engine.set_state(state), repeats),
+        'step': timed(step, repeats),
+        'replay': timed(replay, max(repeats // 100, 1)),
+        'pickle': timed(lambda: pickle.dumps(state), max(repeats // 10, 1)),
+        'size': len(pickle.dumps(state)),
+    }
+    engine.set_state(state)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshot/restore cost versus replaying from reset')
+    parser.add_argument('--levels', type=int, nargs='+', default=[9, 19, 39], help='Levels to run')
+    parser.add_argument('--depth', type=int, default=100, help='Frames into the level to roll back to')
+    parser.add_argument('--repeats', type=int, default=500, help='Times to time each operation')
+    parser.add_argument('--render', action='store_true', help='Draw every frame')
+    args = parser.parse_args()
+
+    print(f"{'level':>6} {'get us':>8} {'set us':>8} {'step us':>8} {'replay us':>10} {'vs replay':>10} "
+          f"{'pickle us':>10} {'bytes':>7}")
+    for level in args.levels:
+        result = run(level, args.depth, args.render, args.repeats)
+        rollback = result['get_state'] + result['set_state']
+        print(f"{level:>6} {result['get_state']:>8.1f} {result['set_state']:>8.1f} {result['step']:>8.1f} "
+              f"{result['replay']:>10.0f} {result['replay'] / rollback:>9.0f}x {result['pickle']:>10.0f} "
+              f"{result['size']:>7}")
+
+
+if __name__ == "__main__":
+    main()
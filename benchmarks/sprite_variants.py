@@ -0,0 +1,84 @@
+"""
+Sprite Variant Benchmark
+
+Frames/sec of waves full of runtime drawn sprites (brain waves: cruise missiles and flashing progs, tank waves:
+shells) with the shared variant cache versus drawing every variant again as it is needed, like before the cache.
+The uncached run empties the cache every frame.  Rendering and god mode are on.  Timings on a busy machine are
+noisy, so the number of surfaces created while playing is counted too.
+
+    python -m benchmarks.sprite_variants --levels 5 10 15 7 12 --frames 1000
+"""
+import argparse
+import time
+
+import numpy as np
+import pygame
+
+from robotron.engine import Engine
+
+
+class CountingSurface(pygame.Surface):
+    """ Counts the surfaces created while it stands in for `pygame.Surface`. """
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingSurface.created += 1
+        super().__init__(*args, **kwargs)
+
+
+def run(level: int, frames: int, cached: bool, count: bool = False) -> float:
+    """
+    Run the engine with random input.
+
+    args:
+        level (int): The level to play.
+        frames (int): How many frames to run.
+        cached (bool): Keep the drawn variants between frames.
+        count (bool): Return the number of surfaces created instead of the speed.
+
+    returns:
+        float: Frames per second (or surfaces created).
+    """
+    rng = np.random.default_rng(0)
+    engine = Engine(start_level=level, seed=0, headless=True, godmode=True)
+    engine.reset()
+    engine.variants.clear()
+
+    surface = pygame.Surface
+    if count:
+        pygame.Surface = CountingSurface
+        CountingSurface.created = 0
+    try:
+        start = time.perf_counter()
+        for _ in range(frames):
+            if not cached:
+                engine.variants.clear()
+            engine.handle_input(int(rng.integers(9)), int(rng.integers(9)))
+            engine.update()
+        elapsed = time.perf_counter() - start
+    finally:
+        pygame.Surface = surface
+    return CountingSurface.created if count else frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared sprite variant cache throughput')
+    parser.add_argument('--levels', type=int, nargs='+', default=[5, 10, 15, 7, 12], help='Levels to run')
+    parser.add_argument('--frames', type=int, default=1000, help='Frames per run')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs of each, the best is reported')
+    args = parser.parse_args()
+
+    print(f"{'level':>6} {'uncached fps':>13} {'cached fps':>11} {'speedup':>8} {'uncached surfaces':>18} "
+          f"{'cached surfaces':>16}")
+    for level in args.levels:
+        results = {False: 0.0, True: 0.0}
+        for _ in range(args.repeats):
+            for cached in results:
+                results[cached] = max(results[cached], run(level, args.frames, cached))
+        surfaces = {cached: run(level, args.frames, cached, count=True) for cached in results}
+        print(f"{level:>6} {results[False]:>13.1f} {results[True]:>11.1f} {results[True] / results[False]:>7.2f}x "
+              f"{surfaces[False]:>18} {surfaces[True]:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Startup Benchmark
+
+Time to construct a `RobotronEnv()` in a fresh process with a cold sprite cache (the spritesheet is decoded and
+sliced) versus a warm one (the compiled atlas is mapped from `ROBOTRON_CACHE_DIR`).  Every run is its own Python
+process, like a new worker, and uses a temporary cache directory.  The second env in each process reuses the
+process's config and sprites.
+
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Run in a child process: imports are done before timing so only construction is measured.  `load_graphics`
+# is wrapped to time the sprite loading on its own.  A second env shows the cost once the process has loaded
+# everything.
+CHILD = '''
+import json, time
+import robotron
+from robotron.engine import graphics
+times = {}
+load_graphics = graphics.load_graphics
+def timed_load_graphics():
+    start = time.perf_counter()
+    sprites = load_graphics()
+    times['graphics'] = time.perf_counter() - start
+    return sprites
+graphics.load_graphics = timed_load_graphics
+start = time.perf_counter()
+env = robotron.RobotronEnv()
+times['env'] = time.perf_counter() - start
+start = time.perf_counter()
+env = robotron.RobotronEnv()
+times['second'] = time.perf_counter() - start
+print(json.dumps(times))
+'''
+
+
+def _run(cache_dir: str) -> dict:
+    """ Construct an env in a new process and return its timings. """
+    env = dict(os.environ, ROBOTRON_CACHE_DIR=cache_dir, SDL_VIDEODRIVER='dummy')
+    output = subprocess.run([sys.executable, '-c', CHILD], env=env, capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RobotronEnv construction time, cold vs warm sprite cache')
+    parser.add_argument('--runs', type=int, default=10, help='Processes to start for each')
+    args = parser.parse_args()
+
+    results = {'cold': [], 'warm': []}
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            results['cold'].append(_run(cache_dir))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _run(cache_dir)
+        for _ in range(args.runs):
+            results['warm'].append(_run(cache_dir))
+
+    print(f"{'cache':>6} {'env ms':>8} {'graphics ms':>12} {'second env ms':>14}   (median of {args.runs} processes)")
+    for (name, runs) in results.items():
+        (env_ms, graphics_ms, second_ms) = (statistics.median(run[key] for run in runs) * 1000
+                                            for key in ('env', 'graphics', 'second'))
+        print(f"{name:>6} {env_ms:>8.1f} {graphics_ms:>12.1f} {second_ms:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark Suite
+
+Steps/sec and per-step latency percentiles for representative waves in each mode: a headless pixel env, a
+state-only ('entities') env and a `RobotronVectorEnv`.  God mode is on so every wave stays in play, and actions
+are random but seeded.  Results can be saved to JSON and compared with an earlier run; the run fails (exit
+status 1) if any case's steps/sec drops by more than the threshold.
+
+Waves: 1 (grunts), 5 (brains), 7 (hulks and quarks, which spawn tanks), 9 and 39 (grunt swarms), 14 (hulks),
+24 (sphereoids and quarks).
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --output after.json --baseline before.json --threshold 0.1
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pygame
+
+from robotron import RobotronEnv, RobotronVectorEnv
+
+WAVES = (1, 5, 7, 9, 14, 24, 39)
+MODES = ('pixels', 'entities', 'vector')
+
+
+def _make(mode: str, wave: int, num_envs: int):
+    """ Make the env for a case. """
+    if mode == 'vector':
+        return RobotronVectorEnv(num_envs, level=wave, godmode=True, copy=False)
+    return RobotronEnv(level=wave, godmode=True, observation_type=mode, copy_obs=False)
+
+
+def run_case(mode: str, wave: int, steps: int, warmup: int, num_envs: int = 8) -> Dict[str, float]:
+    """
+    Time one case.
+
+    args:
+        mode (str): One of `MODES`.
+        wave (int): The level to play.
+        steps (int): Steps to time.
+        warmup (int): Untimed steps first.
+        num_envs (int): Engines in the vector env.
+
+    returns:
+        Dict[str, float]: Env 'steps_per_sec' (each vector step counts as `num_envs`), and the 'p50_us',
+            'p90_us', 'p99_us' and 'max_us' latency of a step (a whole vector step for the vector env).
+    """
+    env = _make(mode, wave, num_envs)
+    env.reset(seed=0)
+    env.action_space.seed(0)
+    actions = [env.action_space.sample() for _ in range(warmup + steps)]
+    for action in actions[:warmup]:
+        env.step(action)
+
+    latencies = np.empty(steps)
+    start = time.perf_counter()
+    for (i, action) in enumerate(actions[warmup:]):
+        step_start = time.perf_counter()
+        env.step(action)
+        latencies[i] = time.perf_counter() - step_start
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    (p50, p90, p99) = np.percentile(latencies, [50, 90, 99]) * 1e6
+    return {
+        'steps_per_sec': (num_envs if mode == 'vector' else 1) * steps / elapsed,
+        'p50_us': p50,
+        'p90_us': p90,
+        'p99_us': p99,
+        'max_us': latencies.max() * 1e6,
+    }
+
+
+def _commit() -> Optional[str]:
+    """ The git commit being measured, if there is one. """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    Compare a run with a baseline.
+
+    args:
+        results (Dict[str, dict]): This run's cases.
+        baseline (Dict[str, dict]): The baseline's cases.  Cases only in one of them are skipped.
+        threshold (float): The fraction of steps/sec a case may lose before it counts as a regression.
+
+    returns:
+        List[str]: The cases that regressed.
+    """
+    regressions = []
+    print(f"\n{'case':<18} {'baseline':>10} {'now':>10} {'change':>8}")
+    for (name, result) in results.items():
+        if name not in baseline:
+            continue
+        (before, now) = (baseline[name]['steps_per_sec'], result['steps_per_sec'])
+        change = now / before - 1
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<18} {before:>10.1f} {now:>10.1f} {change:>+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Robotron benchmark suite')
+    parser.add_argument('--waves', type=int, nargs='+', default=list(WAVES), help='Waves to run')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=MODES, help='Modes to run')
+    parser.add_argument('--steps', type=int, default=500, help='Timed steps per case')
+    parser.add_argument('--warmup', type=int, default=50, help='Untimed steps before each case')
+    parser.add_argument('--num-envs', type=int, default=8, help='Engines in the vector env')
+    parser.add_argument('--repeats', type=int, default=1, help='Runs of each case, the fastest is kept')
+    parser.add_argument('--output', help='Save the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Fraction of steps/sec a case may lose before failing.  Default: 0.1')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<18} {'steps/sec':>10} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'max us':>9}")
+    for mode in args.modes:
+        for wave in args.waves:
+            name = f'{mode}/wave{wave:02}'
+            runs = [run_case(mode, wave, args.steps, args.warmup, args.num_envs) for _ in range(args.repeats)]
+            result = results[name] = max(runs, key=lambda run: run['steps_per_sec'])
+            print(f"{name:<18} {result['steps_per_sec']:>10.1f} {result['p50_us']:>9.0f} {result['p90_us']:>9.0f} "
+                  f"{result['p99_us']:>9.0f} {result['max_us']:>9.0f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding="utf-8") as output_file:
+            json.dump({
+                'meta': {
+                    'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'commit': _commit(),
+                    'python': sys.version.split()[0],
+                    'pygame': pygame.version.ver,
+                    'numpy': np.__version__,
+                    'platform': platform.platform(),
+                    'steps': args.steps,
+                    'warmup': args.warmup,
+                    'num_envs': args.num_envs,
+                },
+                'results': results,
+            }, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Vector Environment Benchmark
+
+Measures the aggregate steps/sec of `RobotronVectorEnv` for a range of env counts.
+
+    python -m benchmarks.vector_env --steps 200 --num-envs 1 8 32 64
+"""
+import argparse
+import time
+
+from robotron import RobotronVectorEnv
+
+
+def run(num_envs: int, steps: int, level: int = 1) -> float:
+    """
+    Run the vector env with random actions.
+
+    args:
+        num_envs (int): The number of engines to run.
+        steps (int): How many vector steps to run.
+        level (int): The level to start on.
+
+    returns:
+        float: Aggregate env steps per second.
+    """
+    envs = RobotronVectorEnv(num_envs, level=level, copy=False)
+    envs.reset(seed=0)
+    envs.action_space.seed(0)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        envs.step(envs.action_space.sample())
+    elapsed = time.perf_counter() - start
+
+    envs.close()
+    return num_envs * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RobotronVectorEnv throughput')
+    parser.add_argument('--steps', type=int, default=200, help='Vector steps per run')
+    parser.add_argument('--level', type=int, default=1, help='Start Level')
+    parser.add_argument('--num-envs', type=int, nargs='+', default=[1, 8, 32, 64], help='Env counts to test')
+    args = parser.parse_args()
+
+    print(f"{'envs':>6} {'steps/sec':>12}")
+    for num_envs in args.num_envs:
+        print(f"{num_envs:>6} {run(num_envs, args.steps, args.level):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
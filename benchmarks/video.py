@@ -0,0 +1,93 @@
+"""
+Video Recording Benchmark
+
+Steps/sec of an evaluation loop that records every frame, against not recording at all:
+
+- sync: `Engine.get_image()` encoded to a PNG file inside the loop, the way recording was done before.
+- png/raw: `RobotronEnv.start_video()` of the play area, which copies the frame into a ring buffer slot and leaves
+    encoding and writing to a worker thread.
+- screen: PNGs of the whole screen like sync, on the worker.
+- png/2: PNGs of the play area downsampled by 2, on the worker.
+
+Frames are dropped instead of waiting when the worker is behind, so the frames written and dropped are reported too.
+On a machine with a single core the worker can only use the time the loop leaves it.  God mode is on so the level
+stays in play.
+
+    python -m benchmarks.video --levels 1 9 --steps 1000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from robotron import RobotronEnv
+from robotron.utils.video import encode_png
+
+MODES = {
+    'png': {'video_format': 'png'},
+    'raw': {'video_format': 'raw'},
+    'screen': {'video_format': 'png', 'play_area_only': False},
+    'png/2': {'video_format': 'png', 'downsample': 2},
+}
+
+
+def run(level: int, steps: int, mode: str, path: str) -> tuple:
+    """
+    Play random actions while recording.
+
+    args:
+        level (int): The level to play.
+        steps (int): How many steps to play.
+        mode (str): 'off', 'sync' or a key of `MODES`.
+        path (str): Where to record to.
+
+    returns:
+        (float, int, int): Steps per second, and the frames written and dropped.
+    """
+    env = RobotronEnv(level=level, godmode=True, info_mode='none', copy_obs=False)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(env.action_space.n, size=steps)
+    if mode in MODES:
+        env.start_video(path if MODES[mode]['video_format'] == 'png' else path + '.rgb', **MODES[mode])
+    elif mode == 'sync':
+        os.makedirs(path)
+
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for (number, action) in enumerate(actions):
+        env.step(int(action))
+        if mode == 'sync':
+            with open(os.path.join(path, f'frame-{number:06d}.png'), 'wb') as f:
+                f.write(encode_png(env.engine.get_image()))
+    elapsed = time.perf_counter() - start
+
+    stats = env.stop_video()
+    if stats is None:
+        return (steps / elapsed, steps if mode == 'sync' else 0, 0)
+    return (steps / elapsed, stats['written'], stats['dropped'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Background frame recording versus recording in the loop')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 9], help='Levels to run')
+    parser.add_argument('--steps', type=int, default=1000, help='Steps per run')
+    args = parser.parse_args()
+
+    modes = ['off', 'sync'] + list(MODES)
+    print(f"{'level':>6} {'mode':>6} {'steps/sec':>10} {'written':>8} {'dropped':>8}")
+    root = tempfile.mkdtemp(prefix='robotron-video-')
+    try:
+        for level in args.levels:
+            for mode in modes:
+                path = os.path.join(root, f"{level}-{mode.replace('/', '')}")
+                (speed, written, dropped) = run(level, args.steps, mode, path)
+                print(f"{level:>6} {mode:>6} {speed:>10.1f} {written:>8} {dropped:>8}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -170,7 +170,8 @@ class Input():
         )
 
 
-def main(level: int = 1, lives: int = 3, fps: int = 30, godmode: bool = False):
+def main(level: int = 1, lives: int = 3, fps: int = 30, godmode: bool = False, record: str = None,
+         dataset: str = None, compression: str = 'zlib'):
     """
     Run the robotron environment for a human to play.add()
 
@@ -178,10 +179,17 @@ def main(level: int = 1, lives: int = 3, fps: int = 30, godmode: bool = False):
         level (int): The level to start on
         fps (int): The fps to run the engine at (passed to pygame)
         godmode (bool): Enable godmode (no deaths)
+        record (str): Save a replay of every game to this directory
+        dataset (str): Save every step (frame, action, reward, ...) to a trajectory dataset in this directory
+        compression (str): How to compress the dataset: 'zlib', 'lz4' or None
     """
     print("FPS: ", fps)
     env = RobotronEnv(level=level, lives=lives, fps=fps, godmode=godmode, headless=False)
     user_input = Input()
+    if record:
+        env.start_recording(record, keyframe_interval=1000)
+    if dataset:
+        env.start_dataset(dataset, compression=compression)
 
     env.reset()
     try:
@@ -200,6 +208,10 @@ def main(level: int = 1, lives: int = 3, fps: int = 30, godmode: bool = False):
     except KeyboardInterrupt:
         print("Interrupt detected.  Exiting...")
 
+    if record:
+        env.stop_recording()
+    if dataset:
+        env.stop_dataset()
     print("Goodbye!")
 
 
@@ -209,6 +221,11 @@ if __name__ == "__main__":
     parser.add_argument('--lives', type=int, default=3, help='Lives')
     parser.add_argument('--fps', type=int, default=30, help='FPS')
     parser.add_argument('--godmode', action='store_true', help='Enable GOD Mode (Can\'t die.)')
+    parser.add_argument('--record', metavar='DIR', help='Save a replay of every game to this directory')
+    parser.add_argument('--dataset', metavar='DIR', help='Save every step to a trajectory dataset in this directory')
+    parser.add_argument('--dataset-compression', default='zlib', choices=['zlib', 'lz4', 'none'],
+                        help='Compression of the dataset chunks')
 
     args = parser.parse_args()
-    main(args.level, args.lives, args.fps, args.godmode)
+    compression = None if args.dataset_compression == 'none' else args.dataset_compression
+    main(args.level, args.lives, args.fps, args.godmode, args.record, args.dataset, compression)
@@ -1,2 +1,3 @@
 """Module Init"""
 from .robotron import RobotronEnv
+from .vector import RobotronVectorEnv, AsyncRobotronVectorEnv
@@ -1 +1,3 @@
 from .engine import Engine
+from .entity_table import EntityTable, ENTITY_TYPES, ENTITY_TYPE_IDS
+from .snapshot import EngineState
@@ -0,0 +1,303 @@
+"""Batched updates for the simple sprites that show up in large numbers (grunts, hulks and family)."""
+from typing import Dict, List
+
+import pygame
+
+from .entities import Daddy, Grunt, Hulk, Mikey, Mommy
+
+
+class SpriteBatch:
+    """
+    Updates every sprite of one class together, in place of each sprite's own `update()`.
+
+    Subclasses implement `update()`.  Sprites are kept in the order they were added.
+    """
+
+    def __init__(self, engine):
+        """
+        args:
+            engine (Engine): The engine the sprites belong to.
+        """
+        self.engine = engine
+        self._sprites: Dict[pygame.sprite.Sprite, None] = {}
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    @property
+    def sprites(self) -> List[pygame.sprite.Sprite]:
+        """ The batched sprites, in the order they were added. """
+        return list(self._sprites)
+
+    def add(self, sprite: pygame.sprite.Sprite):
+        """
+        Start batching a sprite.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite entering play.
+        """
+        self._sprites[sprite] = None
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """
+        Stop batching a sprite.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite leaving play.
+        """
+        self._sprites.pop(sprite, None)
+
+    def load(self):
+        """ Read in any state the batch keeps for the sprites, after something else changed it. """
+
+    def store(self):
+        """ Write any state the batch keeps back onto the sprites. """
+
+    def get_state(self) -> tuple:
+        """ Copy the batch's bookkeeping, for `Engine.get_state()`. """
+        return (dict(self._sprites),)
+
+    def set_state(self, state: tuple):
+        """ Put the batch's bookkeeping back the way `get_state()` found it. """
+        (sprites,) = state
+        self._sprites = dict(sprites)
+
+    def update(self):
+        """ Update every sprite in the batch by one tick. """
+        raise NotImplementedError()
+
+
+class CountdownBatch(SpriteBatch):
+    """
+    Updates every sprite of one class that follows the countdown pattern of `Grunt.update()`: wait
+    `move_countdown` ticks, `move()`, then wait a random `move_delay` again.
+
+    Instead of calling `update()` on each sprite every tick just to decrement its countdown, the batch files each
+    sprite under the tick it next moves on.  A tick then only touches the sprites that move on it (on average one
+    in fifteen grunts), so the cost of a tick no longer grows with the size of the wave.  Each move is still the
+    sprite's own `move()`, so the sprites behave exactly as they do on their own.
+
+    While a sprite is batched its `move_countdown` attribute is stale.  `store()` writes the real countdowns back
+    and `load()` reads them in again after something else changed them (like `reset()`).
+    """
+
+    def __init__(self, engine):
+        """
+        args:
+            engine (Engine): The engine the sprites belong to.
+        """
+        super().__init__(engine)
+        self._tick = 0
+        self._due: Dict[int, List[pygame.sprite.Sprite]] = {}
+        self._scheduled: Dict[pygame.sprite.Sprite, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    @property
+    def sprites(self) -> List[pygame.sprite.Sprite]:
+        """ The batched sprites, in the order they were added. """
+        return list(self._scheduled)
+
+    def _schedule(self, sprite: pygame.sprite.Sprite, tick: int):
+        """ File the sprite under the tick it moves on. """
+        self._scheduled[sprite] = tick
+        if tick in self._due:
+            self._due[tick].append(sprite)
+        else:
+            self._due[tick] = [sprite]
+
+    def add(self, sprite: pygame.sprite.Sprite):
+        """
+        Start batching a sprite.  It moves once its current `move_countdown` runs out.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite entering play.
+        """
+        self._schedule(sprite, self._tick + max(sprite.move_countdown, 0))
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """
+        Stop batching a sprite.  It is skipped when its tick comes around.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite leaving play.
+        """
+        self._scheduled.pop(sprite, None)
+
+    def load(self):
+        """ Reschedule every sprite from its `move_countdown` attribute. """
+        sprites = self.sprites
+        self._due = {}
+        self._scheduled = {}
+        for sprite in sprites:
+            self.add(sprite)
+
+    def store(self):
+        """ Write the real countdowns back onto the sprites. """
+        for (sprite, tick) in self._scheduled.items():
+            sprite.move_countdown = tick - self._tick
+
+    def get_state(self) -> tuple:
+        """ Copy the schedule, for `Engine.get_state()`. """
+        return (self._tick, dict(self._scheduled), {tick: list(due) for (tick, due) in self._due.items()})
+
+    def set_state(self, state: tuple):
+        """ Put the schedule back the way `get_state()` found it. """
+        (tick, scheduled, due) = state
+        self._tick = tick
+        self._scheduled = dict(scheduled)
+        self._due = {tick: list(sprites) for (tick, sprites) in due.items()}
+
+    def update(self):
+        """ Move the sprites that are due this tick and schedule their next move. """
+        tick = self._tick
+        self._tick += 1
+
+        due = self._due.pop(tick, None)
+        if not due:
+            return
+
+        scheduled = self._scheduled
+        for sprite in due:
+            # Skip sprites that left play (or were rescheduled) since they were filed.
+            if scheduled.get(sprite) != tick:
+                continue
+            sprite.move()
+            # The countdown restarts at the delay and the sprite moves once it has counted down to zero.
+            self._schedule(sprite, tick + self.engine.random.randrange(*sprite.move_delay) + 1)
+
+
+class HulkBatch(CountdownBatch):
+    """
+    Hulks move like grunts but also trample any family member they touch, every tick.
+    """
+
+    def update(self):
+        super().update()
+
+        family_group = self.engine.family_group
+        if not family_group:
+            return
+
+        spritecollide = self.engine.spatial.spritecollide
+        for hulk in self.sprites:
+            for sprite in spritecollide(hulk, family_group):
+                sprite.die(hulk)
+
+
+class FamilyBatch(SpriteBatch):
+    """
+    Family members animate every tick and walk every `move_delay` ticks.  They don't check for hulks themselves:
+    `HulkBatch` already tests every hulk against every family member each tick.
+    """
+
+    def update(self):
+        sprites = self.sprites
+        if not sprites:
+            return
+
+        moving = self.engine.frame % sprites[0].move_delay == 0
+        for sprite in sprites:
+            sprite.update_animation()
+            if moving:
+                sprite.move()
+
+
+class BatchedUpdater:
+    """
+    Replaces `all_group.update()` when the engine runs with `batched=True`.
+
+    Listens to `all_group`: grunts, hulks and family members are handed to their `SpriteBatch` and everything else
+    is updated one sprite at a time, in the order it entered play, just like `Group.update()`.  The batches run
+    after the other sprites, so the order of updates (and random numbers) within a tick differs from the sprite
+    path.  Games played with the same inputs diverge, but every sprite behaves the same, so the game's statistics
+    don't change.
+    """
+
+    def __init__(self, engine):
+        """
+        Setup the batches.
+
+        args:
+            engine (Engine): The engine to update.
+        """
+        family = FamilyBatch(engine)
+        self.batches: Dict[type, SpriteBatch] = {
+            Grunt: CountdownBatch(engine),
+            Hulk: HulkBatch(engine),
+            Mommy: family,
+            Daddy: family,
+            Mikey: family,
+        }
+        self._unique_batches: List[SpriteBatch] = list(dict.fromkeys(self.batches.values()))
+        self._others: Dict[pygame.sprite.Sprite, None] = {}
+
+    def add(self, sprite: pygame.sprite.Sprite):
+        """ Called by `all_group` when a sprite is added. """
+        batch = self.batches.get(type(sprite))
+        if batch is None:
+            self._others[sprite] = None
+        else:
+            batch.add(sprite)
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """ Called by `all_group` when a sprite is removed or killed. """
+        batch = self.batches.get(type(sprite))
+        if batch is None:
+            self._others.pop(sprite, None)
+        else:
+            batch.remove(sprite)
+
+    def load(self):
+        """ Reschedule the batched sprites from their attributes (after they were all reset). """
+        for batch in self._unique_batches:
+            batch.load()
+
+    def store(self):
+        """ Write the batched state back onto the sprites. """
+        for batch in self._unique_batches:
+            batch.store()
+
+    def get_state(self) -> tuple:
+        """
+        Copy the bookkeeping of every batch, for `Engine.get_state()`.
+
+        returns:
+            tuple: The other sprites and the state of each batch.
+        """
+        return (list(self._others), [batch.get_state() for batch in self._unique_batches])
+
+    def set_state(self, state: tuple):
+        """
+        Put every batch back the way `get_state()` found it.
+
+        args:
+            state (tuple): The copy from `get_state()`.
+        """
+        (others, batches) = state
+        self._others = dict.fromkeys(others)
+        for (batch, batch_state) in zip(self._unique_batches, batches):
+            batch.set_state(batch_state)
+
+    def reload(self, sprites: List[pygame.sprite.Sprite]):
+        """
+        Empty the batches and add each sprite again, scheduled from its attributes.
+
+        args:
+            sprites (List[pygame.sprite.Sprite]): The sprites in play.
+        """
+        self._others = {}
+        for batch in self._unique_batches:
+            for sprite in batch.sprites:
+                batch.remove(sprite)
+            batch.load()
+        for sprite in sprites:
+            self.add(sprite)
+
+    def update(self):
+        """ Update every sprite in play by one tick. """
+        for sprite in list(self._others):
+            sprite.update()
+        for batch in self._unique_batches:
+            batch.update()
@@ -1,7 +1,64 @@
 """ Configuration file for Robotron. """
+import hashlib
+import json
+import os
 from os import path
+from typing import Any, Dict, Tuple
+
 import yaml
 
+# Parsed configs, by path and modification time, shared by every engine in the process.
+_configs: Dict[Tuple[str, float], 'Config'] = {}
+
+# Top level keys that aren't entity settings.
+GAME_KEYS = ('screen_size', 'play_area', 'resource_path', 'waves', 'extra_life_score')
+
+
+class EntityConfig:
+    """
+    The settings of one entity type (like `grunt`), checked once when the config is loaded.  Sprites read them
+    with `get()` (through `Base.config()`), a lookup in this section's own dict instead of the raw YAML tree.
+    Configs are shared by every engine in the process, so nothing changes the settings after loading.
+    """
+
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        """
+        Check the settings.
+
+        args:
+            name (str): The entity's section in the config.
+            settings (Dict[str, Any]): The section.
+
+        raises:
+            ValueError: A setting isn't a number, a bool or a list of numbers.
+        """
+        self.name = name
+        for (key, value) in settings.items():
+            values = value if isinstance(value, list) else [value]
+            if not all(isinstance(item, (int, float)) for item in values):
+                raise ValueError(f'Invalid config value for {name}.{key}: {value!r}')
+        self.settings = dict(settings)
+        self.warned = set()  # Missing settings that were already reported.
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a setting.  A missing setting is reported the first time it is asked for, and always gives the
+        caller's default.
+
+        args:
+            key (str): The setting.
+            default (Any): The value to use if the config doesn't have it.
+
+        returns:
+            Any: The setting.
+        """
+        if key in self.settings:
+            return self.settings[key]
+        if key not in self.warned:
+            self.warned.add(key)
+            print(f"Warning: Missing config key for {self.name}: {key}")
+        return default
+
 
 class Config:
     """ Load and manage the configuration file. """
@@ -12,6 +69,47 @@ class Config:
 
         with open(config_path, 'r') as f:
             self.config = yaml.load(f, Loader=yaml.FullLoader)
+        # Identifies the settings (not the file's formatting), so replays can check they play under the same rules.
+        self.digest = hashlib.sha1(json.dumps(self.config, sort_keys=True).encode()).hexdigest()
+
+        self.entities = {key: EntityConfig(key, value) for (key, value) in self.config.items()
+                         if key not in GAME_KEYS and isinstance(value, dict)}
 
     def get(self, key):
         return self.config[key] if key in self.config else None
+
+    def entity(self, name: str) -> EntityConfig:
+        """
+        Get the settings of an entity type.  Types without a section get an empty one.
+
+        args:
+            name (str): The entity's section, like 'grunt'.
+
+        returns:
+            EntityConfig: The settings.
+        """
+        if name not in self.entities:
+            self.entities[name] = EntityConfig(name, {})
+        return self.entities[name]
+
+
+def get_config(config_path: str = None) -> Config:
+    """
+    Get a config, parsed once per process.  The file is parsed again if it changed since.  Configs are shared
+    by every engine, so treat them as read only.
+
+    args:
+        config_path (str): Path to the YAML config.  Defaults to the bundled `config.yaml`.
+
+    returns:
+        Config: The parsed config.
+    """
+    if config_path is None:
+        config_path = path.join(path.dirname(__file__), "config.yaml")
+    config_path = path.abspath(config_path)
+    key = (config_path, os.stat(config_path).st_mtime)
+    if key not in _configs:
+        for stale in [stale for stale in _configs if stale[0] == config_path]:
+            del _configs[stale]
+        _configs[key] = Config(config_path)
+    return _configs[key]
@@ -1,14 +1,23 @@
 # -*- coding: utf-8 -*-
 """The Robotron Game Engine"""
 import math
-import os
-from typing import List, Tuple
+import random
+from typing import Callable, List, Tuple
 
+import numpy as np
 import pygame
 
-from .config import Config
-from .graphics import load_graphics
+from .batch import BatchedUpdater
+from .config import get_config
+from .graphics import get_font, get_graphics, get_variants, new_surface, tint
 from .entities import Player, Mommy, Daddy, Mikey, Grunt, Electrode, Hulk, Sphereoid, Quark, Brain
+from .entity_table import EntityTable, TrackedGroup
+from .particles import Particles
+from .perf import PerfStats
+from .pool import SpritePool
+from .raster import NumpyRenderer
+from .snapshot import EngineState, capture, restore
+from .spatial import BruteForceIndex, SpatialIndex
 
 
 class Engine:
@@ -21,6 +30,10 @@ class Engine:
         rewards.
     """
 
+    # Past this many changed regions the screen is updated with one copy of the whole play area.
+    MAX_DIRTY_RECTS = 64
+    RENDERERS = ('pygame', 'numpy')
+
     def __init__(self,
                  start_level: int = 1,
                  lives: int = 3,
@@ -28,8 +41,16 @@ class Engine:
                  config_path: str = None,
                  godmode: bool = False,
                  headless: bool = False,
-                 seed: int = None):
+                 seed: int = None,
+                 render: bool = True,
+                 spatial_index: bool = True,
+                 batched: bool = False,
+                 renderer: str = 'pygame',
+                 sprite_pool: bool = True):
+        if renderer not in self.RENDERERS:
+            raise ValueError(f'Invalid renderer: {renderer}')
         self.godmode = godmode
+        self.render = render  # When False, skip drawing and image capture entirely.
         self.start_level = start_level - 1
         self.level = self.start_level
         self.start_lives = lives
@@ -40,32 +61,72 @@ class Engine:
         self.extra_lives = 0
         self.done = False
         self.frame = 0
+        # Every random number in the game comes from here, so engines sharing a process don't disturb each other
+        # and a seed plus the same inputs replays the same game.
+        self.random = random.Random(seed)
 
-        self.config = Config(config_path)
-
-        pygame.init()
-        pygame.display.set_caption('Robotron 2084')
+        self.config = get_config(config_path)
+        self.headless = headless
 
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 30)
+        self.font = None  # Loaded the first time the text info is drawn.
 
         screen_size = self.config.get('screen_size')
         if headless:
-            print("Using dummy video driver.")
-            os.environ["SDL_VIDEODRIVER"] = "dummy"
-            # screen_size = (1, 1)
-
-        self.screen = pygame.display.set_mode(screen_size)
-        self.graphics = load_graphics()
+            # Each headless engine draws to its own off-screen surface so many engines can share a process.  No
+            # display (or any other part of SDL) is started; sprites are kept in pygame's default pixel format
+            # instead of the display's (see `graphics.new_surface`), so it runs without any SDL video support.
+            self.screen = new_surface(screen_size)
+        else:
+            pygame.init()
+            pygame.display.set_caption('Robotron 2084')
+            self.screen = pygame.display.set_mode(screen_size)
+        self.graphics = get_graphics()
+        self.variants = get_variants()
 
         self.play_area = self.config.get('play_area')
         (top, left, bottom, right) = self.play_area
         self.play_rect = pygame.Rect(left, top, right - left, bottom - top)
 
-        self.family_group = pygame.sprite.Group()  # Enemies and their bullets.
-        self.enemy_group = pygame.sprite.Group()  # Enemies and their bullets.
+        # The play area is drawn onto its own surface backed by a numpy buffer.  That buffer is the observation,
+        # so reading it needs no full screen copy, axis swap or crop.
+        self.play_buffer = np.zeros((self.play_rect.height, self.play_rect.width, 3), dtype=np.uint8)
+        self.play_surface = pygame.image.frombuffer(self.play_buffer, self.play_rect.size, 'RGB')
+        self.play_view = self.play_buffer.view()
+        self.play_view.flags.writeable = False
+        # With the numpy renderer the play area is composited straight into the buffer instead of blitted.
+        self.renderer = renderer
+        self.rasterizer = None
+        if renderer == 'numpy':
+            self.rasterizer = NumpyRenderer(self.play_rect.size, self.play_rect.topleft, out=self.play_buffer)
+        # The max-pooled image for `step(max_pool=True)`.  Allocated on first use.
+        self.pool_buffer = None
+        self.pool_view = None
+        # The window is updated incrementally (see `_update_screen`): the (image, rect) each sprite had when the
+        # screen was last brought up to date, or None to redraw all of it.  The HUD text is only rendered again
+        # when what it shows changes.
+        self.screen_sprites = None
+        self.screen_particles = None
+        self.hud_key = None
+        self.hud = None
+        self.hud_rect = None
+
+        self.family_group = TrackedGroup()  # Family members.
+        self.enemy_group = TrackedGroup()  # Enemies and their bullets.
         self.to_kill_group = pygame.sprite.Group()  # Enemies that need to die to advance the level.
-        self.all_group = pygame.sprite.Group()  # All sprites on screen.
+        self.all_group = TrackedGroup()  # All sprites on screen.
+        # Used for all sprite collision checks.  The brute force index checks every sprite like pygame does.
+        index_type = SpatialIndex if spatial_index else BruteForceIndex
+        self.spatial = index_type(self.all_group, self.enemy_group, self.family_group)
+        # Opt in: grunts and hulks are only updated on the ticks they move (see `BatchedUpdater`).
+        self.batch = None
+        if batched:
+            self.batch = BatchedUpdater(self)
+            self.all_group.listeners.append(self.batch)
+        # Bullets, shells and missiles are recycled when they are killed instead of constructed again.
+        self.sprite_pool = SpritePool(self, sprite_pool)
+        # Trails, after-images, points and skulls.  Only kept when they will be drawn.
+        self.particles = Particles(enabled=render)
         self.waves = self.config.get('waves')
         self.to_kill_group_types = ['Grunt', 'Sphereoid', 'Enforcer', 'Brain', 'Quark', 'Tank']
         self.enemies = ['grunt', 'electrode', ]
@@ -74,6 +135,8 @@ class Engine:
         self.player = None
         self.player_box = None
         self.family_collected = 0
+        self.entity_table = None
+        self.perf = None  # Opt in step timers and counters (see `enable_perf`).
 
         self._initialize_level()
 
@@ -100,6 +163,7 @@ class Engine:
         """
         for sprite in self.all_group:
             sprite.kill()
+        self.particles.clear()
 
         self.player = Player(self)
         self._add_sprite(self.player)
@@ -198,6 +262,39 @@ class Engine:
         """
         return [self.graphics[name] for name in sprite_names]
 
+    def _get_variant(self, key: tuple, draw: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """
+        Get a sprite that is drawn at runtime.  It is only drawn the first time any engine in the process needs it.
+
+        Args:
+            key (tuple): Identifies the image, like `('bullet', direction)`.
+            draw (Callable[[], pygame.Surface]): Draws the image.
+
+        Returns:
+            pygame.Surface: The image.  Shared, so never change it.
+        """
+        image = self.variants.get(key)
+        if image is None:
+            image = self.variants[key] = draw()
+        return image
+
+    def _get_tinted(self, image: pygame.Surface, color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Get the programming flash of one of the graphics (see `graphics.tint`).
+
+        Args:
+            image (pygame.Surface): One of `self.graphics`.  They live as long as the process, so the id is a key.
+            color (Tuple[int, int, int]): The flash color.
+
+        Returns:
+            pygame.Surface: The image.  Shared, so never change it.
+        """
+        key = ('tint', id(image), color)
+        tinted = self.variants.get(key)
+        if tinted is None:
+            tinted = self.variants[key] = tint(image, color)
+        return tinted
+
     def _get_player_box(self):
         """
         Safe area around player to not place enemies on load.
@@ -217,12 +314,23 @@ class Engine:
         self.screen.fill((0, 0, 0))
         pygame.draw.rect(self.screen, [238, 5, 8], self.play_rect.inflate(15, 15), 5)
 
-    def _add_info(self):
-        """ Add the text info for human consumption.  Does not replicate the original game. """
-        text = self.font.render(
-            f'Score: {self.score} Level: {self.level + 1} Lives: {self.lives} {"GAME OVER" if self.done else ""}',
-            True, (255, 255, 255), (0, 0, 0))
-        self.screen.blit(text, (self.play_rect.x, self.play_rect.y - 40))
+    def _add_info(self) -> pygame.Rect:
+        """
+        Add the text info for human consumption.  Does not replicate the original game.
+
+        Returns:
+            pygame.Rect: Where the text was drawn.
+        """
+        key = (self.score, self.level, self.lives, self.done)
+        if key != self.hud_key:
+            if self.font is None:
+                self.font = get_font(30)
+            self.hud_key = key
+            self.hud = self.font.render(
+                f'Score: {self.score} Level: {self.level + 1} Lives: {self.lives} {"GAME OVER" if self.done else ""}',
+                True, (255, 255, 255), (0, 0, 0))
+        self.hud_rect = self.screen.blit(self.hud, (self.play_rect.x, self.play_rect.y - 40))
+        return self.hud_rect
 
     def _add_sprite(self, sprite: pygame.sprite):
         """
@@ -262,8 +370,51 @@ class Engine:
         The allmighty update loops. Triggers the world update.
 
         """
-        pygame.event.pump()
-        self.clock.tick(self.fps)
+        self._tick()
+        return self._finish_step()
+
+    def step(self, move: int, shoot: int, frames: int = 1, max_pool: bool = False):
+        """
+        Play the same input for several frames and only draw once at the end (frame skip / action repeat).
+
+        Args:
+            move (int): The movement direction (see `handle_input`).
+            shoot (int): The shooting direction.
+            frames (int, optional): How many frames to play.  Stops early if the game ends.  Defaults to 1.
+            max_pool (bool, optional): Return the pixelwise max of the last two frames, so sprites that flicker
+                between frames aren't lost.  Draws the second to last frame as well.  Defaults to False.
+
+        Returns:
+            Tuple: The same as `update()`.  The image is a read-only view that is overwritten by the next step.
+        """
+        pooled = False
+        for frame in range(frames):
+            self.handle_input(move, shoot)
+            self._tick()
+            if self.done:
+                break
+            if max_pool and self.render and frame == frames - 2:
+                self._draw_play_area()
+                if self.pool_buffer is None:
+                    self.pool_buffer = np.empty_like(self.play_buffer)
+                    self.pool_view = self.pool_buffer.view()
+                    self.pool_view.flags.writeable = False
+                np.copyto(self.pool_buffer, self.play_buffer)
+                pooled = True
+
+        result = self._finish_step()
+        if pooled and result[0] is not None:
+            np.maximum(self.play_buffer, self.pool_buffer, out=self.pool_buffer)
+            result = (self.pool_view,) + result[1:]
+        return result
+
+    def _tick(self):
+        """ Play one frame of the game, without drawing it. """
+        # Headless engines have no events to pump, and only keep time when running at a set frame rate.
+        if not self.headless:
+            pygame.event.pump()
+        if self.fps or not self.headless:
+            self.clock.tick(self.fps)
         self.frame += 1
 
         # You start the game with 3 men and receive and additional man for every 25,000 points you get.
@@ -273,15 +424,24 @@ class Engine:
                 self.extra_lives += 1
 
         if not self.done:
-            self.all_group.update()
+            self.particles.age()
+            if self.perf is not None:
+                self.perf.update_sprites()
+            elif self.batch is None:
+                self.all_group.update()
+            else:
+                self.batch.update()
 
             # Check to see if we hit an enemy
-            if not self.godmode and pygame.sprite.spritecollide(self.player, self.enemy_group, False):
+            if not self.godmode and self.spatial.collides(self.player, self.enemy_group):
                 self.family_collected = 0
                 if self.lives > 0:
                     self.lives -= 1
                     for sprite in self.all_group:
                         sprite.reset()
+                    self.particles.clear()
+                    if self.batch is not None:
+                        self.batch.load()
                 else:
                     self.done = True
 
@@ -289,17 +449,97 @@ class Engine:
                 self.level += 1
                 self._initialize_level()
 
-        self.draw()
-        image = self.get_image()
+        self.sprite_pool.recycle()
+
+    def _finish_step(self):
+        """ Refresh the observations once the frames of a step have been played. """
+        if self.entity_table is not None:
+            self.entity_table.refresh()
+
+        image = None
+        if self.render:
+            self.draw()
+            image = self.play_view
 
         return (image, self.score, self.lives, self.level, self.done)
 
     def draw(self):
-        """ Paint the window. """
+        """ Paint the play area, and the window if we have one. """
+        self._draw_play_area()
+        if not self.headless:
+            pygame.display.update(self._update_screen())
+
+    def _draw_play_area(self):
+        """ Draw all sprites onto the play area surface. """
+        if self.rasterizer is not None:
+            self.rasterizer.draw(self.all_group, self.particles)
+            return
+        (offset_x, offset_y) = self.play_rect.topleft
+        self.play_surface.fill((0, 0, 0))
+        blits = [(sprite.image, sprite.rect.move(-offset_x, -offset_y)) for sprite in self.all_group]
+        if self.particles:
+            blits.extend((image, (x - offset_x, y - offset_y)) for (image, x, y) in self.particles)
+        self.play_surface.blits(blits, False)
+
+    def _draw_screen(self):
+        """ Compose the full screen from the background, the play area and the text info. """
         self._add_background()
+        self.screen.blit(self.play_surface, self.play_rect)
         self._add_info()
-        self.all_group.draw(self.screen)
-        pygame.display.update()
+        self.screen_sprites = {sprite: (sprite.image, tuple(sprite.rect)) for sprite in self.all_group}
+        self.screen_particles = set(self.particles.rects())
+
+    def _update_screen(self) -> List[pygame.Rect]:
+        """
+        Bring the screen up to date with the play area, redrawing only what changed since it was last drawn.
+        The regions of sprites that moved, changed image, appeared or disappeared, and of particles that came or
+        went, are copied from the play area (which `_draw_play_area` has already drawn), and the HUD only if its
+        text changed.  The first time (and after `set_state`, which can change the order sprites are drawn in) the
+        whole screen is drawn.
+
+        Returns:
+            List[pygame.Rect]: The changed parts of the screen, for `pygame.display.update`.
+        """
+        previous = self.screen_sprites
+        if previous is None:
+            self._draw_screen()
+            return [self.screen.get_rect()]
+
+        dirty = []
+        current = {}
+        for sprite in self.all_group:
+            state = (sprite.image, tuple(sprite.rect))
+            current[sprite] = state
+            old = previous.pop(sprite, None)
+            if old != state:
+                dirty.append(sprite.rect)
+                if old is not None:
+                    dirty.append(old[1])
+        # Whatever is left was removed.
+        dirty.extend(state[1] for state in previous.values())
+        self.screen_sprites = current
+        # Particles never move, they only come and go.
+        particles = set(self.particles.rects())
+        dirty.extend(rect for (_, rect) in particles.symmetric_difference(self.screen_particles))
+        self.screen_particles = particles
+
+        play_rect = self.play_rect
+        if len(dirty) > self.MAX_DIRTY_RECTS:
+            dirty = [play_rect]
+        (offset_x, offset_y) = play_rect.topleft
+        updated = []
+        for rect in dirty:
+            rect = play_rect.clip(rect)
+            if rect:
+                self.screen.blit(self.play_surface, rect, rect.move(-offset_x, -offset_y))
+                updated.append(rect)
+
+        if (self.score, self.level, self.lives, self.done) != self.hud_key:
+            old_rect = self.hud_rect
+            self.screen.fill((0, 0, 0), old_rect)
+            updated.append(old_rect.union(self._add_info()))
+
+        return updated
 
     def family_remaining(self):
         """
@@ -313,27 +553,59 @@ class Engine:
     def get_sprite_data(self) -> List[Tuple[int, int, str]]:
         """
         Get the data for all meaningful sprites.  Includes players, bullets, and enemies.
-        We skip floaters since those are just trails or points and can't be interacted with.
 
         Returns:
             List[Tuple[int, int, str]]: A list of tuples of (x, y, sprite_name).
         """
         (top, left, _, _) = self.play_area
 
-        data = []
-        for enemy in self.all_group:
-            if enemy.__class__.__name__ != 'Floater':
-                data.append((enemy.rect.x - left, enemy.rect.y - top, enemy.__class__.__name__))
+        return [(sprite.rect.x - left, sprite.rect.y - top, sprite.__class__.__name__) for sprite in self.all_group]
 
-        return data
+    def track_entities(self, max_entities: int) -> EntityTable:
+        """
+        Start keeping an `EntityTable` of the sprites in play.  It is refreshed at the end of every update.
+
+        Args:
+            max_entities (int): The number of rows in the table.  Only used the first time this is called.
+
+        Returns:
+            EntityTable: The engine's entity table.
+        """
+        if self.entity_table is None:
+            self.entity_table = EntityTable(max_entities, self.play_rect.topleft)
+            self.all_group.listeners.append(self.entity_table)
+            for sprite in self.all_group:
+                self.entity_table.add(sprite)
+
+        return self.entity_table
+
+    def enable_perf(self) -> PerfStats:
+        """
+        Start measuring where the time of each step goes (see `PerfStats`).  Engines that never call this run
+        unmeasured code.  Call after `track_entities` so the entity table is measured too.
 
-    def reset(self):
+        Returns:
+            PerfStats: The engine's stats.
+        """
+        if self.perf is None:
+            self.perf = PerfStats(self)
+
+        return self.perf
+
+    def reset(self, seed: int = None):
         """
         Reset the game
 
+        Args:
+            seed (int, optional): Reseed the game's random numbers.  Without a seed the game keeps drawing from
+                the current stream.
+
         Returns:
             List: Returns the initial image.
         """
+        if seed is not None:
+            self.random.seed(seed)
+
         self.frame = 0
         self.level = self.start_level
         self.score = 0
@@ -343,7 +615,12 @@ class Engine:
 
         self._initialize_level()
 
-        return self.get_image(), {
+        if self.entity_table is not None:
+            self.entity_table.refresh()
+        if self.render:
+            self.draw()
+
+        return self.play_view if self.render else None, {
             'score': self.score,
             'level': self.level,
             'lives': self.lives,
@@ -351,12 +628,59 @@ class Engine:
             'data': self.get_sprite_data(),
         }
 
-    @ staticmethod
-    def get_image() -> List:
+    def get_state(self) -> EngineState:
         """
-        Return the latest image.
+        Take a snapshot of the game to roll back to later with `set_state()`.
+
+        The snapshot holds every sprite's attributes (position, timers, animation step, target, ...), the group
+        memberships, the random number generator, score, lives, level and frame.  It shares the sprite objects
+        with the engine, so it is cheap to take and restore, and it can be restored any number of times.  It can
+        also be pickled, and an unpickled snapshot can be restored into any engine with the same config.
+
+        Returns:
+            EngineState: The snapshot.
+        """
+        return capture(self)
+
+    def set_state(self, state: EngineState):
+        """
+        Roll the game back (or forward) to a snapshot from `get_state()`.  Nothing is drawn, so the image is
+        stale until the next `update()` (or call `draw()`).
+
+        Args:
+            state (EngineState): The snapshot.
+        """
+        restore(self, state)
+        self.sprite_pool.reload()
+        self.screen_sprites = None
+
+    def get_image(self) -> List:
+        """
+        Return the latest image of the full screen.  Use `get_observation` if you only need the play area.
 
         Returns:
             List: An image array.
         """
-        return pygame.surfarray.array3d(pygame.display.get_surface()).swapaxes(0, 1)
+        if self.headless:
+            self._update_screen()
+        (width, height) = self.screen.get_size()
+        # Reading the raw bytes is several times faster than `surfarray.array3d` plus a transpose.
+        pixels = np.frombuffer(pygame.image.tobytes(self.screen, 'RGB'), dtype=np.uint8)
+        return pixels.reshape(height, width, 3).copy()
+
+    def get_observation(self, out: np.ndarray = None, copy: bool = True) -> np.ndarray:
+        """
+        Return the latest image of the play area.
+
+        Args:
+            out (np.ndarray, optional): A preallocated (height, width, 3) uint8 array to copy the image into.
+            copy (bool, optional): Return a copy instead of a read-only view of the play area buffer.  The
+                view is overwritten by the next draw.  Ignored if `out` is given.  Defaults to True.
+
+        Returns:
+            np.ndarray: The play area image.
+        """
+        if out is not None:
+            np.copyto(out, self.play_view)
+            return out
+        return self.play_view.copy() if copy else self.play_view
@@ -1,11 +1,11 @@
 """Sprite Base Module"""
 import math
-import random
 from typing import TYPE_CHECKING, Tuple
 
 import pygame
 
 if TYPE_CHECKING:
+    from ..config import EntityConfig
     from ..engine import Engine
 
 
@@ -32,9 +32,19 @@ class Base(pygame.sprite.Sprite):
         super().__init__()
         self.engine = engine
         self.play_rect = self.engine.play_rect
-        self.args = kwargs
-        self.config_dict = self.load_config()
+        self.settings = self.load_config()
+        self._spawn(kwargs)
+
+    def reinit(self, **kwargs):
+        """
+        Set up a killed sprite to play again, as if it was constructed with these arguments.  Used by the
+        engine's `SpritePool` to recycle sprites; it keeps the engine and config the sprite already has.
+        """
+        self._spawn(kwargs)
 
+    def _spawn(self, kwargs: dict):
+        """ Set up everything that starts over each time the sprite is spawned. """
+        self.args = kwargs
         self.cycle = None
         self.animations = self.get_animations()
         self.animation_step = 0
@@ -47,19 +57,19 @@ class Base(pygame.sprite.Sprite):
         self.setup()
         self.update_animation()
 
+        # Sprites spawned at a known place, like bullets and shells, don't need a random one found first.
         if 'center' in kwargs:
-            self.rect = self.image.get_rect()
-            self.rect.center = kwargs['center']
+            self.rect = self.image.get_rect(center=kwargs['center'])
+        elif 'topleft' in kwargs:
+            self.rect = self.image.get_rect(topleft=kwargs['topleft'])
         else:
             self.random_location()
 
-    def load_config(self):
-        return self.engine.config.get(self.__class__.__name__.lower())
+    def load_config(self) -> 'EntityConfig':
+        return self.engine.config.entity(self.__class__.__name__.lower())
 
     def config(self, key: str, default: any = None):
-        if key not in self.config_dict:
-            print(f"Warning: Missing config key for class {self.__class__.__name__}: {key}")
-        return self.config_dict[key] if key in self.config_dict else default
+        return self.settings.get(key, default)
 
     def score(self):
         """
@@ -197,7 +207,7 @@ class Base(pygame.sprite.Sprite):
         Returns:
             int: The directional value.
         """
-        return random.randrange(1, 8)
+        return self.engine.random.randrange(1, 8)
 
     def random_location(self):
         """
@@ -212,8 +222,8 @@ class Base(pygame.sprite.Sprite):
         tries = 0
         while not valid_location:
             tries += 1
-            self.rect.x = self.play_rect.x + random.randrange(self.play_rect.width - sprite_width)
-            self.rect.y = self.play_rect.y + random.randrange(self.play_rect.height - sprite_height)
+            self.rect.x = self.play_rect.x + self.engine.random.randrange(self.play_rect.width - sprite_width)
+            self.rect.y = self.play_rect.y + self.engine.random.randrange(self.play_rect.height - sprite_height)
 
             if tries > 25:
                 print("Warning!  Enemy Placement Overflow.")
@@ -224,12 +234,13 @@ class Base(pygame.sprite.Sprite):
                 continue
 
             # Prevent sprites from overlapping
-            if any(self.rect.colliderect(sprite.rect)
-                    for sprite in self.engine.all_group if self != sprite):
+            if self.engine.spatial.overlaps(self):
                 continue
 
             valid_location = True
 
+        self.engine.spatial.move(self)
+
     def get_distance_to_sprite(self, sprite: 'Base'):
         """
         Return the distance to a target sprite.
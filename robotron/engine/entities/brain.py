@@ -1,16 +1,15 @@
 """Brain Enemy and Cruise Missile Module"""
-from random import choice, randint
-
 import pygame
 
+from ..graphics import new_surface
+from ..pool import Pooled
 from .base import Base
-from .floater import Floater
 from .prog import Prog
 
 # pylint: disable=attribute-defined-outside-init
 
 
-class CruiseMissile(Base):
+class CruiseMissile(Pooled, Base):
     """
     Brains shoot snake-like cruise missiles at the player.
 
@@ -26,24 +25,25 @@ class CruiseMissile(Base):
         self.speed = self.config('speed', self.SPEED)
         self.time_to_live = self.config('time_to_live', self.TIME_TO_LIVE)
         self.vector = None
-        self.trail_group = pygame.sprite.Group()
-        self.trail_image = pygame.Surface([self.WIDTH, self.HEIGHT]).convert()
-        pygame.draw.circle(self.trail_image, (255, 255, 255), (self.WIDTH//2, self.HEIGHT//2), 8, 0)
+        # A recycled missile's old trail fades out on its own.
+        self.engine.particles.disown(self)
+        self.trail_image = self.engine._get_variant(('cruise_missile', (255, 255, 255)),
+                                                    lambda: self.draw((255, 255, 255)))
 
     def get_animations(self):
         """Returns the images used to animate the sprite."""
-        images = []
-        for color in ((255, 0, 0), (0, 255, 0), (0, 255, 0)):
-            image = pygame.Surface([self.WIDTH, self.HEIGHT]).convert()
-            pygame.draw.circle(image, color, (self.WIDTH//2, self.HEIGHT//2), 8, 0)
-            images.append(image)
-        return images
+        return [self.engine._get_variant(('cruise_missile', color), lambda color=color: self.draw(color))
+                for color in ((255, 0, 0), (0, 255, 0), (0, 255, 0))]
+
+    def draw(self, color: tuple) -> pygame.Surface:
+        """ Draw the missile (or its trail) in a color. """
+        image = new_surface([self.WIDTH, self.HEIGHT])
+        pygame.draw.circle(image, color, (self.WIDTH//2, self.HEIGHT//2), 8, 0)
+        return image
 
     def move(self):
         """Move the sprite."""
-        trail = Floater(self.engine, center=self.rect.center, sprite=self.trail_image, delay=20)
-        self.trail_group.add(trail)
-        self.engine._add_sprite(trail)
+        self.engine.particles.add(self.trail_image, self.rect.center, 20, owner=self)
         self.vector = self.get_vector_to_player()
         self.rect.center += self.vector * self.speed
 
@@ -58,8 +58,7 @@ class CruiseMissile(Base):
     def die(self, killer):
         """Kill the sprite."""
         del killer
-        for sprite in self.trail_group:
-            sprite.kill()
+        self.engine.particles.remove_owned(self)
         self.kill()
 
 
@@ -97,7 +96,7 @@ class Brain(Base):
         self.target = family_sprites[0] if family_sprites and use_mikey_bug else None
         self.speed = self.config('speed') or self.SPEED
         self.vector = pygame.Vector2(0)
-        self.shoot_delay = randint(*self.shoot_delays)
+        self.shoot_delay = self.engine.random.randint(*self.shoot_delays)
 
         self.programming = False
         self.programming_time = self.config('programming_time', self.PROGRAMMING_TIME)
@@ -123,7 +122,7 @@ class Brain(Base):
         if self.target is None or not self.engine.family_group.has(self.target):
             family_group = self.engine.family_group.sprites()
             if family_group:
-                self.target = choice(family_group)
+                self.target = self.engine.random.choice(family_group)
             else:
                 self.target = self.engine.player
 
@@ -166,14 +165,10 @@ class Brain(Base):
     def program(self):
         """ Animate the brain with flashing colors during programming. """
         image = self.animations[self.animation_direction][0]
-        image.set_colorkey((0, 0, 0))
         color = ((255, 0, 0), (0, 255, 0), (0, 255, 0))[self.engine.frame % 3]
-        inv = pygame.Surface(image.get_size(), pygame.SRCALPHA)
-        inv.fill(color)
-        inv.blit(image, (0, 0), None, pygame.BLEND_RGB_SUB)
-        self.image = inv
+        self.image = self.engine._get_tinted(image, color)
 
     def shoot(self):
         """ Fire the guns. """
-        self.shoot_delay = randint(*self.shoot_delays)
-        self.engine._add_enemy(CruiseMissile(self.engine, center=self.rect.center))
+        self.shoot_delay = self.engine.random.randint(*self.shoot_delays)
+        self.engine._add_enemy(self.engine.sprite_pool.acquire(CruiseMissile, center=self.rect.center))
@@ -44,8 +44,7 @@ class Electrode(Base):
 
     def update(self):
         if self.alive:
-            if any(self.rect.colliderect(sprite.rect)
-                   for sprite in self.engine._get_enemy_group() if self != sprite):
+            if self.engine.spatial.collides(self, self.engine._get_enemy_group()):
                 self.alive = False
         else:
             self.animation_step += 1
@@ -1,11 +1,12 @@
 """ Enforcer Enemy Module """
-import random
 import pygame
 
+from ..graphics import new_surface
+from ..pool import Pooled
 from .base import Base
 
 
-class EnforcerBullet(Base):
+class EnforcerBullet(Pooled, Base):
     """
     Bullets shot from the Enforcer.
     """
@@ -29,14 +30,14 @@ class EnforcerBullet(Base):
             distance_to_player = self.get_distance_to_player()
             speed = ((distance_to_player * self.max_speed) / self.max_distance) + 1
             player_rect = engine.player.rect
-            x_trajectory = random.randint(player_rect.left - 10, player_rect.right + 10)
-            y_trajectory = random.randint(player_rect.top - 10, player_rect.bottom + 10)
+            x_trajectory = self.engine.random.randint(player_rect.left - 10, player_rect.right + 10)
+            y_trajectory = self.engine.random.randint(player_rect.top - 10, player_rect.bottom + 10)
             new_vector = pygame.Vector2(x_trajectory, y_trajectory) - pygame.Vector2(self.rect.center)
             if new_vector.length() == 0:
                 # Unlikely to happen, but if it does, try new random values.
                 return self.get_trajectory()
             self.vector = new_vector.normalize() * speed
-            self.random_vector = pygame.Vector2(random.random(), random.random())
+            self.random_vector = pygame.Vector2(self.engine.random.random(), self.engine.random.random())
         else:
             self.random_vector *= 1.01
 
@@ -47,16 +48,24 @@ class EnforcerBullet(Base):
         Generate the bullet images.  We have 2 images, a + and a x.  It's easier just to make two images than deal
         with trying to rotate it every cycle.
         """
-
-        image1 = pygame.Surface([self.WIDTH, self.HEIGHT]).convert()
-        pygame.draw.line(image1, [255, 255, 255], (self.WIDTH, 0), (0, self.HEIGHT), self.WEIGHT)
-        pygame.draw.line(image1, [255, 255, 255], (0, 0), (self.WIDTH, self.HEIGHT), self.WEIGHT)
-        image1.set_colorkey((0, 0, 0))
-        image2 = pygame.Surface([self.WIDTH, self.HEIGHT]).convert()
-        pygame.draw.line(image2, [255, 255, 255], (self.WIDTH // 2, 0), (self.WIDTH // 2, self.HEIGHT), self.WEIGHT)
-        pygame.draw.line(image2, [255, 255, 255], (0, self.HEIGHT // 2), (self.WIDTH, self.HEIGHT // 2), self.WEIGHT)
-        image2.set_colorkey((0, 0, 0))
-        return [image1, image2]
+        return [self.engine._get_variant(('enforcer_bullet', 0), self.draw_x),
+                self.engine._get_variant(('enforcer_bullet', 1), self.draw_plus)]
+
+    def draw_x(self) -> pygame.Surface:
+        """ Draw the x frame. """
+        image = new_surface([self.WIDTH, self.HEIGHT])
+        pygame.draw.line(image, [255, 255, 255], (self.WIDTH, 0), (0, self.HEIGHT), self.WEIGHT)
+        pygame.draw.line(image, [255, 255, 255], (0, 0), (self.WIDTH, self.HEIGHT), self.WEIGHT)
+        image.set_colorkey((0, 0, 0))
+        return image
+
+    def draw_plus(self) -> pygame.Surface:
+        """ Draw the + frame. """
+        image = new_surface([self.WIDTH, self.HEIGHT])
+        pygame.draw.line(image, [255, 255, 255], (self.WIDTH // 2, 0), (self.WIDTH // 2, self.HEIGHT), self.WEIGHT)
+        pygame.draw.line(image, [255, 255, 255], (0, self.HEIGHT // 2), (self.WIDTH, self.HEIGHT // 2), self.WEIGHT)
+        image.set_colorkey((0, 0, 0))
+        return image
 
     def update(self):
         if self.time_to_live % 3 == 0:
@@ -104,7 +113,7 @@ class Enforcer(Base):
         self.max_distance = self.engine._get_play_area_distance()
         self.offset_update = 0
         self.random_offset = 0
-        self.shoot_delay = random.randint(*self.shoot_delays)
+        self.shoot_delay = self.engine.random.randint(*self.shoot_delays)
 
     def update(self):
         self.update_animation()
@@ -135,8 +144,8 @@ class Enforcer(Base):
         """
         if self.active:
             if self.offset_update <= 0:
-                self.random_offset = random.randint(-5, 1)
-                self.offset_update = random.randint(10, 30)
+                self.random_offset = self.engine.random.randint(-5, 1)
+                self.offset_update = self.engine.random.randint(10, 30)
 
             self.offset_update -= 1
 
@@ -154,8 +163,8 @@ class Enforcer(Base):
         """
         self.shoot_delay -= 1
         if self.shoot_delay <= 0:
-            self.shoot_delay = random.randint(*self.shoot_delays)
-            self.engine._add_enemy(EnforcerBullet(self.engine, center=self.rect.center))
+            self.shoot_delay = self.engine.random.randint(*self.shoot_delays)
+            self.engine._add_enemy(self.engine.sprite_pool.acquire(EnforcerBullet, center=self.rect.center))
 
     def reset(self):
         """ Enforcers don't reset.  The Sphereoids will just spawn them again. """
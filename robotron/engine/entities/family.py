@@ -1,10 +1,5 @@
 """ Family Sprite Module """
-import random
-
-import pygame
-
 from .base import Base
-from .floater import Floater
 
 
 class Family(Base):
@@ -27,11 +22,11 @@ class Family(Base):
 
     def load_config(self):
         """ Overridden.  All family members use the same config. """
-        return self.engine.config.get('family')
+        return self.engine.config.entity('family')
 
     def reset(self):
         """ Reset the sprite. """
-        self.move_direction = random.randrange(1, 8)
+        self.move_direction = self.engine.random.randrange(1, 8)
         self.update_animation()
         self.random_location()
 
@@ -68,7 +63,7 @@ class Family(Base):
                     direction = 0
                     break
 
-                direction = random.choice(valid_directions)
+                direction = self.engine.random.choice(valid_directions)
 
             self.vector = self.get_vector(direction)
             self.rect.center += self.vector
@@ -78,11 +73,11 @@ class Family(Base):
         """ Triggered when """
         level = self.engine._set_family_collected()
         level = min(level, 5)
-        self.engine._add_sprite(Floater(self.engine, center=self.rect.center, sprite_name=str(level*1000)))
+        self.engine.particles.add(self.engine._get_sprite(str(level*1000)), self.rect.center)
         self.kill()
 
     def die(self, killer):
-        self.engine._add_sprite(Floater(self.engine, center=self.rect.center, sprite_name='familydeath'))
+        self.engine.particles.add(self.engine._get_sprite('familydeath'), self.rect.center)
         self.kill()
 
     def update(self):
@@ -93,7 +88,7 @@ class Family(Base):
         if self.engine.frame % self.move_delay == 0:
             self.move()
 
-        for sprite in pygame.sprite.spritecollide(self, self.engine._get_enemy_group(), False):
+        for sprite in self.engine.spatial.spritecollide(self, self.engine._get_enemy_group()):
             if sprite.__class__.__name__ == 'Hulk':
                 self.die(sprite)
 
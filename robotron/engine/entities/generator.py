@@ -1,10 +1,7 @@
 """ Generator Enemy Subclass Module """
-import random
-
 import pygame
 
 from .base import Base
-from .floater import Floater
 
 
 class Generator(Base):
@@ -23,8 +20,8 @@ class Generator(Base):
     def reset(self):
         self.cycle = self.PRE_SPAWN_CYCLE_LIMIT
         self.spawn_delays = self.config('spawn_delays', self.SPAWN_DELAY)
-        self.spawn_delay = random.randrange(*self.spawn_delays)
-        self.spawn_count = random.randrange(*self.config('spawn_counts', self.MAX_SPAWN_COUNT))
+        self.spawn_delay = self.engine.random.randrange(*self.spawn_delays)
+        self.spawn_count = self.engine.random.randrange(*self.config('spawn_counts', self.MAX_SPAWN_COUNT))
         self.alive = True
         self.move_curvature = pygame.Vector2(0)
         self.move_deltas = pygame.Vector2(0)
@@ -55,7 +52,7 @@ class Generator(Base):
     def spawn(self):
         """ Spawn the babies. """
         self.cycle = len(self.animations)
-        self.spawn_delay = random.randrange(*self.spawn_delays)
+        self.spawn_delay = self.engine.random.randrange(*self.spawn_delays)
         self.spawn_count -= 1
 
         spawn = self.get_spawn()
@@ -66,7 +63,7 @@ class Generator(Base):
 
     def die(self, killer):
         del killer
-        self.engine._add_sprite(Floater(self.engine, center=self.rect.center, sprite_name='1000'))
+        self.engine.particles.add(self.engine._get_sprite('1000'), self.rect.center)
         self.vanish()
 
     def vanish(self):
@@ -1,6 +1,4 @@
 """ Grunt Enemy Module """
-import random
-
 from .base import Base
 
 
@@ -22,7 +20,7 @@ class Grunt(Base):
     def reset(self):
         self.speed = 7
         self.move_delay = (5, 25)
-        self.move_countdown = random.randrange(*self.move_delay)
+        self.move_countdown = self.engine.random.randrange(*self.move_delay)
 
     def move(self):
         """ Grunts move toward the player """
@@ -32,6 +30,6 @@ class Grunt(Base):
     def update(self):
         if self.move_countdown <= 0:
             self.move()
-            self.move_countdown = random.randrange(*self.move_delay)
+            self.move_countdown = self.engine.random.randrange(*self.move_delay)
         else:
             self.move_countdown -= 1
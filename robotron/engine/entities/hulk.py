@@ -1,8 +1,4 @@
 """ Huld Monster Module"""
-import random
-
-import pygame
-
 from .base import Base
 
 
@@ -34,10 +30,10 @@ class Hulk(Base):
         self.speed = 7
         self.turn_percentage = 20
         self.move_delay = (5, 25)
-        self.move_countdown = random.randrange(*self.move_delay)
+        self.move_countdown = self.engine.random.randrange(*self.move_delay)
 
         self.move_directions = [self.UP, self.RIGHT, self.DOWN, self.LEFT]
-        self.direction = random.choice(self.move_directions)
+        self.direction = self.engine.random.choice(self.move_directions)
         self.animation_direction = self.get_direction_string(self.direction)
 
     def get_direction_string(self, direction: int):
@@ -62,7 +58,7 @@ class Hulk(Base):
     def turn(self):
         """ Find a new direction to move. """
         idx = self.move_directions.index(self.direction)
-        if random.randrange(0, 1) == 0:  # Turn Right
+        if self.engine.random.randrange(0, 1) == 0:  # Turn Right
             idx += 1
             if idx >= len(self.move_directions):
                 idx = 0
@@ -75,7 +71,7 @@ class Hulk(Base):
 
     def move(self):
         """ Hulks move in 4 directions, up down left right.  They randomly do 90deg turns left or right. """
-        if random.randrange(1, 100) < self.turn_percentage:
+        if self.engine.random.randrange(1, 100) < self.turn_percentage:
             self.turn()
 
         i = 0
@@ -94,11 +90,11 @@ class Hulk(Base):
     def update(self):
         if self.move_countdown <= 0:
             self.move()
-            self.move_countdown = random.randrange(*self.move_delay)
+            self.move_countdown = self.engine.random.randrange(*self.move_delay)
         else:
             self.move_countdown -= 1
 
-        for sprite in pygame.sprite.spritecollide(self, self.engine.family_group, False):
+        for sprite in self.engine.spatial.spritecollide(self, self.engine.family_group):
             sprite.die(self)
 
     def die(self, killer):
@@ -1,13 +1,15 @@
 """ Module for the Player and their bullets. """
 from typing import TYPE_CHECKING
 import pygame
+from ..graphics import new_surface
+from ..pool import Pooled
 from .base import Base
 
 if TYPE_CHECKING:
     from ..engine import Engine
 
 
-class Bullet(Base):
+class Bullet(Pooled, Base):
     """
     Bullets shot from the player.
     """
@@ -16,16 +18,23 @@ class Bullet(Base):
 
     def __init__(self, engine: 'Engine', x, y, direction):
         self.direction = direction
-        super().__init__(engine)
-        self.rect = pygame.Rect(x, y, self.WIDTH, self.HEIGHT)
+        super().__init__(engine, topleft=(x, y))
+        self.speed = 15
+
+    def reinit(self, x, y, direction):  # pylint: disable=arguments-differ
+        self.direction = direction
+        super().reinit(topleft=(x, y))
         self.speed = 15
 
     def get_animations(self):
         """Returns the images used to animate the sprite."""
+        return [self.engine._get_variant(('bullet', self.direction), self.draw)]
 
+    def draw(self) -> pygame.Surface:
+        """ Draw the bullet for its direction. """
         weight = 2
 
-        image = pygame.Surface([self.WIDTH, self.HEIGHT]).convert()
+        image = new_surface([self.WIDTH, self.HEIGHT])
 
         if self.direction in [self.UP, self.DOWN]:
             pygame.draw.line(image, (255, 255, 255), (self.WIDTH // 2, 0), (self.WIDTH // 2, self.HEIGHT), weight)
@@ -36,13 +45,13 @@ class Bullet(Base):
         else:
             pygame.draw.line(image, (255, 255, 255), (0, 0), (self.WIDTH, self.HEIGHT), weight)
 
-        return [image]
+        return image
 
     def update(self):
         vector = self.get_vector(self.direction)
         self.rect.center += vector
 
-        hits = pygame.sprite.spritecollide(self, self.engine._get_enemy_group(), False)
+        hits = self.engine.spatial.spritecollide(self, self.engine._get_enemy_group())
         for sprite in hits:
             self.engine.score += sprite.score()
             sprite.die(self)
@@ -100,6 +109,7 @@ class Player(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.x = self.play_rect.x + (self.play_rect.width // 2)
         self.rect.y = self.play_rect.y + (self.play_rect.height // 2)
+        self.engine.spatial.move(self)
 
     def move(self, move):
         """ Move the player. """
@@ -126,7 +136,7 @@ class Player(pygame.sprite.Sprite):
         """ Shoot the guns. """
         if shoot:
             if self.shoot_delay_remaining <= 0:
-                bullet = Bullet(self.engine, self.rect.x, self.rect.y, shoot)
+                bullet = self.engine.sprite_pool.acquire(Bullet, self.rect.x, self.rect.y, shoot)
                 self.engine._add_sprite(bullet)
                 self.shoot_delay_remaining = self.shoot_delay
 
@@ -134,7 +144,7 @@ class Player(pygame.sprite.Sprite):
         """ Update Loop """
         self.shoot_delay_remaining -= 1
 
-        for sprite in pygame.sprite.spritecollide(self, self.engine.family_group, False):
+        for sprite in self.engine.spatial.spritecollide(self, self.engine.family_group):
             sprite.collected()
 
     def _set_animation_direction(self, direction):
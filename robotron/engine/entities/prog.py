@@ -1,9 +1,6 @@
 """ Programmed Human Enemy Module"""
-import random
-
 import pygame
 
-from .floater import Floater
 from .family import Family
 
 
@@ -32,7 +29,7 @@ class Prog(Family):
 
     def load_config(self):
         """ While we are 'family' we want to load the prog config for this. """
-        return self.engine.config.get('prog')
+        return self.engine.config.entity('prog')
 
     def get_animations(self):
         """Returns the images used to animate the sprite."""
@@ -52,10 +49,7 @@ class Prog(Family):
 
         image = animations[self.animation_step]
         color = ((255, 0, 0), (0, 255, 0), (0, 255, 0))[self.engine.frame % 3]
-        inv = pygame.Surface(image.get_size(), pygame.SRCALPHA)
-        inv.fill(color)
-        inv.blit(image, (0, 0), None, pygame.BLEND_RGB_SUB)
-        self.image = inv
+        self.image = self.engine._get_tinted(image, color)
 
     def reset(self):
         return self.kill()
@@ -70,12 +64,12 @@ class Prog(Family):
             x = 1 if prect.x > self.rect.x else -1
             y = 1 if prect.y > self.rect.y else -1
             # Needs to be tweeked.  Mostly move toward the player.
-            if random.random() < 0.25:
+            if self.engine.random.random() < 0.25:
                 x = -x
-            if random.random() < 0.25:
+            if self.engine.random.random() < 0.25:
                 y = -y
             self.vector = pygame.Vector2(x, y)
-        self.engine._add_sprite(Floater(self.engine, center=self.rect.center, sprite=self.image, delay=5))
+        self.engine.particles.add(self.image, self.rect.center, 5)
         self.rect.center += self.vector * self.speed
         self.rect.clamp_ip(self.play_rect)
 
@@ -98,7 +92,7 @@ class Prog(Family):
         if self.programming_time > 0:
             if self.engine.frame % 2 == 0:
                 self.rect.y -= self.offset
-                self.offset = random.randint(0, self.rect.height) - (self.rect.height // 2)
+                self.offset = self.engine.random.randint(0, self.rect.height) - (self.rect.height // 2)
                 self.rect.y += self.offset
             self.programming_time -= 1
         else:
@@ -1,6 +1,4 @@
 """ Quark Enemy Module"""
-import random
-
 import pygame
 
 from .generator import Generator
@@ -34,9 +32,9 @@ class Quark(Generator):
 
     def move(self):
         if self.turn_delay == 0:
-            self.turn_delay += random.randint(*self.move_delays)
-            self.vector = pygame.Vector2(random.choice([-self.speed, self.speed]),
-                                         random.choice([-self.speed, self.speed]))*5
+            self.turn_delay += self.engine.random.randint(*self.move_delays)
+            self.vector = pygame.Vector2(self.engine.random.choice([-self.speed, self.speed]),
+                                         self.engine.random.choice([-self.speed, self.speed]))*5
         else:
             self.turn_delay -= 1
 
@@ -1,6 +1,4 @@
 """Sphereoid Enemy Module"""
-import random
-
 from .enforcer import Enforcer
 from .generator import Generator
 
@@ -40,9 +38,9 @@ class Sphereoid(Generator):
 
     def update_curvature_and_countdowns(self):
         """ Generate new values to move along. """
-        self.move_curvature.x = random.randint(*self.move_curvatures) / 1000
-        self.move_curvature.y = random.randint(*self.move_curvatures) / 1000
-        self.move_delay = random.randrange(*self.move_delays)
+        self.move_curvature.x = self.engine.random.randint(*self.move_curvatures) / 1000
+        self.move_curvature.y = self.engine.random.randint(*self.move_curvatures) / 1000
+        self.move_delay = self.engine.random.randrange(*self.move_delays)
 
     def move(self):
         """ Sphereoids """
@@ -1,12 +1,12 @@
 """Tank Enemy and Tank Shell Class"""
-from random import randint, randrange
-
 import pygame
 
+from ..graphics import new_surface
+from ..pool import Pooled
 from .base import Base
 
 
-class TankShell(Base):
+class TankShell(Pooled, Base):
     """
     Tank Bullets.  They're bouncy boys.
     """
@@ -26,9 +26,13 @@ class TankShell(Base):
 
     def get_animations(self):
         """Returns the images used to animate the sprite."""
-        image = pygame.Surface([self.WIDTH, self.HEIGHT]).convert()
+        return [self.engine._get_variant(('tank_shell', 0), self.draw)]
+
+    def draw(self) -> pygame.Surface:
+        """ Draw the shell. """
+        image = new_surface([self.WIDTH, self.HEIGHT])
         pygame.draw.circle(image, (255, 0, 0), (self.WIDTH//2, self.HEIGHT//2), 8, self.WEIGHT)
-        return [image]
+        return image
 
     def get_trajectory(self):
         """ Calculate the new trajectory. """
@@ -38,7 +42,7 @@ class TankShell(Base):
             self.speed = ((distance_to_player * self.max_speed) / max_distance) + self.min_speed
             x, y = self.rect.center
             player_x, player_y = self.engine.player.rect.center
-            attack = randrange(10)
+            attack = self.engine.random.randrange(10)
             if attack < 2:
                 # reflect off top wall
                 self.vector = self.get_vector_to_point((x + (player_x - x) // 2, self.play_rect.top))
@@ -97,7 +101,7 @@ class Tank(Base):
         """Setup the sprite."""
         self.bullets = self.config('bullets', self.BULLETS)
         self.shoot_delays = self.config('shoot_delays', self.SHOOT_DELAYS)
-        self.shoot_delay = randint(*self.shoot_delays)
+        self.shoot_delay = self.engine.random.randint(*self.shoot_delays)
         self.active = 0
 
     def get_animations(self):
@@ -120,8 +124,8 @@ class Tank(Base):
             self.shoot_delay -= 1
             if self.shoot_delay == 0:
                 self.bullets -= 1
-                self.shoot_delay = randint(*self.shoot_delays)
-                bullet = TankShell(self.engine, center=self.rect.center)
+                self.shoot_delay = self.engine.random.randint(*self.shoot_delays)
+                bullet = self.engine.sprite_pool.acquire(TankShell, center=self.rect.center)
                 self.engine._add_sprite(bullet)
                 self.engine._add_enemy(bullet)
 
@@ -0,0 +1,156 @@
+"""Fixed shape numeric table of the sprites in play, for vector observations."""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+# Integer codes used for sprite types in numeric observations.  0 is reserved for empty slots.
+ENTITY_TYPES = ('Player', 'Bullet', 'Mommy', 'Daddy', 'Mikey', 'Prog', 'Grunt', 'Electrode', 'Hulk', 'Brain',
+                'CruiseMissile', 'Sphereoid', 'Enforcer', 'EnforcerBullet', 'Quark', 'Tank', 'TankShell')
+ENTITY_TYPE_IDS = {name: i + 1 for i, name in enumerate(ENTITY_TYPES)}
+
+
+class TrackedGroup(pygame.sprite.Group):
+    """
+    A sprite group that tells its listeners whenever a sprite joins or leaves it (including via `sprite.kill()`).
+    """
+
+    def __init__(self, *sprites):
+        self.listeners = []
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        for listener in self.listeners:
+            listener.add(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        for listener in self.listeners:
+            listener.remove(sprite)
+
+
+class EntityTable:
+    """
+    Keeps a preallocated `(max_entities, len(FEATURES))` float32 array with one row per sprite.
+
+    A sprite gets a row when it enters play and keeps it until it leaves, so rows can be tracked from step to step.
+    Rows are claimed and released as sprites are added and killed; `refresh()` then updates the positions,
+    velocities and alive flags of the occupied rows once per step.  Type ids come from `ENTITY_TYPE_IDS`, so
+    there are no strings involved.  Sprites that arrive while the table is full are not tracked.
+
+    Features:
+        type: The type id (see `ENTITY_TYPES`).  0 for empty rows.
+        x, y: The top left of the sprite relative to the play area.
+        dx, dy: How far the sprite moved since the last refresh.
+        alive: 0 for electrodes that are fading out and generators waiting on their spawns, 1 otherwise.
+    """
+
+    FEATURES = ('type', 'x', 'y', 'dx', 'dy', 'alive')
+
+    def __init__(self, max_entities: int, offset: Tuple[int, int]):
+        """
+        Setup the table.
+
+        args:
+            max_entities (int): The number of rows.
+            offset (Tuple[int, int]): The (x, y) of the play area's top left corner.
+        """
+        self.max_entities = max_entities
+        self.offset = np.array(offset, dtype=np.float32)
+        self.data = np.zeros((max_entities, len(self.FEATURES)), dtype=np.float32)
+        self.mask = np.zeros(max_entities, dtype=np.int8)
+        self._rows: Dict[pygame.sprite.Sprite, int] = {}
+        self._free: List[int] = list(range(max_entities - 1, -1, -1))
+        self._type_ids: Dict[type, Optional[int]] = {}
+
+    @property
+    def count(self) -> int:
+        """ The number of occupied rows. """
+        return len(self._rows)
+
+    def _type_id(self, sprite: pygame.sprite.Sprite) -> Optional[int]:
+        """ Look up (and cache) the type id for the sprite's class. """
+        cls = type(sprite)
+        if cls not in self._type_ids:
+            self._type_ids[cls] = ENTITY_TYPE_IDS.get(cls.__name__)
+        return self._type_ids[cls]
+
+    def add(self, sprite: pygame.sprite.Sprite):
+        """
+        Claim a row for a sprite.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite entering play.
+        """
+        type_id = self._type_id(sprite)
+        if type_id is None or not self._free or sprite in self._rows:
+            return
+
+        row = self._free.pop()
+        self._rows[sprite] = row
+        (x, y) = sprite.rect.topleft
+        self.data[row] = (type_id, x - self.offset[0], y - self.offset[1], 0, 0, 1)
+        self.mask[row] = 1
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """
+        Release a sprite's row.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite leaving play.
+        """
+        row = self._rows.pop(sprite, None)
+        if row is None:
+            return
+
+        self.data[row] = 0
+        self.mask[row] = 0
+        self._free.append(row)
+
+    def refresh(self):
+        """ Update the position, velocity and alive columns of every occupied row. """
+        if not self._rows:
+            return
+
+        rows = np.fromiter(self._rows.values(), dtype=np.intp, count=len(self._rows))
+        positions = np.array([sprite.rect.topleft for sprite in self._rows], dtype=np.float32) - self.offset
+        self.data[rows, 3:5] = positions - self.data[rows, 1:3]
+        self.data[rows, 1:3] = positions
+        self.data[rows, 5] = [sprite.__dict__.get('alive', True) for sprite in self._rows]
+
+    def get_state(self) -> tuple:
+        """
+        Copy the table, for `Engine.get_state()`.
+
+        returns:
+            tuple: The data, mask, sprite rows and free rows.
+        """
+        return (self.data.copy(), self.mask.copy(), dict(self._rows), list(self._free))
+
+    def set_state(self, state: tuple):
+        """
+        Put the table back the way `get_state()` found it.
+
+        args:
+            state (tuple): The copy from `get_state()`.
+        """
+        (data, mask, rows, free) = state
+        self.data[...] = data
+        self.mask[...] = mask
+        self._rows = dict(rows)
+        self._free = list(free)
+
+    def reload(self, sprites: List[pygame.sprite.Sprite]):
+        """
+        Empty the table and give each sprite a new row.
+
+        args:
+            sprites (List[pygame.sprite.Sprite]): The sprites in play.
+        """
+        self.data[...] = 0
+        self.mask[...] = 0
+        self._rows = {}
+        self._free = list(range(self.max_entities - 1, -1, -1))
+        for sprite in sprites:
+            self.add(sprite)
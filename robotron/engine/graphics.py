@@ -1,12 +1,109 @@
 """ Handle loading graphics and returning individual sprites by name."""
 
+import hashlib
+import json
+import os
 from os import path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pygame
 
+# Bump when the atlas layout changes so old cache files are ignored.
+ATLAS_VERSION = 1
 
-def load_graphics() -> Dict[str, pygame.Surface]:
+# The sprite atlas of each source, loaded once per process.  Forked workers share the (read-only) pages.
+_atlases: Dict[str, Tuple[List[Tuple[str, int, int, int]], np.ndarray]] = {}
+# Loaded sprite tables by display pixel format, shared by every engine in the process.
+_graphics: Dict[tuple, Dict[str, pygame.Surface]] = {}
+# Sprites drawn at runtime (bullets, shells, tints) by display pixel format, then by variant key.
+_variants: Dict[tuple, Dict[tuple, pygame.Surface]] = {}
+# Fonts by size, shared by every engine in the process.
+_fonts: Dict[int, pygame.font.Font] = {}
+
+
+def _resource_paths() -> Tuple[str, str]:
+    """ The paths of the spritesheet and its definitions. """
+    dirname = path.dirname(__file__)
+    resource_path = path.join(dirname, "..", "..", "resources")
+    spritesheet_path = path.join(resource_path, "sprites.jpg")
+    def_path = path.join(resource_path, "sprites.txt")
+    if not path.exists(spritesheet_path) or not path.exists(def_path):
+        raise Exception("sprite.jpg and sprite.txt required to be in resources.")
+    return (spritesheet_path, def_path)
+
+
+def cache_dir() -> Optional[str]:
+    """
+    Where compiled sprite atlases are kept.  Set `ROBOTRON_CACHE_DIR` to move it, or to an empty string to
+    turn the cache off.
+
+    Returns:
+        str: The cache directory, or None if caching is off.
+    """
+    directory = os.environ.get('ROBOTRON_CACHE_DIR')
+    if directory is None:
+        directory = path.join(os.environ.get('XDG_CACHE_HOME', path.join(path.expanduser('~'), '.cache')),
+                              'robotron')
+    return directory or None
+
+
+def _source_key(*paths: str) -> str:
+    """ A hash of the source files (and the atlas version), so edited sources get a new atlas. """
+    digest = hashlib.sha1(str(ATLAS_VERSION).encode())
+    for file_path in paths:
+        with open(file_path, 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def has_display() -> bool:
+    """ Whether a pygame display (a window, or SDL's dummy driver) has been set up. """
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+
+def new_surface(size: Tuple[int, int]) -> pygame.Surface:
+    """
+    Create a blank surface in the pixel format sprites are drawn in: the display's, or without a display
+    pygame's default 32 bit format (the same one SDL's dummy driver uses).
+
+    Args:
+        size (Tuple[int, int]): The width and height.
+
+    Returns:
+        pygame.Surface: The surface.
+    """
+    surface = pygame.Surface(size)
+    return surface.convert() if has_display() else surface
+
+
+def convert(image: pygame.Surface, alpha: bool = False) -> pygame.Surface:
+    """
+    Copy an image into the pixel format sprites are drawn in (see `new_surface`), like `Surface.convert()`
+    (or `convert_alpha()`) but also without a display.
+
+    Args:
+        image (pygame.Surface): The image.
+        alpha (bool): Keep per pixel alpha.  Otherwise it is ignored, like `Surface.convert()` does.
+
+    Returns:
+        pygame.Surface: The converted copy.
+    """
+    if has_display():
+        return image.convert_alpha() if alpha else image.convert()
+    if alpha:
+        converted = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        # Onto a transparent surface, the max of every channel is an exact copy.
+        converted.blit(image, (0, 0), None, pygame.BLEND_RGBA_MAX)
+    else:
+        converted = pygame.Surface(image.get_size())
+        # Onto black, the max of the color channels copies them exactly without applying any alpha.
+        converted.blit(image, (0, 0), None, pygame.BLEND_RGB_MAX)
+        converted.set_colorkey(image.get_colorkey())
+    return converted
+
+
+def _slice_spritesheet(spritesheet_path: str, def_path: str) -> Dict[str, pygame.Surface]:
     """
     Loads the spritesheet and breaks it down into individual sprites.
 
@@ -14,19 +111,12 @@ def load_graphics() -> Dict[str, pygame.Surface]:
         dict: A dictionary of sprite names to images.
     """
     def _get_image(x: int, y: int, width: int, height: int) -> pygame.Surface:
-        image = pygame.Surface([width, height]).convert()
+        image = new_surface([width, height])
         image.blit(spritesheet, (0, 0), (x, y, width, height))
         return image
 
-    dirname = path.dirname(__file__)
-    resource_path = path.join(dirname, "..", "..", "resources")
-    spritesheet_path = path.join(resource_path, "sprites.jpg")
-    def_path = path.join(resource_path, "sprites.txt")
-    if not path.exists(spritesheet_path) or not path.exists(def_path):
-        raise Exception("sprite.jpg and sprite.txt required to be in resources.")
-
     try:
-        spritesheet = pygame.image.load(spritesheet_path).convert()
+        spritesheet = convert(pygame.image.load(spritesheet_path))
         spritesheet.set_colorkey((0, 0, 0))
     except pygame.error as pygame_exception:
         print("Unable to load spritesheet image.")
@@ -54,3 +144,158 @@ def load_graphics() -> Dict[str, pygame.Surface]:
                 rowheight = h
 
     return sprites
+
+
+def _build_atlas(sprites: Dict[str, pygame.Surface]) -> Tuple[List[Tuple[str, int, int, int]], np.ndarray]:
+    """
+    Pack the sprites' RGB pixels one after another into a flat array.
+
+    Returns:
+        (list, np.ndarray): The (name, offset, width, height) of each sprite and the packed pixels.
+    """
+    index = []
+    chunks = []
+    offset = 0
+    for (name, image) in sprites.items():
+        (width, height) = image.get_size()
+        index.append((name, offset, width, height))
+        chunks.append(pygame.image.tobytes(image, 'RGB'))
+        offset += width * height * 3
+    return (index, np.frombuffer(b''.join(chunks), dtype=np.uint8))
+
+
+def _read_atlas(directory: str, key: str) -> Optional[Tuple[List[Tuple[str, int, int, int]], np.ndarray]]:
+    """ Map a cached atlas into memory.  Returns None if it isn't cached (or can't be read). """
+    try:
+        with open(path.join(directory, f'sprites-{key}.json'), 'r', encoding="utf-8") as index_file:
+            index = [tuple(entry) for entry in json.load(index_file)]
+        pixels = np.load(path.join(directory, f'sprites-{key}.npy'), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    return (index, pixels)
+
+
+def _write_atlas(directory: str, key: str, index: List[Tuple[str, int, int, int]], pixels: np.ndarray):
+    """
+    Save an atlas to the cache.  Each file is written under a temporary name and renamed into place, so other
+    processes never see half a file.  Failures (like a read only cache directory) are ignored.
+    """
+    try:
+        os.makedirs(directory, exist_ok=True)
+        pixels_path = path.join(directory, f'sprites-{key}.npy')
+        temp_path = f'{pixels_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as pixels_file:
+            np.save(pixels_file, pixels)
+        os.replace(temp_path, pixels_path)
+
+        # The index is written last: readers only look for the pixels once it exists.
+        index_path = path.join(directory, f'sprites-{key}.json')
+        temp_path = f'{index_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+        os.replace(temp_path, index_path)
+    except OSError:
+        pass
+
+
+def load_atlas() -> Tuple[List[Tuple[str, int, int, int]], np.ndarray]:
+    """
+    Get the packed sprite atlas.  Read from the on-disk cache when possible, otherwise the spritesheet is sliced
+    and the result is cached for every later process.
+
+    Returns:
+        (list, np.ndarray): The (name, offset, width, height) of each sprite and the packed RGB pixels.
+    """
+    (spritesheet_path, def_path) = _resource_paths()
+    key = _source_key(spritesheet_path, def_path)
+    if key in _atlases:
+        return _atlases[key]
+
+    directory = cache_dir()
+    atlas = _read_atlas(directory, key) if directory is not None else None
+    if atlas is None:
+        atlas = _build_atlas(_slice_spritesheet(spritesheet_path, def_path))
+        if directory is not None:
+            _write_atlas(directory, key, *atlas)
+
+    _atlases[key] = atlas
+    return atlas
+
+
+def load_graphics() -> Dict[str, pygame.Surface]:
+    """
+    Loads the sprites from the compiled atlas (see `load_atlas`), converted to the drawing format (see `convert`).
+
+    Returns:
+        dict: A dictionary of sprite names to images.
+    """
+    (index, pixels) = load_atlas()
+    return {name: convert(pygame.image.frombuffer(pixels[offset:offset + width * height * 3], (width, height),
+                                                  'RGB'))
+            for (name, offset, width, height) in index}
+
+
+def _display_format() -> tuple:
+    """ The pixel format surfaces are converted to (see `new_surface`). """
+    surface = pygame.display.get_surface() if has_display() else pygame.Surface((1, 1))
+    return (surface.get_bitsize(), surface.get_masks())
+
+
+def get_graphics() -> Dict[str, pygame.Surface]:
+    """
+    Get the sprites, loaded once per process for each display pixel format (see `load_graphics`).  Every engine
+    shares the same surfaces, so they must never be changed.  Draw changed copies instead.
+
+    Returns:
+        dict: A dictionary of sprite names to images.
+    """
+    key = _display_format()
+    if key not in _graphics:
+        _graphics[key] = load_graphics()
+    return _graphics[key]
+
+
+def get_variants() -> Dict[tuple, pygame.Surface]:
+    """
+    Get the table of sprites drawn at runtime for the display pixel format.  Filled in as sprites are first
+    drawn (see `Engine._get_variant`) and shared by every engine in the process, so like the graphics they must
+    never be changed.
+
+    Returns:
+        dict: A dictionary of variant keys, like `('bullet', direction)`, to images.
+    """
+    return _variants.setdefault(_display_format(), {})
+
+
+def tint(image: pygame.Surface, color: Tuple[int, int, int]) -> pygame.Surface:
+    """
+    Draw the flashing version of an image used for programming: the color with the image subtracted.
+
+    Args:
+        image (pygame.Surface): The image.
+        color (Tuple[int, int, int]): The flash color.
+
+    Returns:
+        pygame.Surface: A new (per pixel alpha) image.
+    """
+    inv = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    inv.fill(color)
+    inv.blit(image, (0, 0), None, pygame.BLEND_RGB_SUB)
+    return inv
+
+
+def get_font(size: int) -> pygame.font.Font:
+    """
+    Get pygame's default font, loaded once per process.  Starts pygame's font module if needed.
+
+    Args:
+        size (int): The font size.
+
+    Returns:
+        pygame.font.Font: The font.
+    """
+    if size not in _fonts:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _fonts[size] = pygame.font.Font(None, size)
+    return _fonts[size]
@@ -0,0 +1,150 @@
+"""Short-lived images that don't interact with anything, kept in numpy arrays instead of as sprites."""
+from typing import Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+
+class Particles:
+    """
+    Cruise missile trails, prog after-images and the points and skulls left behind by family members and
+    generators.  They only ever sit still for a while and vanish, so instead of sprites in `Engine.all_group`
+    (updated, collision checked and walked like every other sprite) they are rows in a few arrays: the top left
+    position, the frames left to live, the image and an owner (the missile a trail belongs to).
+
+    `age()` counts every particle down in one numpy operation per frame and drops the ones that ran out.
+    Particles are drawn over the sprites, oldest first.  Nothing in the game reads them, so an engine that doesn't
+    draw doesn't keep them at all.
+    """
+
+    def __init__(self, capacity: int = 256, enabled: bool = True):
+        """
+        args:
+            capacity (int): The number of rows to start with.  Grows as needed.
+            enabled (bool): Keep particles.  When off, adding one does nothing.
+        """
+        self.enabled = enabled
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.images = np.empty(capacity, dtype=object)
+        self.owners = np.empty(capacity, dtype=object)
+
+    def _columns(self) -> Tuple[np.ndarray, ...]:
+        return (self.x, self.y, self.lifetime, self.images, self.owners)
+
+    def _grow(self, capacity: int):
+        """ Make room for at least `capacity` particles, keeping the ones there are. """
+        size = max(len(self.lifetime), 1)
+        while size < capacity:
+            size *= 2
+        columns = []
+        for column in self._columns():
+            grown = np.zeros(size, dtype=column.dtype) if column.dtype != object else np.empty(size, dtype=object)
+            grown[:self.count] = column[:self.count]
+            columns.append(grown)
+        (self.x, self.y, self.lifetime, self.images, self.owners) = columns
+
+    def add(self, image: pygame.Surface, center: Tuple[int, int], lifetime: int = 15, owner: Any = None):
+        """
+        Show an image for a number of frames, starting with the current one.
+
+        args:
+            image (pygame.Surface): The image.  It must not be changed afterwards.
+            center (Tuple[int, int]): Where to center it, on the screen.
+            lifetime (int): How many frames it is drawn for.  Defaults to 15, for points and skulls.
+            owner (Any): What it belongs to, for `remove_owned()`.
+        """
+        if not self.enabled:
+            return
+
+        index = self.count
+        if index == len(self.lifetime):
+            self._grow(index + 1)
+        (width, height) = image.get_size()
+        # The same top left as a rect of the image centered there.
+        self.x[index] = center[0] - width // 2
+        self.y[index] = center[1] - height // 2
+        self.lifetime[index] = lifetime
+        self.images[index] = image
+        self.owners[index] = owner
+        self.count = index + 1
+
+    def age(self):
+        """ Count one frame off every particle and drop the ones that are done, keeping the rest in order. """
+        count = self.count
+        if not count:
+            return
+
+        lifetime = self.lifetime[:count]
+        lifetime -= 1
+        self._keep(lifetime > 0)
+
+    def _keep(self, keep: np.ndarray):
+        """ Drop the particles that aren't marked to keep. """
+        count = self.count
+        kept = int(np.count_nonzero(keep))
+        if kept == count:
+            return
+        for column in self._columns():
+            column[:kept] = column[:count][keep]
+        # Let go of the images and owners that were dropped.
+        self.images[kept:count] = None
+        self.owners[kept:count] = None
+        self.count = kept
+
+    def remove_owned(self, owner: Any):
+        """ Drop every particle that belongs to the owner. """
+        if self.count:
+            self._keep(self.owners[:self.count] != owner)
+
+    def disown(self, owner: Any):
+        """ Let the owner's particles live on without it, so `remove_owned()` no longer drops them. """
+        if self.count:
+            owners = self.owners[:self.count]
+            owners[owners == owner] = None
+
+    def clear(self):
+        """ Drop every particle. """
+        self.images[:self.count] = None
+        self.owners[:self.count] = None
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Tuple[pygame.Surface, int, int]]:
+        """ The (image, x, y) of each particle, oldest first, with the top left on the screen. """
+        count = self.count
+        return zip(self.images[:count].tolist(), self.x[:count].tolist(), self.y[:count].tolist())
+
+    def rects(self) -> List[Tuple[pygame.Surface, Tuple[int, int, int, int]]]:
+        """ The image and screen (x, y, width, height) of each particle, oldest first. """
+        return [(image, (x, y) + image.get_size()) for (image, x, y) in self]
+
+    def get_state(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, list, list]:
+        """ A copy of the particles, for `set_state()`. """
+        count = self.count
+        return (self.x[:count].copy(), self.y[:count].copy(), self.lifetime[:count].copy(),
+                self.images[:count].tolist(), self.owners[:count].tolist())
+
+    def set_state(self, state: Optional[tuple]):
+        """
+        Put back the particles from `get_state()`.
+
+        args:
+            state (tuple): The copy, or None for no particles.
+        """
+        self.clear()
+        if state is None:
+            return
+        (x, y, lifetime, images, owners) = state
+        count = len(lifetime)
+        self._grow(count)
+        self.x[:count] = x
+        self.y[:count] = y
+        self.lifetime[:count] = lifetime
+        self.images[:count] = images
+        self.owners[:count] = owners
+        self.count = count
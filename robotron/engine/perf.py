@@ -0,0 +1,243 @@
+"""Opt in timers and counters for finding where the time of a step goes."""
+import gc
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import pygame
+
+# Step phases, in the order they are reported.  'engine' is the whole engine step, which the next five break down
+# (collisions are checked during the sprite updates and level setup, so that time is counted there as well).
+PHASES = ('engine', 'updates', 'collisions', 'level', 'entity_table', 'draw', 'observation', 'info')
+
+perf_counter = time.perf_counter
+
+
+class TimedIndex:
+    """ Wraps a collision index (see `SpatialIndex`) and times every check. """
+
+    def __init__(self, index, stats: 'PerfStats'):
+        """
+        args:
+            index (SpatialIndex): The index to wrap.
+            stats (PerfStats): Where the time goes.
+        """
+        self.index = index
+        self.stats = stats
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.index, name)
+
+    def spritecollide(self, sprite: pygame.sprite.Sprite, group: pygame.sprite.Group) -> List[pygame.sprite.Sprite]:
+        start = perf_counter()
+        result = self.index.spritecollide(sprite, group)
+        self.stats.add_time('collisions', perf_counter() - start)
+        return result
+
+    def collides(self, sprite: pygame.sprite.Sprite, group: pygame.sprite.Group) -> bool:
+        start = perf_counter()
+        result = self.index.collides(sprite, group)
+        self.stats.add_time('collisions', perf_counter() - start)
+        return result
+
+    def overlaps(self, sprite: pygame.sprite.Sprite) -> bool:
+        start = perf_counter()
+        result = self.index.overlaps(sprite)
+        self.stats.add_time('collisions', perf_counter() - start)
+        return result
+
+
+class PerfStats:
+    """
+    Timers and counters for an engine, turned on with `Engine.enable_perf()` (or `RobotronEnv(profile=True)`).
+    Steps are timed between `begin_step()` and `end_step()`.
+
+    Keeps the time spent in each step phase (see `PHASES`), the update time and call count of each sprite class,
+    the sprites created per class, the number of sprites in each group, and how many Python memory blocks and
+    garbage collections each step cost.  The engine's phase methods and collision index are wrapped on that one
+    engine, so engines without stats run exactly the code they always did.
+    """
+
+    def __init__(self, engine):
+        """
+        Start measuring an engine.  Call after `Engine.track_entities()` so the entity table is measured too.
+
+        args:
+            engine (Engine): The engine to measure.
+        """
+        self.engine = engine
+        self.clear()
+
+        engine.spatial = TimedIndex(engine.spatial, self)
+        engine._initialize_level = self.timed('level', engine._initialize_level)
+        engine.draw = self.timed('draw', engine.draw)
+        if engine.entity_table is not None:
+            engine.entity_table.refresh = self.timed('entity_table', engine.entity_table.refresh)
+        engine.all_group.listeners.append(self)
+
+    def clear(self):
+        """ Zero every timer and counter. """
+        self.steps = 0
+        self.frames = 0
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES + ('total',), 0.0)
+        self.update_times: Dict[str, float] = {}
+        self.update_calls: Dict[str, int] = {}
+        self.created: Dict[str, int] = {}
+        self.removed = 0
+        self.blocks = 0
+        self.collections = 0
+        self.last_step: Dict[str, Any] = {}
+        self._step_phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self._step_start = None
+        self._lap = None
+        self._blocks = 0
+        self._collections = 0
+
+    def timed(self, phase: str, function: Callable) -> Callable:
+        """
+        Wrap a function so its time is added to a phase.
+
+        args:
+            phase (str): One of `PHASES`.
+            function (Callable): The function to time.
+
+        returns:
+            Callable: The wrapped function.
+        """
+        def _timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add_time(phase, perf_counter() - start)
+        return _timed
+
+    def add_time(self, phase: str, seconds: float):
+        """ Add time to a phase of the current step. """
+        self._step_phases[phase] += seconds
+
+    def add(self, sprite: pygame.sprite.Sprite):
+        """ Called by `all_group` when a sprite is added. """
+        name = type(sprite).__name__
+        self.created[name] = self.created.get(name, 0) + 1
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """ Called by `all_group` when a sprite is removed. """
+        self.removed += 1
+
+    def update_sprites(self):
+        """ Update every sprite (like `all_group.update()` or the batches do), timing each sprite class. """
+        engine = self.engine
+        times = self.update_times
+        calls = self.update_calls
+        start = perf_counter()
+
+        if engine.batch is None:
+            others = engine.all_group.sprites()
+            batches = []
+        else:
+            others = list(engine.batch._others)
+            batches = engine.batch._unique_batches
+
+        for sprite in others:
+            name = type(sprite).__name__
+            sprite_start = perf_counter()
+            sprite.update()
+            times[name] = times.get(name, 0.0) + perf_counter() - sprite_start
+            calls[name] = calls.get(name, 0) + 1
+        for batch in batches:
+            name = type(batch).__name__
+            batch_start = perf_counter()
+            batch.update()
+            times[name] = times.get(name, 0.0) + perf_counter() - batch_start
+            calls[name] = calls.get(name, 0) + 1
+
+        self.add_time('updates', perf_counter() - start)
+
+    def begin_step(self):
+        """ Start timing a step. """
+        for phase in self._step_phases:
+            self._step_phases[phase] = 0.0
+        self._blocks = sys.getallocatedblocks()
+        self._collections = sum(stats['collections'] for stats in gc.get_stats())
+        self._step_start = self._lap = perf_counter()
+
+    def lap(self, phase: str):
+        """ Add the time since the last lap (or the start of the step) to a phase. """
+        now = perf_counter()
+        self.add_time(phase, now - self._lap)
+        self._lap = now
+
+    def end_step(self, frames: int = 1) -> Dict[str, Any]:
+        """
+        Finish timing a step and add it to the totals.
+
+        args:
+            frames (int): The frames the step played.
+
+        returns:
+            Dict[str, Any]: The step's 'time', seconds in each of the 'phases', the 'groups' sizes afterwards and
+                the memory 'blocks' and garbage 'collections' it cost.
+        """
+        total = perf_counter() - self._step_start
+        blocks = sys.getallocatedblocks() - self._blocks
+        collections = sum(stats['collections'] for stats in gc.get_stats()) - self._collections
+
+        self.steps += 1
+        self.frames += frames
+        for (phase, seconds) in self._step_phases.items():
+            self.phases[phase] += seconds
+        self.phases['total'] += total
+        self.blocks += blocks
+        self.collections += collections
+
+        self.last_step = {
+            'time': total,
+            'phases': dict(self._step_phases),
+            'groups': self.group_sizes(),
+            'blocks': blocks,
+            'collections': collections,
+        }
+        return self.last_step
+
+    def group_sizes(self) -> Dict[str, int]:
+        """ The number of sprites in each of the engine's groups, and of particles. """
+        engine = self.engine
+        return {
+            'all': len(engine.all_group),
+            'enemy': len(engine.enemy_group),
+            'family': len(engine.family_group),
+            'to_kill': len(engine.to_kill_group),
+            'particles': len(engine.particles),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        The totals since the stats were enabled (or last cleared).
+
+        returns:
+            Dict[str, Any]: With keys:
+                steps, frames: The steps and frames measured.
+                phases: Seconds spent in each of `PHASES`, and the 'total' of every step.
+                classes: For each sprite class (or batch), the 'calls' and the 'time' in seconds of its updates.
+                groups: The number of sprites in each group (and of particles) right now.
+                allocations: The 'sprites_created' per class (including recycled ones), 'sprites_removed', the net
+                    Python memory 'blocks' allocated and the garbage 'collections' run while stepping.
+                sprite_pool: The engine's `SpritePool.get_stats()`, since the engine started.
+        """
+        return {
+            'steps': self.steps,
+            'frames': self.frames,
+            'phases': dict(self.phases),
+            'classes': {name: {'calls': self.update_calls[name], 'time': self.update_times[name]}
+                        for name in self.update_times},
+            'groups': self.group_sizes(),
+            'allocations': {
+                'sprites_created': dict(self.created),
+                'sprites_removed': self.removed,
+                'blocks': self.blocks,
+                'collections': self.collections,
+            },
+            'sprite_pool': self.engine.sprite_pool.get_stats(),
+        }
+
@@ -0,0 +1,97 @@
+"""Recycling of short-lived sprites (bullets, shells and missiles) instead of constructing new ones."""
+from typing import TYPE_CHECKING, Dict, List
+
+import pygame
+
+if TYPE_CHECKING:
+    from .engine import Engine
+
+
+class Pooled:
+    """
+    Mixin for sprites that go back to their engine's `SpritePool` when they are killed.  Pooled classes have to
+    implement `reinit()` with the same arguments as their constructor (less the engine).
+    """
+
+    def kill(self):
+        if self.alive():
+            super().kill()
+            self.engine.sprite_pool.release(self)
+
+
+class SpritePool:
+    """
+    Free lists of killed sprites, by class.  `acquire()` sets up a free sprite with `reinit()`, which leaves it
+    just like a new one (including any random numbers drawn), so pooled games play move for move the same as
+    unpooled ones.
+
+    Killed sprites only become free at the end of the frame (`recycle()`).  The group being updated still holds
+    them until then, and a sprite reused in the frame it was killed could be updated twice.
+    """
+
+    def __init__(self, engine: 'Engine', enabled: bool = True):
+        """
+        args:
+            engine (Engine): The engine the sprites are made for.
+            enabled (bool): Recycle sprites.  When off every sprite is constructed new, but still counted.
+        """
+        self.engine = engine
+        self.enabled = enabled
+        self.free: Dict[type, List[pygame.sprite.Sprite]] = {}
+        self.pending: List[pygame.sprite.Sprite] = []
+        self.created: Dict[str, int] = {}
+        self.reused: Dict[str, int] = {}
+
+    def acquire(self, cls: type, *args, **kwargs) -> pygame.sprite.Sprite:
+        """
+        Get a sprite of a pooled class, recycled if one is free.
+
+        args:
+            cls (type): The sprite class.
+            *args, **kwargs: The constructor arguments, without the engine.
+
+        returns:
+            pygame.sprite.Sprite: The sprite, not in any group yet.
+        """
+        name = cls.__name__
+        free = self.free.get(cls)
+        if free:
+            sprite = free.pop()
+            sprite.reinit(*args, **kwargs)
+            self.reused[name] = self.reused.get(name, 0) + 1
+            return sprite
+
+        self.created[name] = self.created.get(name, 0) + 1
+        return cls(self.engine, *args, **kwargs)
+
+    def release(self, sprite: pygame.sprite.Sprite):
+        """ Called when a pooled sprite is killed.  It is free from the end of the frame. """
+        if self.enabled:
+            self.pending.append(sprite)
+
+    def recycle(self):
+        """ Free the sprites killed this frame.  Called by the engine at the end of every frame. """
+        if self.pending:
+            for sprite in self.pending:
+                self.free.setdefault(type(sprite), []).append(sprite)
+            self.pending.clear()
+
+    def reload(self):
+        """ Drop sprites that are back in play after an engine state was restored (see `Engine.set_state()`). """
+        self.pending = [sprite for sprite in self.pending if not sprite.alive()]
+        for (cls, free) in self.free.items():
+            self.free[cls] = [sprite for sprite in free if not sprite.alive()]
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        The size of each pool.
+
+        returns:
+            Dict[str, Dict[str, int]]: For each pooled class, the sprites 'created', the times one was 'reused'
+                and how many are 'free' right now.  Sprites restored from a pickled state join the pools too, so
+                a pool can hold more than it created.
+        """
+        free = {cls.__name__: len(sprites) for (cls, sprites) in self.free.items()}
+        return {name: {'created': self.created.get(name, 0), 'reused': self.reused.get(name, 0),
+                       'free': free.get(name, 0)}
+                for name in {**self.created, **self.reused, **free}}
@@ -0,0 +1,166 @@
+"""A play area renderer that composites sprites into a numpy array instead of blitting pygame surfaces."""
+import weakref
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pygame
+
+# Luma weights scaled so they sum to 256, the same as `FramePreprocessor.GRAY_WEIGHTS`.
+GRAY_WEIGHTS = (77, 150, 29)
+
+# Bitmaps by the id of their image, shared by every renderer in the process.  Entries go when their image does.
+_bitmaps: Dict[int, 'Bitmap'] = {}
+
+
+class Bitmap:
+    """
+    A sprite image as numpy arrays, ready to composite.
+
+    Images are copied like pygame blits them onto the (RGB, alpha-less) play area: opaque images are copied
+    whole, colorkeyed images and images whose alpha is only ever 0 or 255 skip the transparent pixels through a
+    mask, and anything else is alpha blended (to within one level of pygame's rounding; no sprite in the game
+    has partial alpha).
+    """
+
+    def __init__(self, image: pygame.Surface):
+        """
+        args:
+            image (pygame.Surface): The sprite image.  It must not be changed afterwards.
+        """
+        (width, height) = image.get_size()
+        rgba = np.frombuffer(pygame.image.tobytes(image, 'RGBA'), dtype=np.uint8).reshape(height, width, 4)
+        self.rgb = np.ascontiguousarray(rgba[..., :3])
+        self.size = (width, height)
+        self._gray = None
+
+        alpha = rgba[..., 3] if image.get_flags() & pygame.SRCALPHA else np.full((height, width), 255, np.uint8)
+        surface_alpha = image.get_alpha()
+        if surface_alpha is not None and surface_alpha < 255:
+            alpha = (alpha.astype(np.uint16) * surface_alpha // 255).astype(np.uint8)
+        colorkey = image.get_colorkey()
+        if colorkey is not None:
+            alpha = np.where(np.any(self.rgb != colorkey[:3], axis=2), alpha, 0).astype(np.uint8)
+
+        # Opaque images need neither.
+        self.mask: Optional[np.ndarray] = None
+        self.alpha: Optional[np.ndarray] = None
+        if not np.all(alpha == 255):
+            if np.all((alpha == 0) | (alpha == 255)):
+                self.mask = alpha == 255
+            else:
+                self.alpha = alpha.astype(np.uint16)
+
+    @property
+    def gray(self) -> np.ndarray:
+        """ The image in grayscale, made the first time it is needed. """
+        if self._gray is None:
+            rgb = self.rgb.astype(np.uint16)
+            gray = rgb[..., 0] * GRAY_WEIGHTS[0] + rgb[..., 1] * GRAY_WEIGHTS[1] + rgb[..., 2] * GRAY_WEIGHTS[2]
+            self._gray = (gray >> 8).astype(np.uint8)
+        return self._gray
+
+
+def get_bitmap(image: pygame.Surface) -> Bitmap:
+    """
+    Get the bitmap of an image, made once per process.  Like the graphics, images must never be changed.
+
+    args:
+        image (pygame.Surface): The sprite image.
+
+    returns:
+        Bitmap: Its bitmap.
+    """
+    key = id(image)
+    bitmap = _bitmaps.get(key)
+    if bitmap is None:
+        bitmap = _bitmaps[key] = Bitmap(image)
+        weakref.finalize(image, _bitmaps.pop, key, None)
+    return bitmap
+
+
+class NumpyRenderer:
+    """
+    Draws sprites into a numpy array with slice assignments, in the same order and with the same result as
+    blitting them onto a black pygame surface.  Can draw straight to grayscale, with the same luma as
+    `FramePreprocessor`, which skips converting every pixel of the RGB frame.
+    """
+
+    def __init__(self, size: Tuple[int, int], offset: Tuple[int, int], grayscale: bool = False,
+                 out: Optional[np.ndarray] = None):
+        """
+        args:
+            size (Tuple[int, int]): The width and height of the play area.
+            offset (Tuple[int, int]): The screen position of the play area's top left corner.
+            grayscale (bool): Draw a (height, width) grayscale image instead of (height, width, 3) RGB.
+            out (np.ndarray): The array to draw into.  Allocated if not given.
+        """
+        (width, height) = size
+        shape = (height, width) if grayscale else (height, width, 3)
+        if out is None:
+            out = np.zeros(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(f'Expected a {shape} uint8 array, not {out.shape} {out.dtype}')
+        self.canvas = out
+        self.offset = offset
+        self.grayscale = grayscale
+
+    def draw(self, sprites: Iterable[pygame.sprite.Sprite],
+             particles: Optional[Iterable[Tuple[pygame.Surface, int, int]]] = None) -> np.ndarray:
+        """
+        Clear the canvas and draw the sprites, in order, at their rects, then the particles over them.
+
+        args:
+            sprites (Iterable[pygame.sprite.Sprite]): The sprites, like `Engine.all_group`.
+            particles (Iterable[Tuple[pygame.Surface, int, int]]): The (image, x, y) of images to draw at screen
+                positions, like `Engine.particles`.
+
+        returns:
+            np.ndarray: The canvas.
+        """
+        self.canvas.fill(0)
+        paste = self._paste
+        for sprite in sprites:
+            rect = sprite.rect
+            paste(sprite.image, rect.x, rect.y)
+        if particles:
+            for (image, x, y) in particles:
+                paste(image, x, y)
+        return self.canvas
+
+    def _paste(self, image: pygame.Surface, x: int, y: int):
+        """ Draw an image with its top left at a screen position. """
+        canvas = self.canvas
+        grayscale = self.grayscale
+        bitmap = _bitmaps.get(id(image))
+        if bitmap is None:
+            bitmap = get_bitmap(image)
+        (height, width) = canvas.shape[:2]
+        (sprite_width, sprite_height) = bitmap.size
+        left = x - self.offset[0]
+        top = y - self.offset[1]
+        right = left + sprite_width
+        bottom = top + sprite_height
+        source = bitmap.gray if grayscale else bitmap.rgb
+        mask = bitmap.mask
+        alpha = bitmap.alpha
+
+        if left < 0 or top < 0 or right > width or bottom > height:
+            # Clip to the canvas.
+            (x0, y0, x1, y1) = (max(left, 0), max(top, 0), min(right, width), min(bottom, height))
+            if x0 >= x1 or y0 >= y1:
+                return
+            crop = (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+            source = source[crop]
+            mask = mask[crop] if mask is not None else None
+            alpha = alpha[crop] if alpha is not None else None
+            (left, top, right, bottom) = (x0, y0, x1, y1)
+
+        target = canvas[top:bottom, left:right]
+        if mask is not None:
+            np.copyto(target, source, where=mask if grayscale else mask[..., None])
+        elif alpha is not None:
+            if not grayscale:
+                alpha = alpha[..., None]
+            target[...] = (source * alpha + target * (255 - alpha)) // 255
+        else:
+            target[...] = source
@@ -0,0 +1,557 @@
+"""Snapshots of the full game state, for rolling an engine back (or copying it) without replaying."""
+import importlib
+import io
+import pickle
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+from .config import EntityConfig
+from .graphics import convert
+
+# Engine attributes that change while the game plays.
+ENGINE_FIELDS = ('frame', 'level', 'score', 'lives', 'extra_lives', 'done', 'family_collected', 'player')
+# The engine's sprite groups, in the order they are restored.
+ENGINE_GROUPS = ('all_group', 'enemy_group', 'family_group', 'to_kill_group')
+
+# Sprite attributes holding these types are changed in place while the game plays, so they are copied.
+COPIED_TYPES = (pygame.Rect, pygame.math.Vector2)
+
+# The only globals a pickled state refers to: the state itself and what numpy needs to rebuild arrays.
+SAFE_GLOBALS = {
+    ('robotron.engine.snapshot', 'EngineState'),
+    ('numpy', 'dtype'),
+    ('numpy', 'ndarray'),
+    ('numpy.core.multiarray', '_reconstruct'),
+    ('numpy._core.multiarray', '_reconstruct'),
+    ('numpy.core.numeric', '_frombuffer'),
+    ('numpy._core.numeric', '_frombuffer'),
+    ('builtins', 'set'),
+    ('builtins', 'frozenset'),
+    ('builtins', 'bytearray'),
+    ('builtins', 'complex'),
+}
+# Sprite and group classes a state can name.
+DECODED_MODULES = ('robotron.', 'pygame.')
+
+
+class GroupMembers:
+    """ A sprite group owned by a sprite (like a generator's spawns) and the sprites it held. """
+
+    __slots__ = ('group', 'sprites')
+
+    def __init__(self, group: pygame.sprite.AbstractGroup, sprites: List[pygame.sprite.Sprite]):
+        self.group = group
+        self.sprites = sprites
+
+
+class EngineState:
+    """
+    Everything about an `Engine` that changes while the game plays: every sprite's attributes (positions, timers,
+    animation steps, targets, ...), the group memberships, the random number generator, score, lives, level and
+    frame, the particles, plus the entity table and batch schedules when they are in use.
+
+    Create one with `Engine.get_state()` and apply it with `Engine.set_state()`, as many times as you like.
+
+    A state holds the engine's own sprite objects, so taking and restoring one is a shallow copy of each sprite's
+    attributes rather than a rebuild of the level.  Pickling a state encodes it without any references to the
+    engine: sprites become class names and attribute tables, sprite references become indexes and images become
+    graphics names (or pixels, for images drawn at runtime).  An unpickled state, or a state taken from another
+    engine, is decoded into new sprites the first time it is applied to an engine.
+    """
+
+    def __init__(self,
+                 engine,
+                 fields: Dict[str, Any],
+                 random_state: tuple,
+                 sprites: List[Tuple[pygame.sprite.Sprite, Dict[str, Any], Tuple[str, ...]]],
+                 groups: Dict[str, List[pygame.sprite.Sprite]],
+                 entity_table: Optional[tuple] = None,
+                 batch: Optional[tuple] = None,
+                 particles: Optional[tuple] = None):
+        """
+        Use `Engine.get_state()` rather than creating these directly.
+
+        args:
+            engine (Engine): The engine the sprites belong to.
+            fields (Dict[str, Any]): Values of `ENGINE_FIELDS`.
+            random_state (tuple): The engine's `random.getstate()`.
+            sprites (List[Tuple[Sprite, Dict[str, Any], Tuple[str, ...]]]): Every sprite in play with the copy of
+                its attributes from `copy_sprite()`.
+            groups (Dict[str, List[Sprite]]): The members of each of `ENGINE_GROUPS`, in order.
+            entity_table (tuple): `EntityTable.get_state()`, if the engine tracks entities.
+            batch (tuple): `BatchedUpdater.get_state()`, if the engine is batched.
+            particles (tuple): `Particles.get_state()`.
+        """
+        self.engine = engine
+        self.fields = fields
+        self.random_state = random_state
+        self.sprites = sprites
+        self.groups = groups
+        self.entity_table = entity_table
+        self.batch = batch
+        self.particles = particles
+        self._encoded = None
+
+    @property
+    def frame(self) -> int:
+        """ The frame the state was taken on. """
+        return self.fields['frame'] if self._encoded is None else self._encoded['fields']['frame']
+
+    def __getstate__(self) -> dict:
+        return {'encoded': self._encoded if self._encoded is not None else encode(self)}
+
+    def __setstate__(self, state: dict):
+        self.engine = None
+        self.fields = self.random_state = self.sprites = self.groups = self.entity_table = self.batch = None
+        self.particles = None
+        self._encoded = state['encoded']
+
+
+# Attribute names to check when copying a sprite, per class and attribute count.
+_checked_keys: Dict[Tuple[type, int], Tuple[str, ...]] = {}
+
+
+def _keys_to_check(sprite: pygame.sprite.Sprite, attributes: Dict[str, Any],
+                   shared: Sequence[Any]) -> Tuple[str, ...]:
+    """
+    The attributes of the sprite that may hold something changed in place.  Attributes that are None are
+    included since they might be given a vector later.  Cached per class and attribute count.
+    """
+    key = (type(sprite), len(attributes))
+    keys = _checked_keys.get(key)
+    if keys is None:
+        keys = tuple(name for (name, value) in attributes.items()
+                     if value is None or (isinstance(value, COPIED_TYPES + (pygame.sprite.AbstractGroup,)) and
+                                          not any(value is item for item in shared)))
+        _checked_keys[key] = keys
+    return keys
+
+
+def _copied_names(attributes: Dict[str, Any], shared: Sequence[Any]) -> Tuple[str, ...]:
+    """ The names of the attributes `restore_sprite()` has to copy. """
+    return tuple(name for (name, value) in attributes.items()
+                 if type(value) in COPIED_TYPES + (GroupMembers,) and not any(value is item for item in shared))
+
+
+def copy_sprite(sprite: pygame.sprite.Sprite, shared: Sequence[Any]) -> Tuple[Dict[str, Any], Tuple[str, ...]]:
+    """
+    Copy a sprite's attributes.  Rects and vectors are copied and groups the sprite owns are replaced by their
+    members.  Everything else (images, animations, config) is never changed in place, so it is shared.
+
+    args:
+        sprite (pygame.sprite.Sprite): The sprite to copy.
+        shared (Sequence[Any]): Engine objects (like the play area rect) that sprites hold but never change.
+
+    returns:
+        (Dict[str, Any], Tuple[str, ...]): The copied attributes and the names of the ones that were copied.
+    """
+    attributes = sprite.__dict__.copy()
+    copied = []
+    for name in _keys_to_check(sprite, attributes, shared):
+        value = attributes[name]
+        if value is None:
+            continue
+        if type(value) in COPIED_TYPES:
+            attributes[name] = value.copy()
+        elif isinstance(value, pygame.sprite.AbstractGroup):
+            attributes[name] = GroupMembers(value, value.sprites())
+        else:
+            continue
+        copied.append(name)
+    return (attributes, tuple(copied))
+
+
+def restore_sprite(sprite: pygame.sprite.Sprite, saved: Dict[str, Any], copied: Tuple[str, ...]):
+    """
+    Put a sprite's attributes back the way `copy_sprite()` found them.  The sprite gets new rects and vectors
+    (the saved ones are copied again so the state can be reused), so anything that holds on to a sprite's rect,
+    like the spatial index, has to be reloaded by the caller.
+
+    args:
+        sprite (pygame.sprite.Sprite): The sprite to restore.
+        saved (Dict[str, Any]): The copy from `copy_sprite()`.
+        copied (Tuple[str, ...]): The names from `copy_sprite()`.
+    """
+    attributes = saved.copy()
+    for name in copied:
+        value = attributes[name]
+        if type(value) is GroupMembers:
+            set_members(value.group, value.sprites)
+            attributes[name] = value.group
+        else:
+            attributes[name] = value.copy()
+    sprite.__dict__ = attributes
+
+
+def set_members(group: pygame.sprite.AbstractGroup, sprites: List[pygame.sprite.Sprite]) -> bool:
+    """
+    Make the group hold exactly these sprites, in this order.
+
+    This swaps the group's member dict directly instead of adding and removing one sprite at a time, so the
+    group's listeners are not told.  Anything that mirrors the group has to be reloaded by the caller.
+
+    args:
+        group (pygame.sprite.AbstractGroup): The group to change.
+        sprites (List[pygame.sprite.Sprite]): The members, in order.
+
+    returns:
+        bool: False if the group already held exactly these sprites.
+    """
+    members = group.spritedict
+    if len(members) == len(sprites) and list(members) == sprites:
+        return False
+
+    new_members = dict.fromkeys(sprites)
+    for sprite in members:
+        if sprite not in new_members:
+            sprite.remove_internal(group)
+    for sprite in sprites:
+        if sprite not in members:
+            sprite.add_internal(group)
+    group.spritedict = new_members
+    group.lostsprites = []
+    return True
+
+
+def capture(engine) -> EngineState:
+    """
+    Take a snapshot of the engine.
+
+    args:
+        engine (Engine): The engine.
+
+    returns:
+        EngineState: The snapshot.
+    """
+    if engine.batch is not None:
+        # Batched grunts and hulks don't keep their countdowns up to date, so a state could not be used elsewhere.
+        engine.batch.store()
+
+    shared = (engine.play_rect,)
+    return EngineState(
+        engine,
+        {name: getattr(engine, name) for name in ENGINE_FIELDS},
+        engine.random.getstate(),
+        [(sprite,) + copy_sprite(sprite, shared) for sprite in engine.all_group],
+        {name: getattr(engine, name).sprites() for name in ENGINE_GROUPS},
+        engine.entity_table.get_state() if engine.entity_table is not None else None,
+        engine.batch.get_state() if engine.batch is not None else None,
+        engine.particles.get_state(),
+    )
+
+
+def restore(engine, state: EngineState):
+    """
+    Put the engine back the way it was when the snapshot was taken.
+
+    args:
+        engine (Engine): The engine.
+        state (EngineState): A snapshot from `capture()`.  States from other engines (or unpickled ones) are
+            decoded into new sprites for this engine first.  An unpickled state keeps the decoded sprites, so
+            restoring it again is as cheap as restoring a state taken from this engine.
+    """
+    if state.engine is not engine:
+        decoded = decode(state._encoded if state._encoded is not None else encode(state), engine)
+        if state.engine is None:
+            state.__dict__.update(decoded.__dict__)
+        state = decoded
+
+    for (name, value) in state.fields.items():
+        setattr(engine, name, value)
+    engine.random.setstate(state.random_state)
+
+    for (sprite, saved, copied) in state.sprites:
+        restore_sprite(sprite, saved, copied)
+    for name in ENGINE_GROUPS:
+        set_members(getattr(engine, name), state.groups[name])
+    engine.spatial.reload()
+    engine.particles.set_state(state.particles)
+
+    if engine.entity_table is not None and state.entity_table is not None:
+        engine.entity_table.set_state(state.entity_table)
+    elif engine.entity_table is not None:
+        engine.entity_table.reload(engine.all_group)
+    if engine.batch is not None and state.batch is not None:
+        engine.batch.set_state(state.batch)
+    elif engine.batch is not None:
+        engine.batch.reload(engine.all_group)
+
+
+class _StateUnpickler(pickle.Unpickler):
+    """ Unpickles states without loading anything that isn't in `SAFE_GLOBALS`. """
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) not in SAFE_GLOBALS:
+            raise pickle.UnpicklingError(f'A pickled state may not refer to {module}.{name}')
+        return super().find_class(module, name)
+
+
+def loads(data: bytes) -> EngineState:
+    """
+    Unpickle a state from a file that might not be trusted, like a replay's keyframes.  Plain `pickle.loads` can
+    run any code; this only allows the state itself and numpy arrays, and `decode()` only creates robotron and
+    pygame sprites and groups.
+
+    args:
+        data (bytes): The pickled state.
+
+    returns:
+        EngineState: The state.
+
+    raises:
+        pickle.UnpicklingError: The data holds something else.
+    """
+    state = _StateUnpickler(io.BytesIO(data)).load()
+    if type(state) is not EngineState:
+        raise pickle.UnpicklingError(f'Expected a pickled EngineState, not {type(state).__name__}')
+    return state
+
+
+def _load_class(module: str, name: str, base: type) -> type:
+    """ Look up a sprite or group class named in an encoded state, refusing anything else. """
+    if module.startswith(DECODED_MODULES):
+        cls = getattr(importlib.import_module(module), name, None)
+        if isinstance(cls, type) and issubclass(cls, base):
+            return cls
+    raise ValueError(f'Not a {base.__name__} class: {module}.{name}')
+
+
+class _Encoder:
+    """ Turns a state into plain Python data (see `encode()`). """
+
+    def __init__(self, state: EngineState):
+        self.engine = state.engine
+        self.saved = {id(sprite): saved for (sprite, saved, _) in state.sprites}
+        self.graphics = {id(image): name for (name, image) in self.engine.graphics.items()}
+        self.shared = {id(self.engine.play_rect): 'play_rect'}
+        self.sprite_index: Dict[int, int] = {}
+        self.sprites: List[Optional[tuple]] = []
+        self.surface_index: Dict[int, int] = {}
+        self.surfaces: List[tuple] = []
+
+    def sprite(self, sprite: pygame.sprite.Sprite) -> int:
+        """ The index of the sprite in the sprite table, encoding it the first time it is seen. """
+        index = self.sprite_index.get(id(sprite))
+        if index is None:
+            index = len(self.sprites)
+            self.sprite_index[id(sprite)] = index
+            self.sprites.append(None)
+            # Sprites that are out of play but still referenced (like a brain's dead target) are taken as is.
+            attributes = self.saved.get(id(sprite), sprite.__dict__)
+            cls = type(sprite)
+            self.sprites[index] = (cls.__module__, cls.__qualname__,
+                                   {name: self.value(value) for (name, value) in attributes.items()
+                                    if name != '_Sprite__g'})
+        return index
+
+    def surface(self, surface: pygame.Surface) -> int:
+        """ The index of the image in the surface table. """
+        index = self.surface_index.get(id(surface))
+        if index is None:
+            index = len(self.surfaces)
+            self.surface_index[id(surface)] = index
+            if id(surface) in self.graphics:
+                self.surfaces.append(('graphic', self.graphics[id(surface)]))
+            else:
+                alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+                self.surfaces.append(('pixels', surface.get_size(), pygame.image.tobytes(surface, 'RGBA'), alpha,
+                                      surface.get_colorkey()))
+        return index
+
+    def value(self, value: Any) -> Any:
+        """ Encode an attribute value.  Containers and objects become tagged tuples. """
+        kind = type(value)
+        if value is None or kind in (int, float, bool, str):
+            return value
+        if id(value) in self.shared:
+            return ('shared', self.shared[id(value)])
+        if value is self.engine:
+            return ('engine',)
+        if kind is pygame.Rect:
+            return ('rect', tuple(value))
+        if kind is pygame.math.Vector2:
+            return ('vector', tuple(value))
+        if kind is pygame.Surface:
+            return ('surface', self.surface(value))
+        if kind is EntityConfig:
+            return ('config', value.name)
+        if kind is GroupMembers:
+            return ('group', type(value.group).__module__, type(value.group).__qualname__,
+                    [self.sprite(sprite) for sprite in value.sprites])
+        if isinstance(value, pygame.sprite.AbstractGroup):
+            return ('group', kind.__module__, kind.__qualname__, [self.sprite(sprite) for sprite in value])
+        if isinstance(value, pygame.sprite.Sprite):
+            return ('sprite', self.sprite(value))
+        if kind is list:
+            return ('list', [self.value(item) for item in value])
+        if kind is tuple:
+            return ('tuple', [self.value(item) for item in value])
+        if kind is dict:
+            return ('dict', [(self.value(key), self.value(item)) for (key, item) in value.items()])
+        raise TypeError(f'Unable to snapshot a {kind.__name__}: {value!r}')
+
+
+def encode(state: EngineState) -> dict:
+    """
+    Encode a state as plain Python data with no references to the engine, sprites or images.
+
+    args:
+        state (EngineState): A live state.
+
+    returns:
+        dict: The encoded state.
+    """
+    encoder = _Encoder(state)
+    for (sprite, _, _) in state.sprites:
+        encoder.sprite(sprite)
+
+    entity_table = None
+    if state.entity_table is not None:
+        (data, mask, rows, free) = state.entity_table
+        entity_table = (data, mask, [(encoder.sprite(sprite), row) for (sprite, row) in rows.items()], free)
+
+    batch = None
+    if state.batch is not None:
+        (others, batches) = state.batch
+        batch = ([encoder.sprite(sprite) for sprite in others],
+                 [encoder.value(batch_state) for batch_state in batches])
+
+    particles = None
+    if state.particles is not None:
+        (x, y, lifetime, images, owners) = state.particles
+        particles = (x, y, lifetime, [encoder.surface(image) for image in images],
+                     [encoder.sprite(owner) if owner is not None else None for owner in owners])
+
+    return {
+        'fields': {name: encoder.value(value) for (name, value) in state.fields.items()},
+        'random_state': state.random_state,
+        'sprites': encoder.sprites,
+        'surfaces': encoder.surfaces,
+        'live': [encoder.sprite(sprite) for (sprite, _, _) in state.sprites],
+        'groups': {name: [encoder.sprite(sprite) for sprite in members] for (name, members) in state.groups.items()},
+        'entity_table': entity_table,
+        'batch': batch,
+        'particles': particles,
+    }
+
+
+class _Decoder:
+    """ Rebuilds a live state for an engine from `encode()` data. """
+
+    def __init__(self, encoded: dict, engine):
+        self.engine = engine
+        self.shared = {'play_rect': engine.play_rect}
+        self.surfaces = [self.surface(surface) for surface in encoded['surfaces']]
+
+        # Create every sprite first so attributes can refer to sprites that come later in the table.
+        self.sprites = []
+        for (module, name, _) in encoded['sprites']:
+            cls = _load_class(module, name, pygame.sprite.Sprite)
+            sprite = cls.__new__(cls)
+            pygame.sprite.Sprite.__init__(sprite)
+            self.sprites.append(sprite)
+        self.attributes = []
+        for (sprite, (_, _, attributes)) in zip(self.sprites, encoded['sprites']):
+            decoded = {name: self.value(value) for (name, value) in attributes.items()}
+            decoded['_Sprite__g'] = sprite.__dict__['_Sprite__g']
+            self.attributes.append(decoded)
+
+    def surface(self, encoded: tuple) -> pygame.Surface:
+        """ Look up or rebuild an image. """
+        if encoded[0] == 'graphic':
+            return self.engine.graphics[encoded[1]]
+
+        (_, size, pixels, alpha, colorkey) = encoded
+        surface = pygame.image.frombytes(pixels, size, 'RGBA')
+        if alpha:
+            return convert(surface, alpha=True)
+        surface = convert(surface)
+        if colorkey is not None:
+            surface.set_colorkey(colorkey)
+        return surface
+
+    def value(self, value: Any) -> Any:
+        """ Decode an attribute value. """
+        if type(value) is not tuple:
+            return value
+
+        tag = value[0]
+        if tag == 'shared':
+            return self.shared[value[1]]
+        if tag == 'engine':
+            return self.engine
+        if tag == 'rect':
+            return pygame.Rect(value[1])
+        if tag == 'vector':
+            return pygame.math.Vector2(value[1])
+        if tag == 'surface':
+            return self.surfaces[value[1]]
+        if tag == 'config':
+            return self.engine.config.entity(value[1])
+        if tag == 'group':
+            (_, module, name, members) = value
+            group = _load_class(module, name, pygame.sprite.AbstractGroup)()
+            return GroupMembers(group, [self.sprites[index] for index in members])
+        if tag == 'sprite':
+            return self.sprites[value[1]]
+        if tag == 'list':
+            return [self.value(item) for item in value[1]]
+        if tag == 'tuple':
+            return tuple(self.value(item) for item in value[1])
+        if tag == 'dict':
+            return {self.value(key): self.value(item) for (key, item) in value[1]}
+        raise ValueError(f'Unknown snapshot value: {tag}')
+
+
+def decode(encoded: dict, engine) -> EngineState:
+    """
+    Rebuild a live state for an engine from `encode()` data.  The sprites are new objects.
+
+    args:
+        encoded (dict): The encoded state.
+        engine (Engine): The engine the sprites will belong to.
+
+    returns:
+        EngineState: A live state for the engine.
+    """
+    decoder = _Decoder(encoded, engine)
+    sprites = decoder.sprites
+    shared = (engine.play_rect,)
+
+    # Sprites out of play still need their attributes, but they are set once here and never restored.
+    live = set(encoded['live'])
+    for (index, (sprite, attributes)) in enumerate(zip(sprites, decoder.attributes)):
+        if index not in live:
+            sprite.__dict__.update({name: value.group if type(value) is GroupMembers else value
+                                    for (name, value) in attributes.items()})
+
+    entity_table = None
+    if encoded['entity_table'] is not None:
+        (data, mask, rows, free) = encoded['entity_table']
+        entity_table = (data, mask, {sprites[index]: row for (index, row) in rows}, free)
+
+    batch = None
+    if encoded['batch'] is not None:
+        (others, batches) = encoded['batch']
+        batch = ([sprites[index] for index in others], [decoder.value(batch_state) for batch_state in batches])
+
+    particles = None
+    if encoded.get('particles') is not None:
+        (x, y, lifetime, images, owners) = encoded['particles']
+        particles = (x, y, lifetime, [decoder.surfaces[index] for index in images],
+                     [sprites[index] if index is not None else None for index in owners])
+
+    state = EngineState(
+        engine,
+        {name: decoder.value(value) for (name, value) in encoded['fields'].items()},
+        encoded['random_state'],
+        [(sprites[index], decoder.attributes[index], _copied_names(decoder.attributes[index], shared))
+         for index in encoded['live']],
+        {name: [sprites[index] for index in members] for (name, members) in encoded['groups'].items()},
+        entity_table,
+        batch,
+        particles,
+    )
+    state._encoded = encoded
+    return state
@@ -0,0 +1,174 @@
+"""Collision indexes used for all sprite collision checks."""
+from typing import Dict, List
+
+import pygame
+
+from .entity_table import TrackedGroup
+
+
+class RectList:
+    """
+    The sprites of a tracked group and their rects, kept in two parallel lists in the group's order.
+
+    Sprites move by changing their rect in place, so the stored rects are always current and the list never needs
+    rebuilding.  A sprite that replaces its rect object must be passed to `SpatialIndex.move()`.
+    """
+
+    def __init__(self, group: TrackedGroup):
+        """
+        Start mirroring a group.
+
+        args:
+            group (TrackedGroup): The group to mirror.
+        """
+        self.group = group
+        self.sprites: List[pygame.sprite.Sprite] = []
+        self.rects: List[pygame.Rect] = []
+        self.reload()
+        group.listeners.append(self)
+
+    def reload(self):
+        """ Read the group again, after its members were changed without telling its listeners. """
+        self.sprites = self.group.sprites()
+        self.rects = [sprite.rect for sprite in self.sprites]
+
+    def add(self, sprite: pygame.sprite.Sprite):
+        """ Called by the group when a sprite joins it. """
+        self.sprites.append(sprite)
+        self.rects.append(sprite.rect)
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """ Called by the group when a sprite leaves it. """
+        index = self.sprites.index(sprite)
+        del self.sprites[index]
+        del self.rects[index]
+
+    def move(self, sprite: pygame.sprite.Sprite):
+        """ Pick up a replaced rect.  Ignored if the sprite isn't in the group. """
+        if sprite in self.sprites:
+            self.rects[self.sprites.index(sprite)] = sprite.rect
+
+
+class SpatialIndex:
+    """
+    Collision checks against tracked groups, done by pygame in C.
+
+    Every tracked group is mirrored by a `RectList`, and a check is a single `Rect.collidelist` or
+    `Rect.collidelistall` call over the group's rects instead of a Python loop calling `colliderect` per sprite.
+    Results come back in the group's order, so they are exactly what pygame's `spritecollide` returns.  Untracked
+    groups fall back to pygame.
+    """
+
+    def __init__(self, all_group: TrackedGroup, *groups: TrackedGroup):
+        """
+        Start tracking the groups.
+
+        args:
+            all_group (TrackedGroup): Every sprite in play.  Used by `overlaps()`.
+            groups (TrackedGroup): The other groups sprites are checked against.
+        """
+        self.all_group = all_group
+        self._lists: Dict[pygame.sprite.Group, RectList] = {group: RectList(group) for group in (all_group,) + groups}
+
+    def move(self, sprite: pygame.sprite.Sprite):
+        """
+        Tell the index a sprite replaced its rect object (`self.rect = ...`).  Moving a rect in place needs no call.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite with the new rect.
+        """
+        for rect_list in self._lists.values():
+            rect_list.move(sprite)
+
+    def reload(self):
+        """ Read every group again, after an engine state was restored (see `Engine.set_state()`). """
+        for rect_list in self._lists.values():
+            rect_list.reload()
+
+    def spritecollide(self, sprite: pygame.sprite.Sprite, group: pygame.sprite.Group) -> List[pygame.sprite.Sprite]:
+        """
+        Same as `pygame.sprite.spritecollide(sprite, group, False)`.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite to test.
+            group (pygame.sprite.Group): The group to test against.
+
+        returns:
+            List[pygame.sprite.Sprite]: The sprites in the group that collide with the sprite.
+        """
+        rect_list = self._lists.get(group)
+        if rect_list is None:
+            return pygame.sprite.spritecollide(sprite, group, False)
+
+        sprites = rect_list.sprites
+        return [sprites[index] for index in sprite.rect.collidelistall(rect_list.rects)]
+
+    def collides(self, sprite: pygame.sprite.Sprite, group: pygame.sprite.Group) -> bool:
+        """
+        Does the sprite collide with any other sprite in the group?
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite to test.  It never collides with itself.
+            group (pygame.sprite.Group): The group to test against.
+
+        returns:
+            bool: True if there is a collision.
+        """
+        rect_list = self._lists.get(group)
+        if rect_list is None:
+            return any(sprite.rect.colliderect(other.rect) for other in group if other is not sprite)
+
+        sprites = rect_list.sprites
+        index = sprite.rect.collidelist(rect_list.rects)
+        if index < 0:
+            return False
+        if sprites[index] is not sprite:
+            return True
+
+        # The first hit was the sprite itself, so look at the rest.
+        return any(sprites[index] is not sprite for index in sprite.rect.collidelistall(rect_list.rects))
+
+    def overlaps(self, sprite: pygame.sprite.Sprite) -> bool:
+        """
+        Does the sprite overlap any other sprite in play?  Used to keep sprites from spawning on top of each other.
+
+        args:
+            sprite (pygame.sprite.Sprite): The sprite to test.  It doesn't need to be in play yet.
+
+        returns:
+            bool: True if there is an overlap.
+        """
+        return self.collides(sprite, self.all_group)
+
+
+class BruteForceIndex:
+    """
+    Drop in replacement for `SpatialIndex` that loops over every sprite in Python, the way pygame's
+    `spritecollide` does.  Kept to measure the index against.
+    """
+
+    def __init__(self, all_group: pygame.sprite.Group, *groups: pygame.sprite.Group):
+        """
+        args:
+            all_group (pygame.sprite.Group): Every sprite in play.
+            groups (pygame.sprite.Group): Unused.
+        """
+        self.all_group = all_group
+
+    def move(self, sprite: pygame.sprite.Sprite):
+        """ Nothing to index. """
+
+    def reload(self):
+        """ Nothing to index. """
+
+    def spritecollide(self, sprite: pygame.sprite.Sprite, group: pygame.sprite.Group) -> List[pygame.sprite.Sprite]:
+        """ Same as `pygame.sprite.spritecollide(sprite, group, False)`. """
+        return pygame.sprite.spritecollide(sprite, group, False)
+
+    def collides(self, sprite: pygame.sprite.Sprite, group: pygame.sprite.Group) -> bool:
+        """ Does the sprite collide with any other sprite in the group? """
+        return any(sprite.rect.colliderect(other.rect) for other in group if other is not sprite)
+
+    def overlaps(self, sprite: pygame.sprite.Sprite) -> bool:
+        """ Does the sprite overlap any other sprite in play? """
+        return self.collides(sprite, self.all_group)
@@ -0,0 +1,94 @@
+"""
+Robotron Profiler
+
+Plays random actions with `RobotronEnv(profile=True)` and prints where the time went: each step phase, the
+update time of each sprite class, the group sizes and the allocation counters.  With `--pstats` the run is also
+profiled with cProfile and the stats are saved for `pstats`/snakeviz.
+
+    python -m robotron.profile --level 9 --steps 5000
+    python -m robotron.profile --level 9 --steps 5000 --pstats robotron.prof
+"""
+import argparse
+import cProfile
+import pstats
+
+import numpy as np
+
+from .robotron import RobotronEnv
+
+
+def run(env: RobotronEnv, steps: int, seed: int):
+    """
+    Play random actions, starting over whenever the game ends.
+
+    args:
+        env (RobotronEnv): A profiled env.
+        steps (int): How many steps to play.
+        seed (int): Seed for the game and the actions.
+    """
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(env.action_space.n, size=steps)
+    env.reset(seed=seed)
+    for action in actions:
+        (_, _, done, _, _) = env.step(int(action))
+        if done:
+            env.reset()
+
+
+def print_stats(stats: dict):
+    """ Print the tables for `RobotronEnv.get_perf_stats()`. """
+    steps = max(stats['steps'], 1)
+    total = stats['phases']['total'] or 1.0
+    print(f"{stats['steps']} steps, {stats['frames']} frames, {stats['steps'] / total:.1f} steps/sec")
+
+    print(f"\n{'phase':<14} {'total ms':>10} {'us/step':>10} {'%':>6}")
+    for (phase, seconds) in stats['phases'].items():
+        print(f"{phase:<14} {seconds * 1000:>10.1f} {seconds * 1e6 / steps:>10.1f} {seconds * 100 / total:>6.1f}")
+
+    print(f"\n{'class':<18} {'calls':>10} {'us/call':>10} {'total ms':>10} {'created':>8}")
+    created = stats['allocations']['sprites_created']
+    classes = sorted(stats['classes'].items(), key=lambda item: item[1]['time'], reverse=True)
+    for (name, entry) in classes:
+        print(f"{name:<18} {entry['calls']:>10} {entry['time'] * 1e6 / max(entry['calls'], 1):>10.2f} "
+              f"{entry['time'] * 1000:>10.1f} {created.get(name, 0):>8}")
+
+    print(f"\n{'group':<18} {'sprites':>8}")
+    for (name, size) in stats['groups'].items():
+        print(f"{name:<18} {size:>8}")
+
+    allocations = stats['allocations']
+    print(f"\nsprites created: {sum(created.values())}, removed: {allocations['sprites_removed']}, "
+          f"net memory blocks: {allocations['blocks']}, gc collections: {allocations['collections']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile where the time of a Robotron step goes')
+    parser.add_argument('--level', type=int, default=1, help='Level to start at')
+    parser.add_argument('--steps', type=int, default=5000, help='Steps to play')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the game and the random actions')
+    parser.add_argument('--observation-type', default='pixels', choices=RobotronEnv.OBSERVATION_TYPES,
+                        help='Observation type')
+    parser.add_argument('--batched', action='store_true', help='Update grunts, hulks and family in batches')
+    parser.add_argument('--frame-skip', type=int, default=1, help='Frames per step')
+    parser.add_argument('--godmode', action='store_true', help="Can't die, so the level stays in play")
+    parser.add_argument('--pstats', metavar='FILE', help='Also run under cProfile and save the stats here')
+    parser.add_argument('--top', type=int, default=25, help='Functions to print from the cProfile stats')
+    args = parser.parse_args()
+
+    env = RobotronEnv(level=args.level, godmode=args.godmode, observation_type=args.observation_type,
+                      batched=args.batched, frame_skip=args.frame_skip, profile=True)
+    if args.pstats:
+        profiler = cProfile.Profile()
+        profiler.runcall(run, env, args.steps, args.seed)
+        profiler.dump_stats(args.pstats)
+    else:
+        run(env, args.steps, args.seed)
+
+    print_stats(env.get_perf_stats())
+    if args.pstats:
+        print(f"\ncProfile stats saved to {args.pstats}\n")
+        pstats.Stats(args.pstats).sort_stats('cumulative').print_stats(args.top)
+
+
+if __name__ == "__main__":
+    main()
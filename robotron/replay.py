@@ -0,0 +1,86 @@
+"""
+Robotron Replays
+
+Plays back replays recorded with `RobotronEnv.start_recording()`.  By default each replay is played headless as
+fast as possible and checked against the score, level and lives it was recorded with; the exit status is 1 if
+any of them doesn't match.  With `--show` the replay is played on screen instead, from `--start` (seeking from
+the closest keyframe).
+
+    python -m robotron.replay replays/*.replay
+    python -m robotron.replay replays/episode-000003.replay --show --start 1200 --fps 30
+    python -m robotron.replay replays/*.replay --info
+"""
+import argparse
+import sys
+import time
+
+import pygame
+
+from .utils import Replay, ReplayPlayer
+
+
+def show(replay: Replay, start: int, fps: int, config_path: str = None):
+    """
+    Play a replay on screen until it ends or the window is closed.
+
+    args:
+        replay (Replay): The replay.
+        start (int): The frame to start at.
+        fps (int): Frames per second.
+        config_path (str): The config it was recorded with, if not the bundled one.
+    """
+    player = ReplayPlayer(replay, config_path=config_path, headless=False, fps=fps)
+    player.seek(start)
+    while player.play(1):
+        if pygame.event.get(pygame.QUIT):
+            break
+    print(f"{replay.path}: stopped at frame {player.frame}, {player.get_result()}")
+
+
+def verify(replay: Replay, config_path: str = None) -> bool:
+    """ Play a replay headless and print whether it ends the way it was recorded. """
+    player = ReplayPlayer(replay, config_path=config_path)
+    start = time.perf_counter()
+    matches = player.verify()
+    elapsed = time.perf_counter() - start
+    result = player.get_result()
+    recorded = player.get_recorded_result()
+    status = 'OK' if matches else f'MISMATCH (recorded {recorded})'
+    print(f"{replay.path}: {replay.frames} frames, score {result['score']}, level {result['level']}, "
+          f"{replay.frames / max(elapsed, 1e-9):.0f} frames/sec  {status}")
+    return matches
+
+
+def print_info(replay: Replay):
+    """ Print a replay's header. """
+    header = {key: value for (key, value) in replay.header.items() if key not in ('random_state', 'keyframes')}
+    print(f"{replay.path}: {header}, {len(replay.keyframe_frames)} keyframes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play back and verify Robotron replays')
+    parser.add_argument('replays', nargs='+', help='Replay files')
+    parser.add_argument('--info', action='store_true', help="Only print each replay's header")
+    parser.add_argument('--show', action='store_true', help='Play on screen instead of verifying')
+    parser.add_argument('--start', type=int, default=0, help='Frame to start showing at')
+    parser.add_argument('--fps', type=int, default=30, help='Frames per second to show at')
+    parser.add_argument('--config-path', help='The config the replays were recorded with')
+    args = parser.parse_args()
+
+    failed = 0
+    for path in args.replays:
+        replay = Replay(path)
+        if args.info:
+            print_info(replay)
+        elif args.show:
+            show(replay, args.start, args.fps, args.config_path)
+        elif not verify(replay, args.config_path):
+            failed += 1
+
+    if failed:
+        print(f"{failed} of {len(args.replays)} replays didn't match")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
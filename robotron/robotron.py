@@ -20,10 +20,12 @@ Example:
 from typing import Tuple
 import numpy as np
 import gymnasium as gym
-from typing import Optional
+from typing import Optional, Union
 
-from .engine import Engine
-from .utils import crop
+from .engine import Engine, EntityTable, ENTITY_TYPES
+from .engine.raster import NumpyRenderer
+from .utils import FramePreprocessor, FrameRecorder, LazyInfo, ReplayRecorder, TrajectoryWriter
+from .utils.dataset import INFO_KEYS
 
 
 class RobotronEnv(gym.Env):
@@ -32,6 +34,8 @@ class RobotronEnv(gym.Env):
     """
 
     FAMILY_REWARD = 10.0
+    OBSERVATION_TYPES = ('pixels', 'entities')
+    INFO_MODES = ('none', 'basic', 'full', 'lazy')
 
     def __init__(self,
                  level: int = 1,
@@ -42,7 +46,19 @@ class RobotronEnv(gym.Env):
                  always_move: bool = False,
                  render_mode: Optional[str] = None,
                  headless: bool = True,
-                 seed: Optional[int] = None):
+                 seed: Optional[int] = None,
+                 observation_type: str = 'pixels',
+                 max_entities: int = 256,
+                 copy_obs: bool = True,
+                 grayscale: bool = False,
+                 downsample: Union[int, Tuple[int, int]] = 1,
+                 frame_stack: int = 1,
+                 batched: bool = False,
+                 frame_skip: int = 1,
+                 max_pool: bool = False,
+                 profile: bool = False,
+                 info_mode: str = 'full',
+                 renderer: str = 'pygame'):
         """
         Setup the environment
 
@@ -52,12 +68,56 @@ class RobotronEnv(gym.Env):
             godmode (bool): Are you a god? (Can't die.) Default: False
             always_move (bool): Always move/shoot.  Drops action space from 9x9 to 8x8  Default: False
             headless (bool): Skip creating the screen.
+            seed (int): Seed for the game's random numbers.  Default: None (seeded from the OS)
+            observation_type (str): 'pixels' for the play area image or 'entities' for a dict with a
+                (max_entities, 6) 'entities' array (see `EntityTable`), a 'mask' of occupied rows and the row
+                'count'.  Nothing is drawn in 'entities' mode.  Default: 'pixels'
+            max_entities (int): Rows in the 'entities' observation.  Default: 256
+            copy_obs (bool): Return a copy of the play area.  If False, pixel observations are a read-only view
+                of the engine's play area buffer that is overwritten by the next step.  Default: True
+            grayscale (bool): Return grayscale (height, width) frames.  Default: False
+            downsample (int or Tuple[int, int]): Integer area downsample factor for pixel observations.  Leftover
+                rows/columns are cropped.  Default: 1
+            frame_stack (int): Stack the last N frames along a new leading axis.  Default: 1
+            batched (bool): Update grunts, hulks and family members in batches instead of one sprite at a time.
+                Faster on big waves, and plays the same statistically, but not move for move.  Default: False
+            frame_skip (int): Play each action for this many frames.  The reward covers all of them and only the
+                last frame is drawn.  Default: 1
+            max_pool (bool): With frame_skip, observe the pixelwise max of the last two frames.  Default: False
+            profile (bool): Time each step's phases and count sprites and allocations.  Each step's numbers are
+                in `info['perf']` and the totals come from `get_perf_stats()`.  Default: False
+            info_mode (str): What goes in the info dict.  'none' for an empty dict, 'basic' for the score, level,
+                lives and family count, 'full' to add the sprite 'data' list, or 'lazy' for a full dict that only
+                builds 'data' when it is read (read it before the next step).  Default: 'full'
+            renderer (str): 'pygame' blits the sprites onto the play area, 'numpy' composites them into it with
+                numpy (the same pixels).  With 'numpy' and grayscale (headless, without max_pool), frames are
+                drawn straight to grayscale.  Default: 'pygame'
         """
-        # TODO: Add game random number generator and use the seed
+        if observation_type not in self.OBSERVATION_TYPES:
+            raise ValueError(f'Invalid observation_type: {observation_type}')
+        if info_mode not in self.INFO_MODES:
+            raise ValueError(f'Invalid info_mode: {info_mode}')
+        if frame_skip < 1:
+            raise ValueError(f'Invalid frame_skip: {frame_skip}')
+        self.frame_skip = frame_skip
+        self.max_pool = max_pool
+        self.info_mode = info_mode
+        self.observation_type = observation_type
+        self.max_entities = max_entities
+        self.copy_obs = copy_obs
+
+        # Grayscale frames can be drawn directly, instead of drawing RGB and converting every pixel.
+        gray_frames = (renderer == 'numpy' and grayscale and headless and not max_pool
+                       and observation_type == 'pixels')
         self.engine = Engine(start_level=level, lives=lives, fps=fps, config_path=config_path,
-                             godmode=godmode, headless=headless, seed=seed)
+                             godmode=godmode, headless=headless, seed=seed,
+                             render=(observation_type == 'pixels' and not gray_frames) or not headless,
+                             batched=batched, renderer=renderer)
         width, height = self.engine.play_rect.size
-        play_area = (height, width, 3)
+        self.rasterizer = None
+        if gray_frames:
+            self.rasterizer = NumpyRenderer(self.engine.play_rect.size, self.engine.play_rect.topleft, grayscale=True)
+            self.engine.particles.enabled = True
 
         self.score = 0
 
@@ -65,12 +125,34 @@ class RobotronEnv(gym.Env):
         self.action_mod = 1 if always_move else 0
         self.actions = 8 if always_move else 9
         self.action_space = gym.spaces.Discrete(self.actions * self.actions)
-        self.observation_space = gym.spaces.Box(low=0, high=255, shape=play_area, dtype=np.uint8)
+        self.preprocessor = None
+        if observation_type == 'entities':
+            self.engine.track_entities(max_entities)
+            high = max(len(ENTITY_TYPES), width, height)
+            self.observation_space = gym.spaces.Dict({
+                'entities': gym.spaces.Box(low=-high, high=high, shape=(max_entities, len(EntityTable.FEATURES)),
+                                           dtype=np.float32),
+                'mask': gym.spaces.MultiBinary(max_entities),
+                'count': gym.spaces.Discrete(max_entities + 1),
+            })
+        else:
+            shape = (height, width, 3)
+            if grayscale or downsample != 1 or frame_stack != 1:
+                self.preprocessor = FramePreprocessor((height, width), grayscale, downsample, frame_stack)
+                shape = self.preprocessor.shape
+            self.observation_space = gym.spaces.Box(low=0, high=255, shape=shape, dtype=np.uint8)
         self.metadata = {'render.modes': ['human', 'rgb_array']}
 
         assert render_mode is None or render_mode in self.metadata["render_modes"]
         self.render_mode = 'rgb_array' if render_mode is None else render_mode
 
+        if profile:
+            self.engine.enable_perf()
+        self.recorder = None  # See `start_recording()`.
+        self.dataset = None  # See `start_dataset()`.
+        self.video = None  # See `start_video()`.
+        self.video_screen = False
+
     def get_board_size(self):
         """
         Get the size of the board
@@ -85,17 +167,37 @@ class RobotronEnv(gym.Env):
         """
         Reset the game and get an initial observation
 
+        args:
+            seed (int): Reseed the game.  The same seed and actions always play out the same game.  Without a
+                seed the game keeps drawing from its current random stream.
+
         returns:
             np.ndarray: The initial obs
         """
         super().reset(seed=seed)
         self.score = 0
-        obs, info = self.engine.reset()
-        return self.get_state(obs), info
+        if self.recorder is not None:
+            self.recorder.begin(self.engine, seed)
+        obs, info = self.engine.reset(seed=seed)
+        if self.rasterizer is not None:
+            obs = self.rasterizer.draw(self.engine.all_group, self.engine.particles)
+        if self.video is not None:
+            self.video.capture(self._get_video_frame)
+        if self.info_mode != 'full':
+            info = self._get_info(info['score'], info['level'], info['lives'])
+        if self.preprocessor is not None:
+            obs = self.preprocessor.reset(obs)
+            obs = obs.copy() if self.copy_obs else obs
+        else:
+            obs = self.get_state(obs)
+        if self.dataset is not None:
+            self.dataset.begin_episode()
+            self.dataset.observe(obs)
+        return obs, info
 
     def step(self,  action: int) -> Tuple[np.ndarray, int, bool, dict]:
         r"""
-        Play one frame of the game.  We return the obs, reward, done, and
+        Play one frame (or `frame_skip` frames) of the game.  We return the obs, reward, done, and
         any additional info.  Follows the openai gym observations structure.
         https://gym.openai.com/docs/#observations
 
@@ -130,8 +232,18 @@ class RobotronEnv(gym.Env):
         move = action // self.actions
         shoot = action % self.actions
 
-        self.engine.handle_input(move + self.action_mod, shoot + self.action_mod)
-        (image, score, lives, level, dead) = self.engine.update()
+        perf = self.engine.perf
+        if perf is not None:
+            perf.begin_step()
+
+        (image, score, lives, level, dead) = self.engine.step(move + self.action_mod, shoot + self.action_mod,
+                                                              self.frame_skip, self.max_pool)
+        if self.rasterizer is not None:
+            image = self.rasterizer.draw(self.engine.all_group, self.engine.particles)
+        if self.recorder is not None:
+            self.recorder.record(move + self.action_mod, shoot + self.action_mod)
+        if self.video is not None:
+            self.video.capture(self._get_video_frame)
 
         reward = (self.engine.score - self.score) / 100.0
         self.score = self.engine.score
@@ -141,28 +253,208 @@ class RobotronEnv(gym.Env):
 
         truncated = False  # We don't have a time limit.  You play until you die.
 
-        return self.get_state(image), reward, dead, truncated, {
+        if perf is not None:
+            perf.lap('engine')
+        obs = self.get_state(image)
+        if perf is not None:
+            perf.lap('observation')
+
+        info = self._get_info(score, level, lives)
+        if perf is not None:
+            perf.lap('info')
+            info['perf'] = perf.end_step(self.frame_skip)
+
+        if self.dataset is not None:
+            self.dataset.record(action, reward, dead, truncated, info)
+            if not dead:
+                self.dataset.observe(obs)
+
+        return obs, reward, dead, truncated, info
+
+    def _get_info(self, score: int, level: int, lives: int) -> dict:
+        """ Build the info dict for `info_mode`. """
+        if self.info_mode == 'none':
+            return {}
+        info = {
             'score': score,
             'level': level,
             'lives': lives,
             'family': self.engine.family_remaining(),
-            'data': self.engine.get_sprite_data(),
         }
+        if self.info_mode == 'full':
+            info['data'] = self.engine.get_sprite_data()
+        elif self.info_mode == 'lazy':
+            info = LazyInfo(info, {'data': self.engine.get_sprite_data})
+        return info
 
-    def get_state(self, image) -> np.ndarray:
+    def get_perf_stats(self) -> Optional[dict]:
+        """
+        Get the step timers and counters totalled since the env was made with `profile=True`.  See
+        `PerfStats.get_stats()`.
+
+        returns:
+            dict: The stats, or None if profiling is off.
+        """
+        if self.engine.perf is None:
+            return None
+        return self.engine.perf.get_stats()
+
+    def get_state(self, image) -> Union[np.ndarray, dict]:
+        """
+        Return the observation for the current step.  Only the play area of the image, or the entity table
+        when using the 'entities' observation type.
+
+        returns:
+            np.ndarray or dict: The game image (or entity table) for the current step
+        """
+        if self.observation_type == 'entities':
+            table = self.engine.entity_table
+            if self.copy_obs:
+                return {'entities': table.data.copy(), 'mask': table.mask.copy(), 'count': table.count}
+            return {'entities': table.data, 'mask': table.mask, 'count': table.count}
+
+        if self.preprocessor is not None:
+            image = self.preprocessor(image)
+        return image.copy() if self.copy_obs else image
+
+    def clone_state(self) -> tuple:
+        """
+        Take a snapshot of the env to roll back to later with `restore_state()`, for things like tree search.
+        Much cheaper than replaying the game from `reset()`.  See `Engine.get_state()`.
+
+        returns:
+            tuple: The snapshot.  It can be pickled.
+        """
+        preprocessor = self.preprocessor.get_state() if self.preprocessor is not None else None
+        return (self.engine.get_state(), self.score, preprocessor)
+
+    def restore_state(self, state: tuple):
+        """
+        Roll the env back to a snapshot from `clone_state()`.  The next `step()` plays on from the snapshot
+        exactly as it did the first time.
+
+        args:
+            state (tuple): The snapshot.
+        """
+        (engine_state, self.score, preprocessor) = state
+        self.engine.set_state(engine_state)
+        if self.preprocessor is not None and preprocessor is not None:
+            self.preprocessor.set_state(preprocessor)
+        if self.recorder is not None:
+            self.recorder.rewind()
+        if self.dataset is not None:
+            # The observation of the restored state isn't known, so steps aren't stored until the next reset.
+            self.dataset.suspend()
+
+    def start_recording(self, directory: str, keyframe_interval: int = 0) -> ReplayRecorder:
+        """
+        Record every game from the next `reset()` on as a replay file: the seed and one byte of input per frame,
+        plus an engine state every `keyframe_interval` frames to seek with.  Play them back with `ReplayPlayer`
+        or `python -m robotron.replay`.  States restored with `restore_state()` must be from the game being
+        recorded.
+
+        args:
+            directory (str): Where to write the replays, one file per game.
+            keyframe_interval (int): Frames between keyframes, or 0 for none.  Default: 0
+
+        returns:
+            ReplayRecorder: The recorder.  Its `paths` are the replays written so far.
+        """
+        self.stop_recording()
+        self.recorder = ReplayRecorder(directory, keyframe_interval)
+        return self.recorder
+
+    def stop_recording(self):
+        """ Stop recording, writing the game in progress. """
+        if self.recorder is not None:
+            self.recorder.finish()
+            self.recorder = None
+
+    def start_dataset(self, directory: str, chunk_size: int = 256, compression: Optional[str] = None,
+                      queue_size: int = 4) -> TrajectoryWriter:
+        """
+        Store every step from the next `reset()` on in a trajectory dataset: the observation the action was
+        chosen from, the action, reward, done, truncated, the episode number and the info's score, level, lives
+        and family.  The files are written on a background thread, so stepping doesn't wait on the disk.  Read
+        the dataset with `TrajectoryDataset`.  Steps after `restore_state()` aren't stored until the next reset.
+
+        args:
+            directory (str): The dataset.  An existing one is appended to.
+            chunk_size (int): Steps per chunk file.  Default: 256
+            compression (str): None for memory mappable .npy files, or 'zlib' or 'lz4'.  Default: None
+            queue_size (int): Full chunks that can wait to be written before stepping waits.  Default: 4
+
+        returns:
+            TrajectoryWriter: The writer.
+        """
+        self.stop_dataset()
+        info_keys = () if self.info_mode == 'none' else INFO_KEYS
+        self.dataset = TrajectoryWriter(directory, chunk_size, compression, queue_size, info_keys)
+        return self.dataset
+
+    def stop_dataset(self):
+        """ Stop storing steps and wait until the ones stored are written. """
+        if self.dataset is not None:
+            self.dataset.close()
+            self.dataset = None
+
+    def start_video(self, path: str, video_format: str = 'png', play_area_only: bool = True, downsample: int = 1,
+                    every: int = 1, capacity: int = 32, fps: int = 30) -> FrameRecorder:
+        """
+        Record the frame of every step (and reset) on a worker thread, as PNG files, raw RGB24 video or a video
+        encoded by ffmpeg.  Stepping never waits for it: when the worker falls `capacity` frames behind, frames
+        are dropped and counted instead (see `FrameRecorder`).  Envs that don't draw (like 'entities'
+        observations) draw the recorded frames only.
+
+        args:
+            path (str): The directory for 'png', or the file for 'raw' and 'ffmpeg'.
+            video_format (str): 'png', 'raw' or 'ffmpeg'.  Default: 'png'
+            play_area_only (bool): Record the play area, or False for the whole screen with the score.  Default: True
+            downsample (int): Integer area downsample factor.  Default: 1
+            every (int): Record every Nth frame.  Default: 1
+            capacity (int): Frames the worker can fall behind by before frames are dropped.  Default: 32
+            fps (int): The frame rate of the video.  Default: 30
+
+        returns:
+            FrameRecorder: The recorder.  `get_stats()` has the frames written and dropped.
+        """
+        self.stop_video()
+        if play_area_only:
+            (width, height) = self.engine.play_rect.size
+        else:
+            (width, height) = self.engine.screen.get_size()
+        self.video = FrameRecorder(path, (height, width), video_format, downsample, every, capacity, fps)
+        self.video_screen = not play_area_only
+        # Trails and points are only kept by engines that draw.
+        self.engine.particles.enabled = True
+        return self.video
+
+    def stop_video(self) -> Optional[dict]:
         """
-        Return only the play area of the image.
+        Stop recording frames, once the worker has written the ones it has.
 
         returns:
-            np.ndarray: The game image for the current step
+            dict: The recorder's final `get_stats()`, or None if it wasn't recording.
         """
-        image = crop(image, self.engine.play_area)
-        return image
+        if self.video is None:
+            return None
+        (video, self.video) = (self.video, None)
+        self.engine.particles.enabled = self.engine.render or self.rasterizer is not None
+        return video.close()
+
+    def _get_video_frame(self) -> np.ndarray:
+        """ The frame to record, drawn first if the engine doesn't draw every step. """
+        if not self.engine.render:
+            self.engine.draw()
+        if self.video_screen:
+            return self.engine.get_image()
+        return self.engine.play_view
 
     def render(self, mode='human'):
         """ TODO:  Render the game on the screen while playing.  Currently automatically does this via pygame. """
-        image = self.engine.get_image()
+        if not self.engine.render:
+            self.engine.draw()
         if mode == 'human':
-            return image
+            return self.engine.get_image()
         else:
-            return self.get_state(image)
+            return self.engine.get_observation()
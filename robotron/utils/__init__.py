@@ -2,6 +2,12 @@ from typing import Tuple
 
 import numpy as np
 
+from .dataset import TrajectoryDataset, TrajectoryWriter
+from .info import LazyInfo
+from .preprocess import FramePreprocessor
+from .replay import Replay, ReplayPlayer, ReplayRecorder
+from .video import FrameRecorder
+
 
 def crop(image: np.ndarray, dims: Tuple[int, int, int, int]) -> np.ndarray:
     """
@@ -0,0 +1,425 @@
+"""Trajectory datasets on disk: chunks of steps as .npy files, written on a background thread and read memory mapped."""
+import io
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+COMPRESSIONS = (None, 'zlib', 'lz4')
+# Info values stored with each step by default.
+INFO_KEYS = ('score', 'level', 'lives', 'family')
+
+
+def _get_codec(compression: Optional[str]) -> Optional[Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    """ The (compress, decompress) functions of a compression, or None for none. """
+    if compression is None:
+        return None
+    if compression == 'zlib':
+        # The fastest level: frames are mostly black, so it already shrinks them many times over.
+        return (lambda data: zlib.compress(data, 1), zlib.decompress)
+    if compression == 'lz4':
+        try:
+            import lz4.frame  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImportError('lz4 compression needs the lz4 package (pip install lz4)') from error
+        return (lz4.frame.compress, lz4.frame.decompress)
+    raise ValueError(f'Invalid compression: {compression}')
+
+
+def _field_path(directory: str, chunk: str, field: str, compression: Optional[str]) -> str:
+    """ The file a field of a chunk is stored in. """
+    name = f'{chunk}.{field}.npy'
+    return os.path.join(directory, name if compression is None else f'{name}.{compression}')
+
+
+def _read_index(directory: str) -> Optional[dict]:
+    """ The dataset's index, or None if there is no dataset there yet. """
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_index(directory: str, index: dict):
+    """ Replace the index file in one step, so readers never see half of one. """
+    path = os.path.join(directory, INDEX_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(path + '.tmp', path)
+
+
+class TrajectoryWriter:
+    """
+    Appends (obs, action, reward, done, info) steps to a dataset directory.
+
+    Steps are collected into chunks of `chunk_size` preallocated rows.  A full chunk is handed to a background
+    thread that writes each field as its own .npy file (`chunk-000000.obs.npy`, `chunk-000000.action.npy`, ...),
+    compressed whole with zlib or lz4 if asked, and then rewrites the `index.json` sidecar that lists the chunks.
+    Storing a step only copies it into the chunk, so the game never waits on the disk unless the thread falls
+    more than `queue_size` chunks behind (the time spent waiting is kept in `blocked`).  Chunk buffers are reused
+    once they are written.
+
+    Each row is the observation an action was chosen from, the action, and the reward, done, truncated and info
+    values the step returned, plus the episode number.  Dict observations are stored as one field per key
+    (`obs.entities`, ...).  Opening a directory that already has a dataset appends to it.
+    """
+
+    def __init__(self, directory: str, chunk_size: int = 256, compression: Optional[str] = None,
+                 queue_size: int = 4, info_keys: Sequence[str] = INFO_KEYS):
+        """
+        args:
+            directory (str): Where to write the dataset.  Created if it doesn't exist.
+            chunk_size (int): Steps per chunk.  A chunk of full RGB frames takes about 1MB a step.
+            compression (str): None for plain .npy files that can be memory mapped, or 'zlib' or 'lz4' to compress
+                each file.  lz4 needs the lz4 package.
+            queue_size (int): Full chunks that can wait for the thread before storing a step blocks.
+            info_keys (Sequence[str]): The info values to store with each step.  They must be ints.
+
+        raises:
+            ValueError: The directory has a dataset with a different compression.
+        """
+        if chunk_size < 1:
+            raise ValueError(f'Invalid chunk_size: {chunk_size}')
+        if compression not in COMPRESSIONS:
+            raise ValueError(f'Invalid compression: {compression}')
+        self.codec = _get_codec(compression)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.info_keys = tuple(info_keys)
+
+        self.index = _read_index(directory)
+        if self.index is None:
+            self.index = {'version': INDEX_VERSION, 'compression': compression, 'fields': None, 'steps': 0,
+                          'episodes': 0, 'chunks': []}
+        elif self.index['compression'] != compression:
+            raise ValueError(f"{directory} is compressed with {self.index['compression']}, not {compression}")
+        self.steps = self.index['steps']
+        self.episode = self.index['episodes'] - 1
+        self.chunks = len(self.index['chunks'])
+
+        self.fields: Optional[Dict[str, Tuple[Tuple[int, ...], np.dtype]]] = None
+        self.obs_fields: Tuple[str, ...] = ()
+        self.buffers: Optional[Dict[str, np.ndarray]] = None
+        self.row = 0
+        self.pending = False  # The current row has its observation and waits for `record()`.
+        self.suspended = False  # Observations are ignored until the next episode.
+        self.blocked = 0.0
+
+        self.free: 'queue.SimpleQueue[Dict[str, np.ndarray]]' = queue.SimpleQueue()
+        self.queue: 'queue.Queue[Optional[tuple]]' = queue.Queue(queue_size)
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self._run, name='TrajectoryWriter', daemon=True)
+        self.thread.start()
+
+    def _set_fields(self, obs: Any):
+        """ Work out the shape and dtype of each field from the first observation. """
+        if isinstance(obs, dict):
+            observed = {f'obs.{key}': np.asarray(value) for (key, value) in obs.items()}
+        else:
+            observed = {'obs': np.asarray(obs)}
+        fields = {name: (value.shape, value.dtype) for (name, value) in observed.items()}
+        fields.update({
+            'action': ((), np.dtype(np.int16)),
+            'reward': ((), np.dtype(np.float32)),
+            'done': ((), np.dtype(np.bool_)),
+            'truncated': ((), np.dtype(np.bool_)),
+            'episode': ((), np.dtype(np.int32)),
+        })
+        fields.update({key: ((), np.dtype(np.int32)) for key in self.info_keys})
+
+        if self.index['fields'] is not None and fields_to_index(fields) != self.index['fields']:
+            raise ValueError(f"{self.directory} has a dataset with other fields: {self.index['fields']}")
+        self.fields = fields
+        self.obs_fields = tuple(observed)
+
+    def begin_episode(self):
+        """ Number the steps from here on as a new episode.  A step waiting for its action is dropped. """
+        self.episode += 1
+        self.pending = False
+        self.suspended = False
+
+    def suspend(self):
+        """
+        Stop storing steps until the next `begin_episode()`, like when the game jumps to a state whose
+        observation isn't known.  A step waiting for its action is dropped.
+        """
+        self.pending = False
+        self.suspended = True
+
+    def observe(self, obs: Any):
+        """
+        Store the observation the next action is chosen from.  Call `record()` with the action once it is played.
+
+        args:
+            obs (np.ndarray or dict): The observation.  It is copied.  Ignored while suspended.
+        """
+        self._check()
+        if self.suspended:
+            return
+        if self.fields is None:
+            self._set_fields(obs)
+        if self.buffers is None:
+            self.buffers = self._get_buffers()
+        if isinstance(obs, dict):
+            for (key, value) in obs.items():
+                self.buffers[f'obs.{key}'][self.row] = value
+        else:
+            self.buffers['obs'][self.row] = obs
+        self.pending = True
+
+    def record(self, action: int, reward: float, done: bool, truncated: bool, info: dict):
+        """
+        Finish the step started by `observe()`.  Does nothing if no observation is waiting (like after `done`,
+        until the next episode starts).
+
+        args:
+            action (int): The action played.
+            reward (float): The reward it got.
+            done (bool): The game is over.
+            truncated (bool): The game was cut short.
+            info (dict): The step's info.
+        """
+        if not self.pending:
+            return
+
+        buffers = self.buffers
+        row = self.row
+        buffers['action'][row] = action
+        buffers['reward'][row] = reward
+        buffers['done'][row] = done
+        buffers['truncated'][row] = truncated
+        buffers['episode'][row] = self.episode
+        for key in self.info_keys:
+            buffers[key][row] = info[key]
+        self.pending = False
+        self.row = row + 1
+        if self.row == self.chunk_size:
+            self._submit()
+
+    def add(self, obs: Any, action: int, reward: float, done: bool, truncated: bool, info: dict):
+        """ Store a whole step at once: `observe()` then `record()`. """
+        self.observe(obs)
+        self.record(action, reward, done, truncated, info)
+
+    def _get_buffers(self) -> Dict[str, np.ndarray]:
+        """ Buffers for a chunk, reused if the thread is done with some. """
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            return {name: np.empty((self.chunk_size,) + shape, dtype=dtype)
+                    for (name, (shape, dtype)) in self.fields.items()}
+
+    def _submit(self):
+        """ Hand the rows collected so far to the thread and start a new chunk. """
+        old = self.buffers
+        self.buffers = self._get_buffers()
+        if self.pending:
+            # The observation waiting for its action moves to the new chunk.
+            for name in self.obs_fields:
+                self.buffers[name][0] = old[name][self.row]
+
+        start = time.perf_counter()
+        self.queue.put((f'chunk-{self.chunks:06d}', self.steps, self.row, old))
+        self.blocked += time.perf_counter() - start
+        self.chunks += 1
+        self.steps += self.row
+        self.row = 0
+
+    def _run(self):
+        """ The thread: write chunks until it gets None. """
+        compression = self.index['compression']
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                break
+            (name, start, length, buffers) = item
+            try:
+                if self.error is None:
+                    for (field, buffer) in buffers.items():
+                        path = _field_path(self.directory, name, field, compression)
+                        if self.codec is None:
+                            np.save(path, buffer[:length])
+                            continue
+                        data = io.BytesIO()
+                        np.lib.format.write_array(data, buffer[:length])
+                        with open(path, 'wb') as f:
+                            f.write(self.codec[0](data.getbuffer()))
+                    self.index['fields'] = fields_to_index(self.fields)
+                    self.index['chunks'].append({'name': name, 'start': start, 'length': length})
+                    self.index['steps'] = start + length
+                    self.index['episodes'] = int(buffers['episode'][length - 1]) + 1
+                    _write_index(self.directory, self.index)
+            except BaseException as error:  # pylint: disable=broad-except
+                self.error = error
+            finally:
+                self.free.put(buffers)
+                self.queue.task_done()
+
+    def _check(self):
+        """ Raise the thread's error, if it had one. """
+        if self.error is not None:
+            raise RuntimeError(f'Writing {self.directory} failed') from self.error
+
+    def flush(self):
+        """ Write the steps stored so far (as a short chunk) and wait until they are on disk. """
+        if self.row:
+            self._submit()
+        self.queue.join()
+        self._check()
+
+    def close(self):
+        """ Write everything and stop the thread.  A step waiting for its action is dropped. """
+        if self.thread.is_alive():
+            self.pending = False
+            if self.row:
+                self._submit()
+            self.queue.put(None)
+            self.thread.join()
+        self._check()
+
+    def __enter__(self) -> 'TrajectoryWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def fields_to_index(fields: Dict[str, Tuple[Tuple[int, ...], np.dtype]]) -> Dict[str, List[Any]]:
+    """ The fields as the index stores them: [dtype, shape] by name. """
+    return {name: [np.dtype(dtype).str, list(shape)] for (name, (shape, dtype)) in fields.items()}
+
+
+class TrajectoryDataset:
+    """
+    Reads a dataset written by `TrajectoryWriter`.  Rows are fetched by global step number from whichever chunks
+    hold them: plain chunks are memory mapped, so only the rows asked for are read from disk, and compressed
+    chunks are decompressed when first needed and kept in a small cache.
+
+    The index is read when the dataset is opened; call `refresh()` to see chunks written since.
+    """
+
+    def __init__(self, directory: str, cache_size: int = 8):
+        """
+        args:
+            directory (str): The dataset.
+            cache_size (int): Compressed chunks to keep decompressed.
+
+        raises:
+            FileNotFoundError: There is no dataset there.
+        """
+        self.directory = directory
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[int, Dict[str, np.ndarray]]' = OrderedDict()
+        self.refresh()
+
+    def refresh(self):
+        """ Read the index again. """
+        index = _read_index(self.directory)
+        if index is None:
+            raise FileNotFoundError(f'No dataset in {self.directory}')
+        self.index = index
+        self.codec = _get_codec(index['compression'])
+        self.fields = {name: (tuple(shape), np.dtype(dtype))
+                       for (name, (dtype, shape)) in (index['fields'] or {}).items()}
+        self.chunks = index['chunks']
+        self.starts = np.array([chunk['start'] for chunk in self.chunks], dtype=np.int64)
+        self.length = index['steps'] if self.chunks else 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def episodes(self) -> int:
+        """ How many episodes the dataset has steps of. """
+        return self.index['episodes']
+
+    def _load(self, number: int) -> Dict[str, np.ndarray]:
+        """ The arrays of a chunk, memory mapped or decompressed. """
+        arrays = self.cache.get(number)
+        if arrays is not None:
+            self.cache.move_to_end(number)
+            return arrays
+
+        name = self.chunks[number]['name']
+        compression = self.index['compression']
+        arrays = {}
+        for field in self.fields:
+            path = _field_path(self.directory, name, field, compression)
+            if self.codec is None:
+                arrays[field] = np.load(path, mmap_mode='r')
+            else:
+                with open(path, 'rb') as f:
+                    arrays[field] = np.load(io.BytesIO(self.codec[1](f.read())))
+        self.cache[number] = arrays
+        # Memory maps cost nothing to keep open until there are very many of them.
+        limit = self.cache_size if self.codec is not None else max(self.cache_size, 1024)
+        while len(self.cache) > limit:
+            self.cache.popitem(last=False)
+        return arrays
+
+    def get(self, indices: Sequence[int], fields: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Get rows by step number.
+
+        args:
+            indices (Sequence[int]): The step numbers, in any order.
+            fields (Sequence[str]): The fields to get.  Defaults to all of them.
+
+        returns:
+            Dict[str, np.ndarray]: An array of the rows for each field.
+
+        raises:
+            IndexError: A step number is out of range.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= self.length):
+            raise IndexError(f'Step out of range (0-{self.length - 1})')
+        names = list(self.fields) if fields is None else list(fields)
+        batch = {name: np.empty(indices.shape + self.fields[name][0], dtype=self.fields[name][1]) for name in names}
+
+        chunk_numbers = np.searchsorted(self.starts, indices, side='right') - 1
+        for number in np.unique(chunk_numbers):
+            rows = chunk_numbers == number
+            local = indices[rows] - self.starts[number]
+            arrays = self._load(int(number))
+            for name in names:
+                batch[name][rows] = arrays[name][local]
+        return batch
+
+    def sample(self, batch_size: int, rng: Optional[np.random.Generator] = None,
+               fields: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """ A minibatch of rows picked at random (with replacement). """
+        rng = np.random.default_rng() if rng is None else rng
+        return self.get(rng.integers(self.length, size=batch_size), fields)
+
+    def minibatches(self, batch_size: int, shuffle: bool = True, rng: Optional[np.random.Generator] = None,
+                    fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        One pass over the dataset in minibatches.
+
+        args:
+            batch_size (int): Rows per minibatch.  The last one can be smaller.
+            shuffle (bool): Visit the rows in a random order.
+            rng (np.random.Generator): The random numbers for shuffling.
+            fields (Sequence[str]): The fields to get.  Defaults to all of them.
+
+        returns:
+            Iterator[Dict[str, np.ndarray]]: The minibatches, like `get()`.
+        """
+        if shuffle:
+            order = (np.random.default_rng() if rng is None else rng).permutation(self.length)
+        else:
+            order = np.arange(self.length)
+        for start in range(0, self.length, batch_size):
+            yield self.get(order[start:start + batch_size], fields)
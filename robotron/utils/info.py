@@ -0,0 +1,96 @@
+"""Step info dicts that only compute their expensive values when they are read."""
+from typing import Any, Callable, Dict
+
+
+class LazyInfo(dict):
+    """
+    A dict whose lazy keys are computed by a loader the first time they are read (or the dict is iterated,
+    copied, compared or pickled).  Loaders read the game as it is when they run, so read lazy values before the
+    next step.
+    """
+
+    def __init__(self, values: Dict[str, Any], loaders: Dict[str, Callable[[], Any]]):
+        """
+        args:
+            values (Dict[str, Any]): The values that are already known.
+            loaders (Dict[str, Callable[[], Any]]): Functions computing the lazy values, by key.
+        """
+        super().__init__(values)
+        self._loaders = loaders
+
+    def _load_all(self):
+        """ Compute every lazy value that hasn't been read yet. """
+        for key in list(self._loaders):
+            self[key]  # pylint: disable=pointless-statement
+
+    def __missing__(self, key: str) -> Any:
+        if key not in self._loaders:
+            raise KeyError(key)
+        value = self._loaders.pop(key)()
+        super().__setitem__(key, value)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._loaders.pop(key, None)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str):
+        if key in self._loaders:
+            del self._loaders[key]
+        else:
+            super().__delitem__(key)
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self._loaders
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._loaders)
+
+    def __iter__(self):
+        self._load_all()
+        return super().__iter__()
+
+    def __eq__(self, other: object) -> bool:
+        self._load_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        self._load_all()
+        return super().__repr__()
+
+    def __reduce__(self):
+        self._load_all()
+        return (dict, (dict(self),))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self._loaders:
+            self[key]  # pylint: disable=pointless-statement
+        return super().pop(key, *default)
+
+    def update(self, *args, **kwargs):
+        for (key, value) in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def keys(self):
+        self._load_all()
+        return super().keys()
+
+    def values(self):
+        self._load_all()
+        return super().values()
+
+    def items(self):
+        self._load_all()
+        return super().items()
+
+    def copy(self) -> dict:
+        self._load_all()
+        return dict(self)
+
+    __hash__ = None
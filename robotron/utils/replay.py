@@ -0,0 +1,346 @@
+"""Compact replays of games: the seed and one byte of input per frame, plus optional keyframes to seek with."""
+import glob
+import json
+import os
+import pickle
+import re
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..engine import Engine, EngineState
+from ..engine.snapshot import loads
+
+# A replay file starts with the magic, the format version and the length of the JSON header.  The inputs follow,
+# one byte per frame (`move << 4 | shoot`), then the keyframes: zlib compressed pickles of `Engine.get_state()`.
+MAGIC = b'RBTRPLAY'
+VERSION = 1
+PREFIX = struct.Struct('<8sHI')
+
+
+def pack_input(move: int, shoot: int) -> int:
+    """ The byte a frame's input is stored as.  Both directions are 0-8, like `Engine.handle_input()`. """
+    return move << 4 | shoot
+
+
+def unpack_input(value: int) -> Tuple[int, int]:
+    """ The (move, shoot) of a stored byte. """
+    return (value >> 4, value & 0xF)
+
+
+def write_replay(path: str, header: Dict[str, Any], inputs: bytes, keyframes: List[Tuple[int, bytes]]):
+    """
+    Write a replay file.
+
+    args:
+        path (str): Where to write it.
+        header (Dict[str, Any]): The game's settings and result (see `ReplayRecorder`).  The keyframe index is
+            added.
+        inputs (bytes): One packed input per frame.
+        keyframes (List[Tuple[int, bytes]]): The frame and compressed state of each keyframe, in order.
+    """
+    index = []
+    offset = 0
+    for (frame, data) in keyframes:
+        index.append((frame, offset, len(data)))
+        offset += len(data)
+    encoded = json.dumps(dict(header, frames=len(inputs), keyframes=index), separators=(',', ':')).encode()
+
+    with open(path, 'wb') as f:
+        f.write(PREFIX.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        f.write(inputs)
+        for (_, data) in keyframes:
+            f.write(data)
+
+
+class Replay:
+    """
+    A recorded game.  Loading one reads the header and the inputs; keyframes are only read from the file when
+    they are needed to seek.
+
+    The header has:
+        config: `Config.digest` of the config the game was played with.
+        start_level, lives, godmode, batched: The engine settings it was played with.
+        seed: The seed it was reset with, or None if it wasn't.  Then 'random_state' holds the state of the
+            game's random numbers when it was reset instead.
+        frames: How many frames were played.
+        score, level, lives_left, done: The result, as the engine reported it after the last frame.
+        keyframes: The (frame, offset, length) of each keyframe.
+    """
+
+    def __init__(self, path: str):
+        """
+        Read a replay file.
+
+        args:
+            path (str): The file.
+
+        raises:
+            ValueError: It isn't a replay file, or it is from a newer version.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            prefix = f.read(PREFIX.size)
+            if len(prefix) < PREFIX.size:
+                raise ValueError(f'Not a replay file: {path}')
+            (magic, version, length) = PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise ValueError(f'Not a replay file: {path}')
+            if version > VERSION:
+                raise ValueError(f'Unsupported replay version {version}: {path}')
+            self.header = json.loads(f.read(length).decode())
+            self.inputs = np.frombuffer(f.read(self.header['frames']), dtype=np.uint8)
+        self.keyframes_offset = PREFIX.size + length + len(self.inputs)
+        self.keyframe_frames = [frame for (frame, _, _) in self.header['keyframes']]
+
+    @property
+    def frames(self) -> int:
+        """ How many frames were played. """
+        return len(self.inputs)
+
+    def get_input(self, frame: int) -> Tuple[int, int]:
+        """ The (move, shoot) played on a frame, counting from 0. """
+        return unpack_input(int(self.inputs[frame]))
+
+    def keyframe(self, frame: int) -> Optional[Tuple[int, EngineState]]:
+        """
+        Get the last keyframe at or before a frame.
+
+        args:
+            frame (int): The frame to seek to.
+
+        returns:
+            (int, EngineState): The frame the keyframe was taken after and the engine state, or None if there is
+                no keyframe that early.
+
+        raises:
+            pickle.UnpicklingError: The keyframe holds something other than an engine state.
+        """
+        position = np.searchsorted(self.keyframe_frames, frame, side='right') - 1
+        if position < 0:
+            return None
+        (keyframe, offset, length) = self.header['keyframes'][position]
+        with open(self.path, 'rb') as f:
+            f.seek(self.keyframes_offset + offset)
+            # Replays get shared, so keyframes are unpickled without running anything they might hold.
+            state = loads(zlib.decompress(f.read(length)))
+        return (keyframe, state)
+
+
+class ReplayRecorder:
+    """
+    Records the games an env plays (see `RobotronEnv.start_recording()`), one replay file per game, named
+    `<prefix>-<number>.replay` in a directory.  A game is recorded from `reset()` until it is over, or until the
+    next `reset()` or `stop_recording()`.
+
+    Every `keyframe_interval` frames the engine state is stored as well, so a `ReplayPlayer` can jump close to
+    any frame and only play the frames from there.  Keyframes are a few KB each against one byte per frame for
+    the inputs, so they are off by default.
+    """
+
+    def __init__(self, directory: str, keyframe_interval: int = 0, prefix: str = 'episode'):
+        """
+        args:
+            directory (str): Where to write the replays.  Created if it doesn't exist.  Numbering carries on after
+                the replays already there.
+            keyframe_interval (int): Frames between keyframes, or 0 for none.
+            prefix (str): The start of the file names.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self.prefix = prefix
+        pattern = re.compile(re.escape(prefix) + r'-(\d+)\.replay$')
+        numbers = [int(match.group(1)) for match in
+                   (pattern.search(path) for path in glob.glob(os.path.join(glob.escape(directory), '*.replay')))
+                   if match]
+        self.episodes = max(numbers) + 1 if numbers else 0
+        self.paths: List[str] = []
+
+        self.engine = None
+        self.header = None
+        self.inputs = bytearray()
+        self.keyframes: List[Tuple[int, bytes]] = []
+        self.next_keyframe = 0
+
+    def begin(self, engine: Engine, seed: Optional[int]):
+        """
+        Start recording a game.  Called by the env right before the engine is reset.
+
+        args:
+            engine (Engine): The engine.
+            seed (int): The seed it is about to be reset with, or None to keep its random numbers as they are.
+        """
+        self.finish()
+        self.engine = engine
+        self.header = {
+            'config': engine.config.digest,
+            'start_level': engine.start_level + 1,
+            'lives': engine.start_lives,
+            'godmode': engine.godmode,
+            'batched': engine.batch is not None,
+            'seed': seed,
+        }
+        if seed is None:
+            # Without a seed the game goes on from the random numbers as they are, so those are stored instead.
+            (version, internal, gauss) = engine.random.getstate()
+            self.header['random_state'] = [version, list(internal), gauss]
+        self.inputs = bytearray()
+        self.keyframes = []
+        self.next_keyframe = self.keyframe_interval
+
+    def record(self, move: int, shoot: int):
+        """
+        Record the input of the frames the engine just played.  Called by the env after every step.
+
+        args:
+            move (int): The movement direction given to the engine.
+            shoot (int): The shooting direction.
+        """
+        engine = self.engine
+        if engine is None:
+            return
+
+        self.inputs.extend(bytes((pack_input(move, shoot),)) * (engine.frame - len(self.inputs)))
+        if engine.done:
+            self.finish()
+        elif self.keyframe_interval and engine.frame >= self.next_keyframe:
+            state = pickle.dumps(engine.get_state(), protocol=pickle.HIGHEST_PROTOCOL)
+            self.keyframes.append((engine.frame, zlib.compress(state)))
+            self.next_keyframe = engine.frame + self.keyframe_interval
+
+    def rewind(self):
+        """
+        Drop the frames after the engine's current one.  Called by the env when a state of the game being
+        recorded is restored, so the replay follows the game as it is played from there.
+        """
+        if self.engine is None:
+            return
+        frame = self.engine.frame
+        del self.inputs[frame:]
+        self.keyframes = [(keyframe, data) for (keyframe, data) in self.keyframes if keyframe <= frame]
+        self.next_keyframe = (self.keyframes[-1][0] if self.keyframes else 0) + self.keyframe_interval
+
+    def finish(self) -> Optional[str]:
+        """
+        Write the game being recorded, if there is one.
+
+        returns:
+            str: The replay file, or None if nothing was being recorded.
+        """
+        engine = self.engine
+        if engine is None:
+            return None
+
+        header = dict(self.header, score=engine.score, level=engine.level, lives_left=engine.lives, done=engine.done)
+        path = os.path.join(self.directory, f'{self.prefix}-{self.episodes:06d}.replay')
+        write_replay(path, header, bytes(self.inputs), self.keyframes)
+        self.episodes += 1
+        self.paths.append(path)
+        self.engine = None
+        return path
+
+
+class ReplayPlayer:
+    """
+    Plays a replay back on an engine set up like the one it was recorded on.  `seek()` jumps to any frame,
+    starting from the closest keyframe before it (or the start) and playing the stored inputs from there.
+    """
+
+    def __init__(self, replay: Replay, config_path: str = None, headless: bool = True, render: bool = False,
+                 fps: int = 0):
+        """
+        args:
+            replay (Replay): The replay.
+            config_path (str): The config it was recorded with, if not the bundled one.
+            headless (bool): Skip creating the window.
+            render (bool): Draw every frame.  Always on with a window.
+            fps (int): Frames per second to play at, or 0 for as fast as possible.
+
+        raises:
+            ValueError: The config isn't the one the replay was recorded with.
+        """
+        header = replay.header
+        self.replay = replay
+        self.engine = Engine(start_level=header['start_level'], lives=header['lives'], fps=fps,
+                             config_path=config_path, godmode=header['godmode'], headless=headless,
+                             seed=header['seed'], render=render or not headless, batched=header['batched'])
+        if self.engine.config.digest != header['config']:
+            raise ValueError(f'{replay.path} was recorded with a different config')
+        self.rewind()
+
+    @property
+    def frame(self) -> int:
+        """ The frames played so far. """
+        return self.engine.frame
+
+    def rewind(self):
+        """ Go back to the start of the game. """
+        header = self.replay.header
+        if header['seed'] is None:
+            (version, internal, gauss) = header['random_state']
+            self.engine.random.setstate((version, tuple(internal), gauss))
+        self.engine.reset(seed=header['seed'])
+
+    def play(self, frames: Optional[int] = None) -> bool:
+        """
+        Play on from the current frame.
+
+        args:
+            frames (int): How many frames to play.  Defaults to the rest of the game.
+
+        returns:
+            bool: True if there are frames left.
+        """
+        replay = self.replay
+        end = replay.frames if frames is None else min(self.frame + frames, replay.frames)
+        engine = self.engine
+        for frame in range(self.frame, end):
+            (move, shoot) = replay.get_input(frame)
+            engine.step(move, shoot)
+        return self.frame < replay.frames
+
+    def seek(self, frame: int):
+        """
+        Go to a frame, from the closest keyframe before it unless the current frame is closer.
+
+        args:
+            frame (int): The frames played at the target, 0 for the start.
+
+        raises:
+            ValueError: The replay doesn't have that frame.
+        """
+        if not 0 <= frame <= self.replay.frames:
+            raise ValueError(f'Frame {frame} is out of range (0-{self.replay.frames})')
+
+        keyframe = self.replay.keyframe(frame)
+        if keyframe is not None and not keyframe[0] <= self.frame <= frame:
+            self.engine.set_state(keyframe[1])
+            if self.frame == frame and self.engine.render:
+                self.engine.draw()
+        elif not self.frame <= frame:
+            self.rewind()
+        self.play(frame - self.frame)
+
+    def verify(self) -> bool:
+        """
+        Play the whole game from the start and check it ends the way it was recorded.
+
+        returns:
+            bool: True if the score, level, lives and game over match.
+        """
+        self.rewind()
+        self.play()
+        return self.get_result() == self.get_recorded_result()
+
+    def get_result(self) -> Dict[str, Any]:
+        """ The engine's score, level, lives and game over right now. """
+        engine = self.engine
+        return {'score': engine.score, 'level': engine.level, 'lives_left': engine.lives, 'done': engine.done}
+
+    def get_recorded_result(self) -> Dict[str, Any]:
+        """ The score, level, lives and game over the recording ended with. """
+        return {key: self.replay.header[key] for key in ('score', 'level', 'lives_left', 'done')}
@@ -0,0 +1,219 @@
+"""Recording frames to PNG files, raw video or ffmpeg on a worker thread, without ever making the game wait."""
+import json
+import os
+import shutil
+import struct
+import subprocess
+import threading
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .preprocess import FramePreprocessor
+
+FORMATS = ('png', 'raw', 'ffmpeg')
+
+
+def ffmpeg_available() -> bool:
+    """ Whether the 'ffmpeg' format can be used (ffmpeg is on the PATH). """
+    return shutil.which('ffmpeg') is not None
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def encode_png(frame: np.ndarray, level: int = 1) -> bytes:
+    """
+    Encode an RGB frame as a PNG.  Almost all of the work is zlib, which lets other threads run.
+
+    args:
+        frame (np.ndarray): A (height, width, 3) uint8 frame.
+        level (int): The zlib level.  Frames are mostly black, so the fastest level already compresses well.
+
+    returns:
+        bytes: The PNG file.
+    """
+    (height, width) = frame.shape[:2]
+    # Every row starts with its filter type, 0 for none.
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = frame.reshape(height, width * 3)
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header) + _png_chunk(b'IDAT', zlib.compress(rows, level)) +
+            _png_chunk(b'IEND', b''))
+
+
+class FrameRecorder:
+    """
+    Hands frames to a worker thread through a ring buffer of preallocated slots.  The worker writes them as
+    numbered PNG files in a directory ('png'), appends them to one raw RGB24 file with a JSON sidecar ('raw'), or
+    pipes them to ffmpeg to encode ('ffmpeg').
+
+    Capturing a frame only copies (and downsamples) it into a free slot.  When the worker falls behind and every
+    slot is full, the frame is dropped rather than waiting, and counted.  `every` records one frame in N on
+    purpose.  Frames that are dropped or skipped aren't even fetched, so they cost nothing to draw.
+    """
+
+    def __init__(self, path: str, frame_shape: Tuple[int, int], video_format: str = 'png', downsample: int = 1,
+                 every: int = 1, capacity: int = 32, fps: int = 30):
+        """
+        args:
+            path (str): The directory for 'png', or the file for 'raw' and 'ffmpeg' (like 'eval.mp4').
+            frame_shape (Tuple[int, int]): The (height, width) of the frames that will be captured.
+            video_format (str): 'png', 'raw' or 'ffmpeg'.
+            downsample (int): Integer area downsample factor, for smaller recordings.
+            every (int): Record every Nth frame captured.
+            capacity (int): Slots in the ring buffer, the frames the worker can fall behind by.
+            fps (int): The frame rate written to the video (or the sidecar).
+
+        raises:
+            ValueError: An argument is invalid.
+            FileNotFoundError: The 'ffmpeg' format was asked for but ffmpeg isn't installed.
+        """
+        if video_format not in FORMATS:
+            raise ValueError(f'Invalid video format: {video_format}')
+        if every < 1 or capacity < 1:
+            raise ValueError(f'Invalid every or capacity: {every}, {capacity}')
+        if video_format == 'ffmpeg' and not ffmpeg_available():
+            raise FileNotFoundError('The ffmpeg format needs ffmpeg on the PATH')
+
+        self.path = path
+        self.video_format = video_format
+        self.every = every
+        self.fps = fps
+        self.preprocessor = FramePreprocessor(frame_shape, downsample=downsample)
+        (self.height, self.width) = self.preprocessor.frame_shape[:2]
+        self.slots = np.empty((capacity, self.height, self.width, 3), dtype=np.uint8)
+        # The capture number of the frame in each slot, for file names.  -1 tells the worker to stop.
+        self.numbers = [0] * capacity
+        self.head = 0  # The next slot to fill.
+        self.tail = 0  # The next slot for the worker.
+        self.free_slots = threading.Semaphore(capacity)
+        self.full_slots = threading.Semaphore(0)
+        self.closing = False
+
+        self.captured = 0
+        self.written = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.error: Optional[BaseException] = None
+
+        self.output = None
+        self.process = None
+        if video_format == 'png':
+            os.makedirs(path, exist_ok=True)
+        elif video_format == 'raw':
+            # The worker writes to these until close(), so they can't be opened in a with block.
+            self.output = open(path, 'wb')  # pylint: disable=consider-using-with
+        else:
+            self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+                ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                 '-s', f'{self.width}x{self.height}', '-r', str(fps), '-i', '-',
+                 # yuv420p, which every player can show, needs an even width and height.
+                 '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', path],
+                stdin=subprocess.PIPE)
+            self.output = self.process.stdin
+
+        self.thread = threading.Thread(target=self._run, name='FrameRecorder', daemon=True)
+        self.thread.start()
+
+    def capture(self, get_frame: Callable[[], np.ndarray]) -> bool:
+        """
+        Record the next frame, if it isn't skipped and a slot is free.
+
+        args:
+            get_frame (Callable[[], np.ndarray]): Returns the (height, width, 3) uint8 frame.  Only called when the
+                frame will be recorded.
+
+        returns:
+            bool: True if the frame was taken.
+        """
+        number = self.captured
+        self.captured += 1
+        if number % self.every:
+            self.skipped += 1
+            return False
+        if self.closing or not self.free_slots.acquire(blocking=False):
+            self.dropped += 1
+            return False
+
+        slot = self.head
+        self.preprocessor.process(get_frame(), self.slots[slot])
+        self.numbers[slot] = number
+        self.head = (slot + 1) % len(self.slots)
+        self.full_slots.release()
+        return True
+
+    def add(self, frame: np.ndarray) -> bool:
+        """ Record a frame.  See `capture()`. """
+        return self.capture(lambda: frame)
+
+    def _run(self):
+        """ The worker: write frames until closed. """
+        while True:
+            self.full_slots.acquire()
+            slot = self.tail
+            if self.numbers[slot] < 0:
+                break
+            try:
+                if self.error is None:
+                    self._write(self.slots[slot], self.numbers[slot])
+                    self.written += 1
+            except BaseException as error:  # pylint: disable=broad-except
+                self.error = error
+            self.tail = (slot + 1) % len(self.slots)
+            self.free_slots.release()
+
+    def _write(self, frame: np.ndarray, number: int):
+        """ Write one frame. """
+        if self.video_format == 'png':
+            with open(os.path.join(self.path, f'frame-{number:06d}.png'), 'wb') as f:
+                f.write(encode_png(frame))
+        else:
+            self.output.write(memoryview(frame).cast('B'))
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        returns:
+            Dict[str, int]: The frames 'captured', 'written', 'dropped' because the worker was behind, 'skipped'
+                by `every`, and 'pending' (waiting for the worker).
+        """
+        pending = self.captured - self.written - self.dropped - self.skipped
+        return {'captured': self.captured, 'written': self.written, 'dropped': self.dropped,
+                'skipped': self.skipped, 'pending': pending}
+
+    def close(self) -> Dict[str, int]:
+        """
+        Write the frames still waiting and stop the worker.
+
+        returns:
+            Dict[str, int]: The final `get_stats()`.
+
+        raises:
+            RuntimeError: Writing a frame failed.
+        """
+        if not self.closing:
+            self.closing = True
+            # Wait for a free slot to hold the stop marker.  The frames before it are written first.
+            self.free_slots.acquire()
+            self.numbers[self.head] = -1
+            self.full_slots.release()
+            self.thread.join()
+            if self.output is not None:
+                self.output.close()
+            if self.process is not None:
+                self.process.wait()
+            if self.video_format == 'raw':
+                with open(self.path + '.json', 'w', encoding='utf-8') as f:
+                    json.dump({'width': self.width, 'height': self.height, 'pix_fmt': 'rgb24', 'fps': self.fps,
+                               'frames': self.written, **self.get_stats()}, f)
+        if self.error is not None:
+            raise RuntimeError(f'Recording {self.path} failed') from self.error
+        return self.get_stats()
+
+    def __enter__(self) -> 'FrameRecorder':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized Robotron Environments
+
+Runs many Robotron engines side by side and batches their results so they can be fed straight into
+vectorized RL algorithms (PPO, A2C, etc.)
+
+Example:
+    >>> from robotron import RobotronVectorEnv
+    >>> envs = RobotronVectorEnv(num_envs=8)
+    >>> obs, infos = envs.reset()
+    >>> obs, rewards, terminated, truncated, infos = envs.step(envs.action_space.sample())
+
+`AsyncRobotronVectorEnv` has the same interface but runs each engine in its own process.
+"""
+import multiprocessing
+import traceback
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import gymnasium as gym
+from gymnasium.vector.utils import batch_space, create_empty_array
+
+from .engine.config import get_config
+from .robotron import RobotronEnv
+
+
+class RobotronVectorEnv(gym.vector.VectorEnv):
+    """
+    Runs `num_envs` Robotron engines in a single process.
+
+    Every engine draws to its own off-screen surface, so there is no shared display state between them.
+    Observations are stacked into a single `(num_envs, height, width, 3)` array.  For the 'entities' observation
+    type they are a dict of `entities` (a `(num_envs, max_entities, 6)` float32 array, see `EntityTable`), `mask`
+    (`(num_envs, max_entities)` int8) and `count` (`(num_envs,)` int64).  Environments that hit game over are reset
+    in the same step; the last observation and info of the finished game are returned in `infos['final_obs']`
+    and `infos['final_info']` (masked by `infos['_final_obs']`).
+    """
+
+    INFO_KEYS = ('score', 'level', 'lives', 'family')
+
+    def __init__(self,
+                 num_envs: int,
+                 level: int = 1,
+                 lives: int = 3,
+                 config_path: str = None,
+                 godmode: bool = False,
+                 always_move: bool = False,
+                 seed: Optional[int] = None,
+                 copy: bool = True,
+                 observation_type: str = 'pixels'):
+        """
+        Setup the environments
+
+        args:
+            num_envs (int): The number of engines to run.
+            level (int): What level to start at.  Default: 1
+            lives (int): Lives at the start of each game.  Default: 3
+            config_path (str): Optional path to a custom config.
+            godmode (bool): Are you a god? (Can't die.) Default: False
+            always_move (bool): Always move/shoot.  Drops action space from 9x9 to 8x8  Default: False
+            seed (int): Seed for the first environment.  Each following env uses seed + index.
+            copy (bool): Return a copy of the observation buffer.  If False, the returned array is
+                overwritten by the next step.  Default: True
+            observation_type (str): 'pixels' or 'entities'.  See `RobotronEnv`.  Default: 'pixels'
+        """
+        self.envs = [
+            RobotronEnv(level=level, lives=lives, config_path=config_path, godmode=godmode,
+                        always_move=always_move, headless=True, observation_type=observation_type,
+                        copy_obs=False, seed=None if seed is None else seed + i)
+            for i in range(num_envs)
+        ]
+
+        self.num_envs = num_envs
+        self.copy = copy
+        self.metadata = {'render_modes': [], 'autoreset_mode': self._autoreset_mode()}
+        self.render_mode = None
+        self.closed = False
+
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        self._observations = create_empty_array(self.single_observation_space, num_envs, fn=np.zeros)
+        self._rewards = np.zeros(num_envs, dtype=np.float64)
+        self._terminations = np.zeros(num_envs, dtype=np.bool_)
+        self._truncations = np.zeros(num_envs, dtype=np.bool_)
+        self._info_arrays = {key: np.zeros(num_envs, dtype=np.int64) for key in self.INFO_KEYS}
+
+    @staticmethod
+    def _autoreset_mode():
+        """ Newer gymnasium versions describe how vector envs autoreset.  We always reset in the same step. """
+        autoreset_mode = getattr(gym.vector, 'AutoresetMode', None)
+        return autoreset_mode.SAME_STEP if autoreset_mode is not None else 'SameStep'
+
+    def reset(self,
+              seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+              options: Optional[dict] = None) -> Tuple[np.ndarray, dict]:
+        """
+        Reset every environment.
+
+        args:
+            seed (int or list): A single seed (env i gets seed + i) or one seed per env.
+            options (dict): Passed through to each env's reset.
+
+        returns:
+            (np.ndarray, dict): The stacked observations and batched info.
+        """
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+            if len(seeds) != self.num_envs:
+                raise ValueError(f'Expected {self.num_envs} seeds, got {len(seeds)}.')
+
+        for i, (env, env_seed) in enumerate(zip(self.envs, seeds)):
+            obs, info = env.reset(seed=env_seed, options=options)
+            _set_batch_item(self._observations, i, obs)
+            _store_info(self._info_arrays, i, info)
+
+        self._rewards[:] = 0
+        self._terminations[:] = False
+        self._truncations[:] = False
+
+        return self._get_observations(), _get_infos(self._info_arrays)
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """
+        Step every environment with its action.
+
+        args:
+            actions (Sequence[int]): One action per environment.
+
+        returns:
+            (np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict): obs, rewards, terminations, truncations and infos
+        """
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f'Expected actions with shape ({self.num_envs},), got {actions.shape}.')
+
+        final_obs = None
+        final_info = None
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs, reward, terminated, truncated, info = env.step(int(action))
+            self._rewards[i] = reward
+            self._terminations[i] = terminated
+            self._truncations[i] = truncated
+
+            if terminated or truncated:
+                if final_obs is None:
+                    final_obs = create_empty_array(self.single_observation_space, self.num_envs, fn=np.zeros)
+                    final_info = np.full(self.num_envs, None, dtype=object)
+                _set_batch_item(final_obs, i, obs)
+                final_info[i] = info
+                obs, info = env.reset()
+
+            _set_batch_item(self._observations, i, obs)
+            _store_info(self._info_arrays, i, info)
+
+        infos = _get_infos(self._info_arrays)
+        if final_obs is not None:
+            _add_final(infos, self._terminations | self._truncations, final_obs, final_info)
+
+        return (self._get_observations(), self._rewards.copy(), self._terminations.copy(),
+                self._truncations.copy(), infos)
+
+    def _get_observations(self) -> Union[np.ndarray, dict]:
+        """ Return the observation buffer, copied if requested. """
+        if not self.copy:
+            return self._observations
+        if isinstance(self._observations, dict):
+            return {key: value.copy() for key, value in self._observations.items()}
+        return self._observations.copy()
+
+    def get_attr(self, name: str) -> List:
+        """
+        Get an attribute from every environment.
+
+        args:
+            name (str): The attribute name.
+
+        returns:
+            List: The attribute value for each env.
+        """
+        return [getattr(env, name) for env in self.envs]
+
+    def close_extras(self, **kwargs):
+        """ Close the sub environments. """
+        for env in self.envs:
+            env.close()
+
+
+def _set_batch_item(batch: Union[np.ndarray, dict], index: int, obs: Union[np.ndarray, dict]):
+    """ Copy a single env's observation into slot `index` of a batched observation (array or dict of arrays). """
+    if isinstance(batch, dict):
+        for key, values in batch.items():
+            values[index] = obs[key]
+    else:
+        batch[index] = obs
+
+
+def _store_info(info_arrays: Dict[str, np.ndarray], index: int, info: dict):
+    """ Copy the scalar info values for a single env into the batched arrays. """
+    for key, values in info_arrays.items():
+        values[index] = info[key]
+
+
+def _get_infos(info_arrays: Dict[str, np.ndarray]) -> dict:
+    """ Build the batched info dict (gymnasium style, with `_key` masks). """
+    infos = {}
+    for key, values in info_arrays.items():
+        infos[key] = values.copy()
+        infos['_' + key] = np.ones(len(values), dtype=np.bool_)
+    return infos
+
+
+def _add_final(infos: dict, done: np.ndarray, final_obs: Union[np.ndarray, dict], final_info: np.ndarray):
+    """ Add the last observation and info of the games that ended this step to a batched info dict. """
+    infos['final_obs'] = final_obs
+    infos['_final_obs'] = done
+    infos['final_info'] = final_info
+    infos['_final_info'] = done.copy()
+
+
+def _async_worker(index: int, pipe, parent_pipe, env_kwargs: dict, shm_name: str, shape: Tuple[int, ...]):
+    """
+    Worker process for `AsyncRobotronVectorEnv`.  Observations are written straight into this worker's slot
+    of the shared memory block; only small messages go back over the pipe.
+
+    args:
+        index (int): Which env (and observation slot) this worker owns.
+        pipe (Connection): Our end of the pipe.
+        parent_pipe (Connection): The parent's end of the pipe.  Closed right away.
+        env_kwargs (dict): Arguments passed to `RobotronEnv`.
+        shm_name (str): Name of the shared observation block.
+        shape (Tuple[int, ...]): Shape of the full `(2, N, H, W, 3)` block: the observations, then the final
+            observations of games that just ended.
+    """
+    parent_pipe.close()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    observation = block[0, index]
+    final_observation = block[1, index]
+    del block
+    env = None
+
+    try:
+        env = RobotronEnv(**env_kwargs)
+        while True:
+            command, data = pipe.recv()
+            if command == 'reset':
+                obs, info = env.reset(seed=data)
+                observation[:] = obs
+                pipe.send(((_small_info(info),), True))
+            elif command == 'step':
+                obs, reward, terminated, truncated, info = env.step(data)
+                final_info = None
+                if terminated or truncated:
+                    # The reset overwrites the engine's frame, so the last one is copied out first.
+                    final_observation[:] = obs
+                    final_info = _small_info(info)
+                    obs, info = env.reset()
+                observation[:] = obs
+                pipe.send(((reward, terminated, truncated, _small_info(info), final_info), True))
+            elif command == 'close':
+                pipe.send((None, True))
+                break
+            else:
+                raise RuntimeError(f'Unknown command: {command}')
+    except (KeyboardInterrupt, Exception):  # pylint: disable=broad-except
+        pipe.send((traceback.format_exc(), False))
+    finally:
+        del observation, final_observation
+        shm.close()
+        if env is not None:
+            env.close()
+
+
+def _small_info(info: dict) -> dict:
+    """ Strip an env info dict down to its scalar values so it is cheap to send between processes. """
+    return {key: info[key] for key in RobotronVectorEnv.INFO_KEYS}
+
+
+class AsyncRobotronVectorEnv(gym.vector.VectorEnv):
+    """
+    Runs `num_envs` Robotron engines, each in its own process.
+
+    Workers write observations directly into a `multiprocessing.shared_memory` block laid out as
+    `(num_envs, height, width, 3)`, so frames are never pickled.  Only actions, rewards, done flags and the
+    scalar info values travel over the pipes.  Games that end are reset in the same step; the last observation
+    and info of the finished game are returned in `infos['final_obs']` and `infos['final_info']` (masked by
+    `infos['_final_obs']`), like `RobotronVectorEnv`.  Workers copy the last frame into a second block of shared
+    memory before they reset.
+    """
+
+    def __init__(self,
+                 num_envs: int,
+                 level: int = 1,
+                 lives: int = 3,
+                 config_path: str = None,
+                 godmode: bool = False,
+                 always_move: bool = False,
+                 seed: Optional[int] = None,
+                 copy: bool = True,
+                 context: Optional[str] = None):
+        """
+        Setup the environments
+
+        args:
+            num_envs (int): The number of engines (and processes) to run.
+            level (int): What level to start at.  Default: 1
+            lives (int): Lives at the start of each game.  Default: 3
+            config_path (str): Optional path to a custom config.
+            godmode (bool): Are you a god? (Can't die.) Default: False
+            always_move (bool): Always move/shoot.  Drops action space from 9x9 to 8x8  Default: False
+            seed (int): Seed for the first environment.  Each following env uses seed + index.
+            copy (bool): Return a copy of the shared observation block.  If False, the returned array is a view
+                of the shared memory and is overwritten by the next step.  Default: True
+            context (str): The multiprocessing start method (fork, spawn, forkserver).  Default: platform default.
+        """
+        self.num_envs = num_envs
+        self.copy = copy
+        self.metadata = {'render_modes': [], 'autoreset_mode': RobotronVectorEnv._autoreset_mode()}
+        self.render_mode = None
+        self.closed = False
+        self.waiting = False
+
+        # Work out the spaces from the config so the parent never has to start pygame.
+        (top, left, bottom, right) = get_config(config_path).get('play_area')
+        actions = 8 if always_move else 9
+        self.single_observation_space = gym.spaces.Box(low=0, high=255, shape=(bottom - top, right - left, 3),
+                                                       dtype=np.uint8)
+        self.single_action_space = gym.spaces.Discrete(actions * actions)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        shape = (2,) + self.observation_space.shape
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        block = np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+        (self._observations, self._final_observations) = block
+        self._rewards = np.zeros(num_envs, dtype=np.float64)
+        self._terminations = np.zeros(num_envs, dtype=np.bool_)
+        self._truncations = np.zeros(num_envs, dtype=np.bool_)
+        self._info_arrays = {key: np.zeros(num_envs, dtype=np.int64) for key in RobotronVectorEnv.INFO_KEYS}
+
+        ctx = multiprocessing.get_context(context)
+        self.parent_pipes = []
+        self.processes = []
+        for i in range(num_envs):
+            parent_pipe, child_pipe = ctx.Pipe()
+            env_kwargs = {
+                'level': level, 'lives': lives, 'config_path': config_path, 'godmode': godmode,
+                'always_move': always_move, 'headless': True, 'copy_obs': False, 'info_mode': 'basic',
+                'seed': None if seed is None else seed + i,
+            }
+            process = ctx.Process(target=_async_worker, name=f'RobotronWorker-{i}', daemon=True,
+                                  args=(i, child_pipe, parent_pipe, env_kwargs, self._shm.name, shape))
+            process.start()
+            child_pipe.close()
+            self.parent_pipes.append(parent_pipe)
+            self.processes.append(process)
+
+    def reset(self,
+              seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+              options: Optional[dict] = None) -> Tuple[np.ndarray, dict]:
+        """
+        Reset every environment.
+
+        args:
+            seed (int or list): A single seed (env i gets seed + i) or one seed per env.
+            options (dict): Unused.  Present for gymnasium compatibility.
+
+        returns:
+            (np.ndarray, dict): The stacked observations and batched info.
+        """
+        del options
+        self._assert_not_waiting()
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+            if len(seeds) != self.num_envs:
+                raise ValueError(f'Expected {self.num_envs} seeds, got {len(seeds)}.')
+
+        for pipe, env_seed in zip(self.parent_pipes, seeds):
+            pipe.send(('reset', env_seed))
+
+        for i, (info,) in enumerate(self._receive()):
+            _store_info(self._info_arrays, i, info)
+
+        self._rewards[:] = 0
+        self._terminations[:] = False
+        self._truncations[:] = False
+
+        return self._get_observations(), _get_infos(self._info_arrays)
+
+    def step_async(self, actions: Sequence[int]):
+        """
+        Send the actions to the workers without waiting for the results.
+
+        args:
+            actions (Sequence[int]): One action per environment.
+        """
+        self._assert_not_waiting()
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f'Expected actions with shape ({self.num_envs},), got {actions.shape}.')
+
+        for pipe, action in zip(self.parent_pipes, actions):
+            pipe.send(('step', int(action)))
+        self.waiting = True
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """
+        Wait for the workers to finish the step started by `step_async`.
+
+        returns:
+            (np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict): obs, rewards, terminations, truncations and infos
+        """
+        if not self.waiting:
+            raise RuntimeError('step_wait called without a pending step_async.')
+        self.waiting = False
+
+        final_info = None
+        for i, (reward, terminated, truncated, info, env_final_info) in enumerate(self._receive()):
+            self._rewards[i] = reward
+            self._terminations[i] = terminated
+            self._truncations[i] = truncated
+            _store_info(self._info_arrays, i, info)
+            if env_final_info is not None:
+                if final_info is None:
+                    final_info = np.full(self.num_envs, None, dtype=object)
+                final_info[i] = env_final_info
+
+        infos = _get_infos(self._info_arrays)
+        if final_info is not None:
+            done = self._terminations | self._truncations
+            # The block is overwritten by the next step, so the frames are always copied (zeros where not done).
+            final_obs = np.zeros_like(self._final_observations)
+            final_obs[done] = self._final_observations[done]
+            _add_final(infos, done, final_obs, final_info)
+
+        return (self._get_observations(), self._rewards.copy(), self._terminations.copy(),
+                self._truncations.copy(), infos)
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """
+        Step every environment with its action.
+
+        args:
+            actions (Sequence[int]): One action per environment.
+
+        returns:
+            (np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict): obs, rewards, terminations, truncations and infos
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def _receive(self) -> List:
+        """ Collect one response from every worker, raising if any of them failed. """
+        results = [pipe.recv() for pipe in self.parent_pipes]
+        for i, (result, success) in enumerate(results):
+            if not success:
+                raise RuntimeError(f'Robotron worker {i} failed:\n{result}')
+        return [result for result, _ in results]
+
+    def _assert_not_waiting(self):
+        if self.waiting:
+            raise RuntimeError('Call step_wait before issuing another command.')
+
+    def _get_observations(self) -> np.ndarray:
+        """ Return the shared observation block, copied if requested. """
+        return self._observations.copy() if self.copy else self._observations
+
+    def close_extras(self, **kwargs):
+        """ Stop the workers and release the shared memory. """
+        if self.waiting:
+            self._receive()
+            self.waiting = False
+
+        for pipe, process in zip(self.parent_pipes, self.processes):
+            if process.is_alive():
+                pipe.send(('close', None))
+        for pipe, process in zip(self.parent_pipes, self.processes):
+            if process.is_alive():
+                pipe.recv()
+            process.join()
+            pipe.close()
+
+        del self._observations, self._final_observations
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,144 @@
+"""Round trips of the replay and trajectory dataset file formats, so changes to either are caught."""
+import json
+import os
+import pickle
+import zlib
+
+import numpy as np
+import pytest
+
+from robotron import RobotronEnv
+from robotron.utils import Replay, ReplayPlayer, TrajectoryDataset
+from robotron.utils import dataset, replay
+
+
+def play(env: RobotronEnv, steps: int, seed: int = 0) -> list:
+    """ Play random actions from a reset, returning (obs, action, reward, terminated) for each step. """
+    rng = np.random.default_rng(seed)
+    (obs, _) = env.reset(seed=seed)
+    played = []
+    for _ in range(steps):
+        action = int(rng.integers(env.action_space.n))
+        (next_obs, reward, terminated, _, _) = env.step(action)
+        played.append((obs, action, reward, terminated))
+        obs = next_obs
+        if terminated:
+            break
+    return played
+
+
+@pytest.fixture(name='recorded')
+def fixture_recorded(tmp_path) -> tuple:
+    """ A replay of a short game with keyframes, and the engine that played it. """
+    env = RobotronEnv(level=3, lives=1, observation_type='entities')
+    env.start_recording(str(tmp_path), keyframe_interval=40)
+    play(env, 300)
+    engine = env.engine
+    env.stop_recording()
+    (path,) = tmp_path.glob('*.replay')
+    return (str(path), engine)
+
+
+def test_replay_header(recorded):
+    (path, engine) = recorded
+    with open(path, 'rb') as f:
+        (magic, version, _) = replay.PREFIX.unpack(f.read(replay.PREFIX.size))
+    assert (magic, version) == (replay.MAGIC, replay.VERSION)
+
+    loaded = Replay(path)
+    assert loaded.frames == engine.frame
+    assert loaded.header['seed'] == 0
+    assert (loaded.header['score'], loaded.header['level']) == (engine.score, engine.level)
+    assert len(loaded.header['keyframes']) > 1
+
+
+def test_replay_verify(recorded):
+    player = ReplayPlayer(Replay(recorded[0]))
+    assert player.verify()
+    assert player.frame == player.replay.frames
+
+
+def test_replay_seek(recorded):
+    loaded = Replay(recorded[0])
+    middle = loaded.frames // 2
+
+    # From the end, seeking back starts from a keyframe; a new player plays from the start.
+    player = ReplayPlayer(loaded)
+    player.play()
+    player.seek(middle)
+    expected = ReplayPlayer(loaded)
+    expected.play(middle)
+    assert player.frame == expected.frame == middle
+    assert player.get_result() == expected.get_result()
+    assert player.engine.get_sprite_data() == expected.engine.get_sprite_data()
+
+    player.seek(0)
+    assert player.frame == 0
+    player.play()
+    assert player.get_result() == player.get_recorded_result()
+
+
+def test_replay_keyframe_code_is_not_run(tmp_path):
+    class Payload:
+        def __reduce__(self):
+            return (os.remove, (str(tmp_path / 'canary'),))
+
+    (tmp_path / 'canary').touch()
+    path = str(tmp_path / 'bad.replay')
+    replay.write_replay(path, {'seed': 0}, bytes(10), [(5, zlib.compress(pickle.dumps(Payload())))])
+    with pytest.raises(pickle.UnpicklingError):
+        Replay(path).keyframe(5)
+    assert (tmp_path / 'canary').exists()
+
+
+@pytest.mark.parametrize('compression', [None, 'zlib'])
+def test_dataset_round_trip(tmp_path, compression):
+    directory = str(tmp_path / 'dataset')
+    env = RobotronEnv(level=2, godmode=True, info_mode='basic', grayscale=True, downsample=4)
+    env.start_dataset(directory, chunk_size=16, compression=compression)
+    played = play(env, 40)
+    env.stop_dataset()
+
+    with open(os.path.join(directory, dataset.INDEX_FILE), encoding='utf-8') as f:
+        index = json.load(f)
+    assert index['version'] == dataset.INDEX_VERSION
+    assert index['compression'] == compression
+    assert [chunk['length'] for chunk in index['chunks']] == [16, 16, 8]
+
+    loaded = TrajectoryDataset(directory)
+    assert len(loaded) == len(played) == 40
+    assert loaded.episodes == 1
+    rows = loaded.get(range(len(played)))
+    np.testing.assert_array_equal(rows['obs'], np.stack([obs for (obs, _, _, _) in played]))
+    np.testing.assert_array_equal(rows['action'], [action for (_, action, _, _) in played])
+    np.testing.assert_array_equal(rows['reward'], [reward for (_, _, reward, _) in played])
+    np.testing.assert_array_equal(rows['episode'], 0)
+
+    # Out of order rows come back the same.
+    shuffled = np.random.default_rng(0).permutation(len(played))
+    np.testing.assert_array_equal(loaded.get(shuffled, fields=['obs'])['obs'], rows['obs'][shuffled])
+
+
+def test_dataset_restore_state(tmp_path):
+    directory = str(tmp_path / 'dataset')
+    env = RobotronEnv(level=2, godmode=True, info_mode='basic', grayscale=True, downsample=4)
+    env.start_dataset(directory, chunk_size=8)
+    first = play(env, 10)
+    state = env.clone_state()
+    for _ in range(5):
+        env.step(0)
+    # Nothing from the restored state on is stored, until the next game.
+    env.restore_state(state)
+    for _ in range(5):
+        env.step(0)
+    second = play(env, 10, seed=1)
+    env.stop_dataset()
+
+    loaded = TrajectoryDataset(directory)
+    assert len(loaded) == 25
+    assert loaded.episodes == 2
+    rows = loaded.get(range(25))
+    np.testing.assert_array_equal(rows['episode'], [0] * 15 + [1] * 10)
+    np.testing.assert_array_equal(rows['obs'][:10], np.stack([obs for (obs, _, _, _) in first]))
+    np.testing.assert_array_equal(rows['obs'][15:], np.stack([obs for (obs, _, _, _) in second]))
+    np.testing.assert_array_equal(rows['action'][10:15], 0)